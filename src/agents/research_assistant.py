@@ -6,10 +6,10 @@ to conducting interviews in parallel to producing the final report using an inte
 """
 
 import traceback
-from typing import Dict, List, Any, Optional
+import uuid
+from typing import Dict, List, Any, Optional, AsyncIterator, Callable
+from typing_extensions import TypedDict
 
-# Import the integrated report generator instead of individual components
-from src.report_generation.report_generation_graph import build_report_generator
 from src.config.default_settings import (
     DEFAULT_MAX_INTERVIEW_TURNS, 
     DEFAULT_NUM_ANALYSTS, 
@@ -30,6 +30,47 @@ from src.utils.logger import (
     Colors
 )
 
+# Report parts written by the reduce step, keyed by the node that writes them
+REPORT_PART_NODES = {
+    "write_introduction": "introduction",
+    "write_report": "content",
+    "write_conclusion": "conclusion",
+}
+REPORT_PARTS = ["introduction", "content", "conclusion"]
+REPORT_PART_LABELS = {"introduction": "introduction", "content": "body", "conclusion": "conclusion"}
+
+
+class ReportStreamEvent(TypedDict, total=False):
+    """Event yielded by ResearchAssistant.astream_report."""
+    type: str  # "interview", "section", "token", "part" or "final_report"
+    part: str  # Report part ("introduction", "content" or "conclusion")
+    text: str  # New tokens, the completed part or the final report
+    # "interview" events only (see ProgressEvent)
+    analyst: str
+    status: str
+    turn: int
+    max_turns: int
+
+
+class ProgressEvent(ReportStreamEvent, total=False):
+    """
+    Event delivered to the listeners registered with ResearchAssistant.subscribe.
+
+    Listeners receive every ReportStreamEvent except "token", plus "analysts"
+    events. Types:
+    - {"type": "analysts", "status": "generated" | "updated", "analysts": [...]}
+    - {"type": "interview", "status": ..., "analyst": ..., "turn": ..., "max_turns": ...},
+      status "queued", "started", "turn" (an answer was given), "stopped_early"
+      or "completed"; "turn" is the number of answers so far
+    - {"type": "section"}, {"type": "part", ...}, {"type": "final_report", ...}
+      as yielded by astream_report
+    """
+    analysts: List[Any]
+
+
+ProgressListener = Callable[[ProgressEvent], None]
+
+
 class ResearchAssistant:
     """
     Research Assistant that orchestrates the entire research process.
@@ -39,6 +80,10 @@ class ResearchAssistant:
         """Initialize the research assistant components."""
         logger.info("Initializing Research Assistant")
         try:
+            # Imported here so that importing this module stays cheap; the graph
+            # modules pull in LangGraph and LangChain
+            from src.report_generation.report_generation_graph import build_report_generator
+
             # Build the integrated report generator graph
             self.report_graph = build_report_generator()
             
@@ -49,7 +94,9 @@ class ResearchAssistant:
             self.max_interview_turns = DEFAULT_MAX_INTERVIEW_TURNS
             self.sections = []
             self.final_report = ""
-            self.thread = {"configurable": {"thread_id": "main_workflow"}}
+            # Checkpoints are durable, so every run needs its own thread
+            self.thread = {"configurable": {"thread_id": f"run-{uuid.uuid4().hex[:12]}"}}
+            self._listeners: List[ProgressListener] = []
             logger.debug("Research Assistant initialized")
         except Exception as e:
             logger.error(f"Error initializing Research Assistant: {str(e)}")
@@ -77,6 +124,87 @@ class ResearchAssistant:
         self.max_analysts = max_analysts
         self.max_interview_turns = max_interview_turns
         
+    def subscribe(self, listener: ProgressListener) -> Callable[[], None]:
+        """
+        Register a listener for the progress events of the research process.
+
+        Args:
+            listener: Called with each ProgressEvent, from the thread or event
+                loop running the graph; it should return quickly
+
+        Returns:
+            Function that unregisters the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    def _emit(self, event: ProgressEvent) -> None:
+        """Deliver a progress event to the listeners."""
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Progress listener failed on {event.get('type')} event: {str(e)}")
+
+    @property
+    def thread_id(self) -> str:
+        """Id of the run, to pass to resume after an interruption."""
+        return self.thread["configurable"]["thread_id"]
+
+    def resume(self, thread_id: str) -> bool:
+        """
+        Continue a run from its last checkpoint (e.g. after the process died).
+
+        The topic, parameters and analysts are restored from the checkpoint;
+        astream_report (or conduct_interviews_and_generate_report) then
+        continues from the last completed node, keeping finished interviews.
+
+        Args:
+            thread_id: Id of the run to resume (see thread_id)
+
+        Returns:
+            True if the run has a checkpoint to continue from
+        """
+        self.thread = {"configurable": {"thread_id": thread_id}}
+        snapshot = self.report_graph.get_state(self.thread)
+        if not snapshot.values:
+            print_error(f"No checkpoint found for run {thread_id}")
+            logger.error(f"Attempted to resume unknown run {thread_id}")
+            return False
+
+        values = snapshot.values
+        self.topic = values.get("topic", self.topic)
+        self.max_analysts = values.get("max_analysts", self.max_analysts)
+        self.max_interview_turns = values.get("max_num_turns", self.max_interview_turns)
+        self.analysts = values.get("analysts", [])
+        self.final_report = values.get("final_report", "")
+        logger.info(f"Resuming run {thread_id} on '{self.topic}' with {len(values.get('sections', []))} "
+                    f"completed sections, next: {list(snapshot.next) or 'done'}")
+        print_info(f"Resuming run {thread_id} on '{self.topic}'")
+        return True
+
+    def _initial_state(self) -> Dict[str, Any]:
+        """Build the initial graph state from the configured topic and parameters."""
+        return {
+            "topic": self.topic,
+            "max_analysts": self.max_analysts,
+            "max_num_turns": self.max_interview_turns
+        }
+
+    def _store_analysts(self, analysts: List[Any], header: str, status: str) -> None:
+        """Display, store and report analysts received from the graph."""
+        print_section_header(header)
+        for analyst in analysts:
+            display_analyst(analyst.dict())
+        self.analysts = analysts
+        self._emit({"type": "analysts", "status": status, "analysts": analysts})
+
+    @staticmethod
+    def _updated_analysts(event: Dict[str, Any]) -> List[Any]:
+        """Return the analysts written by a node in an "updates" stream event."""
+        update = event.get("create_analysts")
+        return (update or {}).get("analysts", []) if isinstance(update, dict) else []
+
     def generate_analysts(self):
         """
         Generate analysts based on the topic.
@@ -89,36 +217,25 @@ class ResearchAssistant:
         
         try:
             # Initialize the graph with topic and max_analysts
-            initial_state = {
-                "topic": self.topic,
-                "max_analysts": self.max_analysts,
-                "max_num_turns": self.max_interview_turns
-            }
+            initial_state = self._initial_state()
             
             logger.debug(f"Initial state: {initial_state}")
             
-            # Run the graph until analyst generation is complete
+            # Run the graph until it pauses for feedback on the analysts; "updates"
+            # carries only each node's output instead of the whole state
             for event in self.report_graph.stream(
                 initial_state,
                 self.thread,
-                stream_mode="values"
+                stream_mode="updates"
             ):
                 # Log received events for debugging
-                logger.debug(f"Received event with keys: {list(event.keys())}")
+                logger.debug(f"Received update from nodes: {list(event.keys())}")
                 
                 # Retrieve generated analysts
-                analysts = event.get('analysts', [])
+                analysts = self._updated_analysts(event)
                 if analysts:
-                    # Display the analysts
-                    print_section_header(f"GENERATED ANALYSTS FOR '{self.topic}'")
-                    for analyst in analysts:
-                        display_analyst(analyst.dict())
-                    
-                    # Store the analysts
-                    self.analysts = analysts
+                    self._store_analysts(analysts, f"GENERATED ANALYSTS FOR '{self.topic}'", "generated")
                     logger.info(f"Generated {len(analysts)} analysts")
-                    # Break the stream after analysts are generated
-                    break
             
             return self.analysts
         except Exception as e:
@@ -127,6 +244,40 @@ class ResearchAssistant:
             print_error(error_msg)
             traceback.print_exc()
             return []
+
+    async def agenerate_analysts(self):
+        """
+        Async version of generate_analysts, driven by the graph's astream.
+        
+        Returns:
+            List of generated analysts
+        """
+        print_section_header(f"GENERATING ANALYSTS FOR '{self.topic}'")
+        logger.info("Starting analyst generation")
+
+        try:
+            initial_state = self._initial_state()
+            logger.debug(f"Initial state: {initial_state}")
+
+            async for event in self.report_graph.astream(
+                initial_state,
+                self.thread,
+                stream_mode="updates"
+            ):
+                logger.debug(f"Received update from nodes: {list(event.keys())}")
+
+                analysts = self._updated_analysts(event)
+                if analysts:
+                    self._store_analysts(analysts, f"GENERATED ANALYSTS FOR '{self.topic}'", "generated")
+                    logger.info(f"Generated {len(analysts)} analysts")
+
+            return self.analysts
+        except Exception as e:
+            error_msg = f"Error generating analysts: {str(e)}"
+            logger.error(error_msg)
+            print_error(error_msg)
+            traceback.print_exc()
+            return []
     
     def provide_feedback(self, feedback: str):
         """
@@ -153,24 +304,16 @@ class ResearchAssistant:
             for event in self.report_graph.stream(
                 None, 
                 self.thread, 
-                stream_mode="values"
+                stream_mode="updates"
             ):
                 # Log received events for debugging
-                logger.debug(f"Feedback event with keys: {list(event.keys())}")
+                logger.debug(f"Feedback update from nodes: {list(event.keys())}")
                 
                 # Retrieve updated analysts
-                analysts = event.get('analysts', [])
+                analysts = self._updated_analysts(event)
                 if analysts:
-                    # Display the updated analysts
-                    print_section_header("UPDATED ANALYSTS BASED ON FEEDBACK")
-                    for analyst in analysts:
-                        display_analyst(analyst.dict())
-                    
-                    # Store the updated analysts
-                    self.analysts = analysts
+                    self._store_analysts(analysts, "UPDATED ANALYSTS BASED ON FEEDBACK", "updated")
                     logger.info(f"Updated {len(analysts)} analysts based on feedback")
-                    # Break the stream after analysts are updated
-                    break
             
             return self.analysts
         except Exception as e:
@@ -179,78 +322,183 @@ class ResearchAssistant:
             print_error(error_msg)
             traceback.print_exc()
             return self.analysts
+
+    async def aprovide_feedback(self, feedback: str):
+        """
+        Async version of provide_feedback, driven by the graph's astream.
+        
+        Args:
+            feedback: User feedback on the analysts
+            
+        Returns:
+            List of updated analysts
+        """
+        print_section_header("REFINING ANALYSTS BASED ON FEEDBACK")
+        logger.info("Processing feedback on analysts")
+
+        try:
+            await self.report_graph.aupdate_state(
+                self.thread,
+                {"human_analyst_feedback": feedback},
+                as_node="human_feedback"
+            )
+
+            async for event in self.report_graph.astream(
+                None,
+                self.thread,
+                stream_mode="updates"
+            ):
+                logger.debug(f"Feedback update from nodes: {list(event.keys())}")
+
+                analysts = self._updated_analysts(event)
+                if analysts:
+                    self._store_analysts(analysts, "UPDATED ANALYSTS BASED ON FEEDBACK", "updated")
+                    logger.info(f"Updated {len(analysts)} analysts based on feedback")
+
+            return self.analysts
+        except Exception as e:
+            error_msg = f"Error processing feedback: {str(e)}"
+            logger.error(error_msg)
+            print_error(error_msg)
+            traceback.print_exc()
+            return self.analysts
     
-    async def conduct_interviews_and_generate_report(self, output_file: str = DEFAULT_OUTPUT_FILE) -> Optional[str]:
+    async def astream_report(self, output_file: str = DEFAULT_OUTPUT_FILE) -> AsyncIterator[ReportStreamEvent]:
         """
-        Continue the workflow to conduct interviews and generate the final report.
+        Conduct the interviews and stream the report while it is being written.
+
+        Tokens of the report body, introduction and conclusion are yielded as
+        they are generated, so callers can render the report incrementally.
+        The final report is saved to output_file before it is yielded.
         
         Args:
             output_file: File to save the report to
             
-        Returns:
-            The generated report or None if there was an error
+        Yields:
+            ReportStreamEvent dicts (all but "token" are also delivered to the
+            subscribed listeners):
+            - {"type": "interview", "status": ..., "analyst": ..., ...}: interview progress
+            - {"type": "section"}: an interview section was completed
+            - {"type": "token", "part": ..., "text": ...}: new text for a report part
+            - {"type": "part", "part": ..., "text": ...}: a report part is complete
+            - {"type": "final_report", "text": ...}: the assembled final report
         """
+        stream = self._astream_report(output_file)
+        try:
+            async for event in stream:
+                yield event
+        finally:
+            await stream.aclose()
+            # Completed, failed, cancelled or abandoned, the run no longer needs them
+            await self._arelease_run()
+
+    async def _astream_report(self, output_file: str) -> AsyncIterator[ReportStreamEvent]:
+        """Stream the report generation of the run (see astream_report)."""
         if not self.analysts:
             print_error("No analysts available. Please generate analysts first.")
             logger.error("Attempted to conduct interviews with no analysts")
-            return None
-        
+            return
+
         print_section_header("CONDUCTING INTERVIEWS AND GENERATING REPORT")
         logger.info("Starting interview and report generation process")
-        
         logger.info("Interview is in progress...")
+
+        # Approve the analysts: feedback given earlier would otherwise send the
+        # graph back to create_analysts instead of the interviews
+        snapshot = await self.report_graph.aget_state(self.thread)
+        if "human_feedback" in snapshot.next:
+            await self.report_graph.aupdate_state(
+                self.thread,
+                {"human_analyst_feedback": None},
+                as_node="human_feedback"
+            )
+
+        # "messages" carries LLM tokens, "updates" carries each node's output,
+        # "custom" carries the progress events of the nodes
+        graph_stream = self.report_graph.astream(
+            None,
+            self.thread,
+            stream_mode=["updates", "messages", "custom"]
+        )
         try:
-            # Continue the workflow (which will handle the interviews and report generation)
-            for event in self.report_graph.stream(
-                None, 
-                self.thread, 
-                stream_mode="values"
-            ):
-                # Log the event keys for debugging
-                logger.debug(f"Interview event with keys: {list(event.keys())}")
-                
+            async for mode, payload in graph_stream:
+                if mode == "messages":
+                    chunk, metadata = payload
+                    part = REPORT_PART_NODES.get(metadata.get("langgraph_node"))
+                    if part and isinstance(chunk.content, str) and chunk.content:
+                        yield {"type": "token", "part": part, "text": chunk.content}
+                    continue
+
+                if mode == "custom":
+                    if isinstance(payload, dict) and payload.get("type"):
+                        self._emit(payload)
+                        yield payload
+                    continue
+
+                for node, update in payload.items():
+                    logger.debug(f"Update from node: {node}")
+                    update = update if isinstance(update, dict) else {}
+
+                    if update.get("sections"):
+                        logger.debug(f"Section content: {update['sections'][0][:100]}...")
+                        event: ReportStreamEvent = {"type": "section"}
+                        self._emit(event)
+                        yield event
+
+                    for part in REPORT_PARTS:
+                        if update.get(part):
+                            event = {"type": "part", "part": part, "text": update[part]}
+                            self._emit(event)
+                            yield event
+
+                    if "final_report" in update:
+                        final_report = update["final_report"]
+                        logger.debug(f"Final report received. Length: {len(final_report or '')} characters")
+
+                        if not final_report or final_report.strip() == "":
+                            logger.warning("Empty report received")
+                            print_warning("Empty report generated!")
+                            return
+
+                        self.final_report = final_report
+
+                        # Save to file
+                        logger.info("Saving report to file...")
+                        save_report_to_file(final_report, output_file)
+                        self._log_llm_stats()
+                        event = {"type": "final_report", "text": final_report}
+                        self._emit(event)
+                        yield event
+                        return
+        finally:
+            # Not left to the garbage collector, which would clean up after the run is released
+            await graph_stream.aclose()
+
+        # If we reached here, we didn't get a final report
+        logger.warning("No final report event received")
+        print_warning("No final report was generated by the workflow")
+
+    async def conduct_interviews_and_generate_report(self, output_file: str = DEFAULT_OUTPUT_FILE) -> Optional[str]:
+        """
+        Continue the workflow to conduct interviews and generate the final report.
+        
+        Args:
+            output_file: File to save the report to
+            
+        Returns:
+            The generated report or None if there was an error
+        """
+        # Closed explicitly (contextlib.aclosing needs Python 3.10), so the run is released right away
+        stream = self.astream_report(output_file)
+        try:
+            async for event in stream:
                 # Print updates about the progress
-                if event.get("sections"):
+                if event["type"] == "section":
                     print_success("Interview section completed")
-                    logger.debug(f"Section content: {event.get('sections')[:100]}...")
-                
-                # Debug logging for other important steps
-                if event.get("introduction"):
-                    print_info("Report introduction generated")
-                
-                if event.get("content"):
-                    logger.debug("Content generated")
-                    print_info("Report body generated")
-                    
-                if event.get("conclusion"):
-                    logger.debug("Conclusion generated")
-                    print_info("Report conclusion generated")
-                
-                # Check for final report
-                if event.get("final_report"):
-                    final_report = event.get("final_report")
-                    if final_report is not None:
-                        logger.info("Generating final report...")
-                    logger.debug(f"Final report received. Length: {len(final_report)} characters")
-                    
-                    if not final_report or final_report.strip() == "":
-                        logger.warning("Empty report received")
-                        print_warning("Empty report generated!")
-                        return None
-                        
-                    self.final_report = final_report
-                    
-                    # Save to file
-                    logger.info("Saving report to file...")
-                    save_report_to_file(final_report, output_file)
-                    # print_section_header(f"RESEARCH COMPLETE")
-                    # print_success(f"Final report generated and saved to {output_file}")
-                    # logger.info(f"Research process completed successfully")
-                    return final_report
-            
-            # If we reached here, we didn't get a final report
-            logger.warning("No final report event received")
-            print_warning("No final report was generated by the workflow")
+                elif event["type"] == "part":
+                    print_info(f"Report {REPORT_PART_LABELS[event['part']]} generated")
+                elif event["type"] == "final_report":
+                    return event["text"]
             return None
             
         except Exception as e:
@@ -259,7 +507,74 @@ class ResearchAssistant:
             print_error(error_msg)
             traceback.print_exc()
             return None
+        finally:
+            await stream.aclose()
     
+    async def _arelease_run(self) -> None:
+        """Drop the run-scoped document store, report draft and in-memory checkpoints, logging final stats."""
+        from src.report_generation.report_draft import release_report_draft
+        from src.search.document_store import release_document_store
+        from src.utils.checkpointer import arelease_checkpoint_thread
+
+        # Documents persisted with the checkpoints are reloaded if the run is resumed
+        logger.info(f"Document store stats: {release_document_store(self.thread_id)}")
+        logger.info(f"Report draft stats: {release_report_draft(self.thread_id)}")
+        # The checkpoints stay on disk until they expire, so the run can still be resumed
+        await arelease_checkpoint_thread(self.thread_id)
+
+    def _log_llm_stats(self) -> None:
+        """Log the LLM, search, context budgeting and interview counters of the run."""
+        from src.interview.early_stopping import early_stopping_stats
+        from src.report_generation.interview_scheduler import interview_scheduler_stats
+        from src.utils.checkpointer import checkpointer_stats
+        from src.models.hedging import hedge_stats
+        from src.models.llm_cache import get_response_cache
+        from src.search.backends import search_backend_stats
+        from src.search.compression import compression_stats
+        from src.search.passage_ranker import passage_ranking_stats
+        from src.search.search_cache import get_search_cache
+        from src.models.rate_limiter import rate_limiter_stats
+        from src.utils.token_budget import token_savings_stats
+
+        logger.info(f"LLM response cache stats: {get_response_cache().stats()}")
+        logger.info(f"LLM rate limiter stats per deployment: {rate_limiter_stats()}")
+        logger.info(f"LLM request hedging stats: {hedge_stats()}")
+        logger.info(f"Search result cache stats: {get_search_cache().stats()}")
+        logger.info(f"Search backend stats: {search_backend_stats()}")
+        logger.info(f"Search result compression stats: {compression_stats()}")
+        logger.info(f"Passage ranking stats: {passage_ranking_stats()}")
+        logger.info(f"Context tokens saved per node: {token_savings_stats()}")
+        logger.info(f"Interview early stopping stats: {early_stopping_stats()}")
+        logger.info(f"Interview scheduler stats: {interview_scheduler_stats()}")
+        logger.info(f"Checkpointer stats: {checkpointer_stats()}")
+
+    async def prepare_analysts(self) -> bool:
+        """
+        Generate analysts and collect feedback on them interactively.
+        
+        Returns:
+            True if analysts are available to conduct interviews
+        """
+        # Generate analysts
+        await self.agenerate_analysts()
+        
+        if not self.analysts:
+            print_error("Failed to generate analysts. Cannot continue.")
+            return False
+        
+        # Ask for feedback
+        while True:
+            feedback = input(f"\n{Colors.YELLOW}Do you want to provide feedback on the analysts? (y/n): {Colors.RESET}")
+            if feedback.lower() == 'y':
+                feedback_text = input(f"{Colors.CYAN}Please provide your feedback: {Colors.RESET}")
+                await self.aprovide_feedback(feedback_text)
+            elif feedback.lower() == 'n':
+                print_info("Proceeding without additional feedback")
+                break
+            else:
+                print_warning("Invalid input. Please enter 'y' or 'n'.")
+        return True
+
     async def run_research_process(self, output_file: str = DEFAULT_OUTPUT_FILE) -> Optional[str]:
         """
         Run the full research process from analyst generation to final report.
@@ -273,25 +588,9 @@ class ResearchAssistant:
         logger.info("Starting full research process")
         
         try:
-            # Generate analysts
-            self.generate_analysts()
-            
-            if not self.analysts:
-                print_error("Failed to generate analysts. Cannot continue.")
+            if not await self.prepare_analysts():
                 return None
             
-            # Ask for feedback
-            while True:
-                feedback = input(f"\n{Colors.YELLOW}Do you want to provide feedback on the analysts? (y/n): {Colors.RESET}")
-                if feedback.lower() == 'y':
-                    feedback_text = input(f"{Colors.CYAN}Please provide your feedback: {Colors.RESET}")
-                    self.provide_feedback(feedback_text)
-                elif feedback.lower() == 'n':
-                    print_info("Proceeding without additional feedback")
-                    break
-                else:
-                    print_warning("Invalid input. Please enter 'y' or 'n'.")
-            
             # Conduct interviews and generate report
             report = await self.conduct_interviews_and_generate_report(output_file)
             return report
@@ -7,10 +7,11 @@ Uses LangGraph to create a flow that generates, evaluates, and refines analyst p
 
 from typing import Dict, Any
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import START, END, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
+from src.utils.checkpointer import get_checkpointer
 
-from src.models.llm import llm
+from src.models.llm import get_llm
 from src.analysts.analyst_schema import Perspectives, GenerateAnalystsState
 from src.utils.helpers import display_analyst
 from src.utils.logger import logger
@@ -19,6 +20,21 @@ from src.prompts.analyst_prompt import ANALYST_INSTRUCTIONS
 
 
 
+def _analyst_messages(state: GenerateAnalystsState) -> list:
+    """Build the prompt used to generate analyst personas."""
+    topic = state['topic']
+    max_analysts = state['max_analysts']
+    human_analyst_feedback = state.get('human_analyst_feedback', '')
+
+    # System message
+    system_message = ANALYST_INSTRUCTIONS.format(
+        topic=topic,
+        human_analyst_feedback=human_analyst_feedback,
+        max_analysts=max_analysts
+    )
+
+    return [SystemMessage(content=system_message)] + [HumanMessage(content="Generate the set of analysts.")]
+
 def create_analysts(state: GenerateAnalystsState) -> Dict[str, Any]:
     """
     Create analyst personas based on a research topic.
@@ -31,31 +47,38 @@ def create_analysts(state: GenerateAnalystsState) -> Dict[str, Any]:
     """
 
     logger.info("Generating analysts...")
-    topic = state['topic']
-    max_analysts = state['max_analysts']
-    human_analyst_feedback = state.get('human_analyst_feedback', '')
 
     # Enforce structured output
-    structured_llm = llm.with_structured_output(Perspectives)
-
-    # System message
-    system_message = ANALYST_INSTRUCTIONS.format(
-        topic=topic,
-        human_analyst_feedback=human_analyst_feedback,
-        max_analysts=max_analysts
-    )
+    structured_llm = get_llm("create_analysts").with_structured_output(Perspectives)
 
     # Generate analysts
-    analysts = structured_llm.invoke(
-        [SystemMessage(content=system_message)] + 
-        [HumanMessage(content="Generate the set of analysts.")]
-    )
+    analysts = structured_llm.invoke(_analyst_messages(state))
 
     logger.info("Analysts generated successfully")
 
     # Return the list of analysts
     return {"analysts": analysts.analysts}
 
+async def acreate_analysts(state: GenerateAnalystsState) -> Dict[str, Any]:
+    """
+    Async version of create_analysts.
+    
+    Args:
+        state: The current state with topic and constraints
+        
+    Returns:
+        Dict with analysts list
+    """
+
+    logger.info("Generating analysts...")
+
+    structured_llm = get_llm("create_analysts").with_structured_output(Perspectives)
+    analysts = await structured_llm.ainvoke(_analyst_messages(state))
+
+    logger.info("Analysts generated successfully")
+
+    return {"analysts": analysts.analysts}
+
 def human_feedback(state: GenerateAnalystsState):
     """
     No-op node that should be interrupted on.
@@ -90,7 +113,7 @@ def build_analyst_generator():
     """
     # Add nodes and edges
     builder = StateGraph(GenerateAnalystsState)
-    builder.add_node("create_analysts", create_analysts)
+    builder.add_node("create_analysts", RunnableLambda(create_analysts, afunc=acreate_analysts))
     builder.add_node("human_feedback", human_feedback)
     
     builder.add_edge(START, "create_analysts")
@@ -102,11 +125,10 @@ def build_analyst_generator():
     )
 
     # Compile with interruption point
-    memory = MemorySaver()
     return builder.compile(
         interrupt_before=['human_feedback'], 
-        checkpointer=memory
-    ) 
+        checkpointer=get_checkpointer()
+    )
 
 
 if __name__ == "__main__":
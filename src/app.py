@@ -39,6 +39,9 @@ from src.utils.helpers import (
     set_env_var
 )
 
+# Minimum seconds between two re-renders of the streamed report
+REPORT_RENDER_INTERVAL = 0.25
+
 # Initialize session state
 if 'research_complete' not in st.session_state:
     st.session_state.research_complete = False
@@ -54,6 +57,9 @@ if 'status' not in st.session_state:
     st.session_state.status = ""
 if 'api_keys_set' not in st.session_state:
     st.session_state.api_keys_set = False
+# Run of the current research, kept so an interrupted run (e.g. a rerun) can be resumed
+if 'run_id' not in st.session_state:
+    st.session_state.run_id = ""
 
 # Page Configuration
 st.set_page_config(
@@ -208,6 +214,12 @@ with st.sidebar:
             os.environ["AZURE_OPENAI_API_VERSION"] = azure_openai_api_version
             os.environ["AZURE_OPENAI_DEPLOYMENT"] = azure_openai_deployment
             os.environ["TAVILY_API_KEY"] = tavily_api_key
+
+            # Clients are cached per process, rebuild them with the new keys
+            from src.models.llm import reset_llm
+            from src.search.web_search import reset_search_tools
+            reset_llm()
+            reset_search_tools()
             
             st.session_state.api_keys_set = True
             st.sidebar.success("API keys saved successfully!")
@@ -253,12 +265,22 @@ async def run_research_process():
         # Initialize research assistant
         update_progress(0.1, "Initializing research assistant...")
         assistant = ResearchAssistant()
-        assistant.set_topic(research_topic, num_analysts, max_turns)
-        
-        # Generate analysts
-        update_progress(0.1, "Generating analysts...")
-        streamlit_logger.log("\nGenerating analysts for your research topic...")
-        analysts = assistant.generate_analysts()
+        analysts = []
+        # Continue the interrupted run on the same topic from its last checkpoint
+        if (st.session_state.run_id and not st.session_state.research_complete
+                and assistant.resume(st.session_state.run_id) and assistant.topic == research_topic):
+            analysts = assistant.analysts
+            if analysts:
+                streamlit_logger.log(f"\nResuming run {assistant.thread_id}...")
+        if not analysts:
+            assistant = ResearchAssistant()
+            assistant.set_topic(research_topic, num_analysts, max_turns)
+            st.session_state.run_id = assistant.thread_id
+
+            # Generate analysts
+            update_progress(0.1, "Generating analysts...")
+            streamlit_logger.log("\nGenerating analysts for your research topic...")
+            analysts = await assistant.agenerate_analysts()
         
         if not analysts:
             streamlit_logger.log("❌ Failed to generate analysts. Please check your API keys and try again.")
@@ -288,7 +310,59 @@ async def run_research_process():
         update_progress(0.3, "Conducting interviews and research...")
         streamlit_logger.log("\nStarting interviews with experts...")
         
-        report = await assistant.conduct_interviews_and_generate_report(output_file)
+        # Create a container for the report content
+        report_container = tab2.container()
+        
+        # Header for the report section
+        report_container.markdown("### Generated Research Report")
+        report_placeholder = report_container.empty()
+
+        # Advance the progress bar from 0.3 to 0.8 with the answered interview turns
+        interview_turns = {}
+
+        def show_interview_progress(event):
+            if event["type"] != "interview":
+                return
+            turns = interview_turns.setdefault(event["analyst"], [0, event["max_turns"]])
+            if event["status"] == "turn":
+                turns[0] = event["turn"]
+            elif event["status"] in ("stopped_early", "completed"):
+                # The interview needed no more turns
+                turns[0] = turns[1] = event["turn"]
+            elif event["status"] == "started":
+                streamlit_logger.log(f"Interviewing {event['analyst']}...")
+            done = sum(turn for turn, _ in interview_turns.values())
+            total = sum(max_turns for _, max_turns in interview_turns.values()) or 1
+            st.session_state.progress = 0.3 + 0.5 * done / total
+            st.session_state.status = f"Conducting interviews ({done}/{total} turns)..."
+            progress_bar.progress(st.session_state.progress)
+            status_text.markdown(f"**Status:** {st.session_state.status}")
+
+        assistant.subscribe(show_interview_progress)
+
+        # Render the report parts incrementally while they are being written
+        report_parts = {"introduction": "", "content": "", "conclusion": ""}
+        last_render = 0.0
+        report = None
+        # Closed explicitly (contextlib.aclosing needs Python 3.10), so the run is released right away
+        stream = assistant.astream_report(output_file)
+        try:
+            async for event in stream:
+                if event["type"] == "section":
+                    streamlit_logger.log("✅ Interview section completed")
+                elif event["type"] in ("token", "part"):
+                    if event["type"] == "token":
+                        report_parts[event["part"]] += event["text"]
+                    else:
+                        report_parts[event["part"]] = event["text"]
+                    # Re-rendering markdown is costly, so throttle token updates
+                    if event["type"] == "part" or time.time() - last_render > REPORT_RENDER_INTERVAL:
+                        report_placeholder.markdown("\n\n---\n\n".join(part for part in report_parts.values() if part))
+                        last_render = time.time()
+                elif event["type"] == "final_report":
+                    report = event["text"]
+        finally:
+            await stream.aclose()
         
         if not report:
             streamlit_logger.log("❌ Failed to generate report. Check logs for details.")
@@ -298,15 +372,10 @@ async def run_research_process():
         # Store the report content
         st.session_state.report_content = report
         st.session_state.research_complete = True
-
-        # Create a container for the report content
-        report_container = tab2.container()
-        
-        # Header for the report section
-        report_container.markdown("### Generated Research Report")
+        st.session_state.run_id = ""
         
         # Display the full report content
-        report_container.markdown(st.session_state.report_content)
+        report_placeholder.markdown(st.session_state.report_content)
         
         # Add some space before the download button
         report_container.markdown("---")
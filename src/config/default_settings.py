@@ -12,7 +12,213 @@ DEFAULT_RESEARCH_TOPIC = "The application of ai agents"
 DEFAULT_NUM_ANALYSTS = 1
 DEFAULT_MAX_INTERVIEW_TURNS = 1
 DEFAULT_N_DOCUMENT_TO_SEARCH = 1
+# Plan a separate, shorter Wikipedia query in the same call as the web query
+DEFAULT_BACKEND_SPECIFIC_SEARCH_QUERIES = False
 
 # Output configuration
 DEFAULT_OUTPUT_FILE = "research_report.md"
 
+# LLM response cache configuration
+DEFAULT_LLM_CACHE_ENABLED = True
+DEFAULT_LLM_CACHE_PATH = ".cache/llm_responses.sqlite3"
+DEFAULT_LLM_CACHE_MEMORY_ENTRIES = 256
+DEFAULT_LLM_CACHE_MAX_DISK_ENTRIES = 5000
+DEFAULT_LLM_CACHE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+
+# LLM rate limiting configuration (match these to the deployment quota)
+DEFAULT_LLM_REQUESTS_PER_MINUTE = 60
+DEFAULT_LLM_TOKENS_PER_MINUTE = 60000
+DEFAULT_LLM_MAX_CONCURRENCY = 8
+DEFAULT_LLM_MAX_RETRIES = 5
+DEFAULT_LLM_EXPECTED_OUTPUT_TOKENS = 1000
+
+# Hedged LLM requests: async calls from these nodes that are slower than the
+# given latency percentile are duplicated and the first response wins. Hedges
+# are capped at DEFAULT_LLM_HEDGE_BUDGET of all calls; an empty list disables hedging.
+DEFAULT_LLM_HEDGE_NODES = [
+    "answer_question",
+    "write_section",
+    "write_report",
+    "write_introduction",
+    "write_conclusion",
+    "write_introduction_and_conclusion",
+]
+DEFAULT_LLM_HEDGE_PERCENTILE = 95
+DEFAULT_LLM_HEDGE_MIN_SAMPLES = 10
+DEFAULT_LLM_HEDGE_WINDOW = 200
+DEFAULT_LLM_HEDGE_BUDGET = 0.05
+
+# Prompt token budgets for retrieved context
+DEFAULT_TOKENIZER_ENCODING = "o200k_base"
+DEFAULT_ANSWER_CONTEXT_TOKEN_BUDGET = 6000
+DEFAULT_SECTION_CONTEXT_TOKEN_BUDGET = 12000
+
+# Passage ranking of the answer context: documents are split into passages of
+# about DEFAULT_PASSAGE_WORDS words and only the DEFAULT_PASSAGE_TOP_K passages
+# most relevant to the question (BM25) are sent to the expert. Sized for the
+# compressed context: a turn brings DEFAULT_N_DOCUMENT_TO_SEARCH documents per
+# backend of at most DEFAULT_DOCUMENT_CHAR_BUDGET characters (about 250 words),
+# i.e. around a dozen passages of two or three sentences to rank
+DEFAULT_PASSAGE_RANKING_ENABLED = True
+DEFAULT_PASSAGE_WORDS = 40
+DEFAULT_PASSAGE_TOP_K = 6
+DEFAULT_BM25_K1 = 1.5
+DEFAULT_BM25_B = 0.75
+
+# Sources the expert sees when answering: "full", "sliding" (last
+# DEFAULT_CONTEXT_WINDOW_TURNS turns), "summaries" (earlier sources compressed
+# into DEFAULT_CONTEXT_SUMMARY_CHARS characters) or "cited" (earlier sources
+# only when already cited). write_section always sees every source.
+DEFAULT_INTERVIEW_CONTEXT_STRATEGY = "sliding"
+DEFAULT_CONTEXT_WINDOW_TURNS = 1
+DEFAULT_CONTEXT_SUMMARY_CHARS = 1500
+
+# Information-gain early stopping: after DEFAULT_EARLY_STOP_MIN_TURNS turns, an
+# interview ends when the weighted novelty of a turn (new sources, new terms in
+# its documents, answer not repeating earlier ones) is below the threshold
+DEFAULT_EARLY_STOPPING_ENABLED = True
+DEFAULT_EARLY_STOP_MIN_TURNS = 2
+DEFAULT_EARLY_STOP_GAIN_THRESHOLD = 0.2
+DEFAULT_EARLY_STOP_WEIGHTS = {"sources": 0.4, "passages": 0.3, "answer": 0.3}
+
+# Search result cache configuration (TTLs are per backend, in seconds)
+DEFAULT_SEARCH_CACHE_ENABLED = True
+DEFAULT_SEARCH_CACHE_PATH = ".cache/search_results.sqlite3"
+DEFAULT_SEARCH_CACHE_MEMORY_ENTRIES = 256
+DEFAULT_SEARCH_CACHE_MAX_DISK_ENTRIES = 2000
+DEFAULT_SEARCH_CACHE_TTL_SECONDS = {
+    "tavily": 6 * 60 * 60,
+    "wikipedia": 7 * 24 * 60 * 60,
+}
+DEFAULT_SEARCH_CACHE_STALE_WHILE_REVALIDATE = True
+DEFAULT_SEARCH_CACHE_MAX_STALE_SECONDS = 24 * 60 * 60
+# Serve the results of a cached query whose terms overlap the new query's by at
+# least this Jaccard similarity (word order, filler words and plurals ignored)
+DEFAULT_SEARCH_CACHE_NEAR_DUPLICATES = True
+DEFAULT_SEARCH_CACHE_NEAR_THRESHOLD = 0.8
+
+# Search backends queried concurrently each interview turn (see
+# src/search/backends.py). A backend that misses its deadline is skipped for
+# the turn; with DEFAULT_SEARCH_ENOUGH_RESULTS > 0 the turn continues as soon
+# as that many documents arrived and the remaining searches are cancelled.
+DEFAULT_SEARCH_BACKENDS = {
+    "web": {"enabled": True, "deadline_seconds": 10.0},
+    "wikipedia": {"enabled": True, "deadline_seconds": 6.0},
+    # Internal documents from LOCAL_CORPUS_DIR (see src/search/local_corpus.py)
+    "local": {"enabled": False, "deadline_seconds": 2.0},
+}
+DEFAULT_SEARCH_ENOUGH_RESULTS = 0
+# A backend failing this many times in a row is skipped for the reset period
+DEFAULT_SEARCH_BREAKER_FAILURES = 3
+DEFAULT_SEARCH_BREAKER_RESET_SECONDS = 60.0
+
+# Extractive compression of search results before they enter the interview
+# context: documents longer than the budget keep their most query-relevant,
+# least redundant sentences (MMR, lambda weighs relevance against novelty)
+DEFAULT_DOCUMENT_COMPRESSION_ENABLED = True
+DEFAULT_DOCUMENT_CHAR_BUDGET = 1500
+DEFAULT_COMPRESSION_MMR_LAMBDA = 0.7
+
+# Run-scoped document store: interviews of one run share deduplicated search
+# results and keep references to them in their context
+DEFAULT_DOCUMENT_STORE_ENABLED = True
+
+# Local document corpus: passages of about DEFAULT_LOCAL_CORPUS_CHUNK_WORDS
+# words, hashed into DEFAULT_LOCAL_CORPUS_FEATURES-dimensional vectors
+DEFAULT_LOCAL_CORPUS_INDEX_DIR = ".cache/local_corpus"
+DEFAULT_LOCAL_CORPUS_FEATURES = 2048
+DEFAULT_LOCAL_CORPUS_CHUNK_WORDS = 150
+
+# Offline Wikipedia backend (WIKIPEDIA_BACKEND=local): full-text index built
+# from a dump with `python -m src.search.local_wikipedia ingest`
+DEFAULT_LOCAL_WIKIPEDIA_INDEX_PATH = ".cache/wikipedia_index.sqlite3"
+DEFAULT_LOCAL_WIKIPEDIA_BASE_URL = "https://en.wikipedia.org/wiki"
+DEFAULT_LOCAL_WIKIPEDIA_MAX_SECTION_CHARS = 4000
+
+# Report generation configuration
+DEFAULT_COMBINED_INTRO_CONCLUSION = True
+
+# Incremental reduce: sections are folded into a running draft as interviews
+# finish (source numbering, DEFAULT_DRAFT_KEY_POINT_CHARS of key points per
+# section, clustering of sections sharing DEFAULT_DRAFT_CLUSTER_SIMILARITY of
+# their terms), the report body is stitched from the draft and the
+# introduction and conclusion are written from its outline. With
+# DEFAULT_DRAFT_POLISH, the stitched body is polished by write_report (one
+# streamed LLM call over the consolidated draft); without it the stitched body
+# is used as is, saving that call but streaming no report body tokens
+DEFAULT_INCREMENTAL_REDUCE = True
+DEFAULT_DRAFT_POLISH = True
+DEFAULT_DRAFT_KEY_POINT_CHARS = 400
+DEFAULT_DRAFT_CLUSTER_SIMILARITY = 0.15
+
+# Interviews running at once, process-wide (0 for no cap); queued interviews are
+# admitted "shortest_first" (lowest estimated cost) or in the "given" order
+DEFAULT_MAX_CONCURRENT_INTERVIEWS = 4
+DEFAULT_INTERVIEW_ORDER = "shortest_first"
+
+# Graph checkpoints: "sqlite" keeps them in DEFAULT_CHECKPOINT_PATH so an
+# interrupted run can be resumed, "memory" keeps them in the process only.
+# Records are committed in batches by a background writer. A run's records
+# leave memory when it ends or after DEFAULT_CHECKPOINT_IDLE_SECONDS without
+# use, and leave the disk DEFAULT_CHECKPOINT_RETENTION_DAYS after their last
+# write (0 keeps them forever)
+DEFAULT_CHECKPOINT_BACKEND = "sqlite"
+DEFAULT_CHECKPOINT_PATH = ".cache/checkpoints.sqlite3"
+DEFAULT_CHECKPOINT_BATCH_SECONDS = 0.05
+DEFAULT_CHECKPOINT_COMPRESS_BYTES = 1024
+DEFAULT_CHECKPOINT_IDLE_SECONDS = 3600
+DEFAULT_CHECKPOINT_RETENTION_DAYS = 7
+
+# Model profiles used by the per-task routing table below.
+# "azure_deployment" is the Azure deployment name; None falls back to the
+# MODEL_PROFILE_<NAME>_DEPLOYMENT environment variable and then to
+# AZURE_OPENAI_DEPLOYMENT. "openai_model" is used with a plain OpenAI key
+# (None uses OPENAI_MODEL). "timeout" is in seconds.
+DEFAULT_MODEL_PROFILES = {
+    "default": {
+        "azure_deployment": None,
+        "openai_model": None,
+        "temperature": DEFAULT_MODEL_TEMPERATURE,
+        "max_tokens": None,
+        "timeout": 60,
+    },
+    "fast": {
+        "azure_deployment": None,
+        "openai_model": "gpt-4o-mini",
+        "temperature": 0.3,
+        "max_tokens": 300,
+        "timeout": 30,
+    },
+    "writer": {
+        "azure_deployment": None,
+        "openai_model": None,
+        "temperature": DEFAULT_MODEL_TEMPERATURE,
+        "max_tokens": 4000,
+        "timeout": 120,
+    },
+}
+
+# Model profile used by each LLM-calling task
+DEFAULT_MODEL_ROUTES = {
+    "create_analysts": "default",
+    "generate_question": "fast",
+    "search_query": "fast",
+    "generate_answer": "default",
+    "write_section": "writer",
+    "write_report": "writer",
+    "write_introduction": "writer",
+    "write_conclusion": "writer",
+    "write_introduction_and_conclusion": "writer",
+}
+
+# Latency profiles of the offline fake LLM and search backends (LLM_PROVIDER=fake,
+# SEARCH_PROVIDER=fake). Time to first token is log-normal around "median"
+# seconds with log-space spread "sigma"; "per_token" seconds are added per
+# generated token.
+DEFAULT_FAKE_LATENCY_PROFILES = {
+    "none": {"median": 0.0, "sigma": 0.0, "per_token": 0.0},
+    "fast": {"median": 0.05, "sigma": 0.3, "per_token": 0.0005},
+    "realistic": {"median": 0.8, "sigma": 0.5, "per_token": 0.01},
+    "slow": {"median": 3.0, "sigma": 0.8, "per_token": 0.03},
+}
@@ -5,24 +5,39 @@ This module manages environment variables and global configuration settings.
 """
 
 import os
-from dotenv import load_dotenv
-from src.utils.logger import logger, print_warning
-
-# Load environment variables from .env file
-load_dotenv()
-
-# API Keys (with empty defaults for safety)
-AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "")
-AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY", "")
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "")
-AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT", "")
+import threading
+from typing import Any
 
-# OpenAI API Key
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+from src.utils.logger import logger, print_warning
 
-# Tavily API Key
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
+# Environment-backed settings and their defaults. They are resolved on first
+# access (module __getattr__) instead of at import, so that importing this
+# module neither reads .env nor fails when keys are missing.
+ENV_SETTINGS = {
+    # API Keys (with empty defaults for safety)
+    "AZURE_OPENAI_API_VERSION": "",
+    "AZURE_OPENAI_API_KEY": "",
+    "AZURE_OPENAI_ENDPOINT": "",
+    "AZURE_OPENAI_DEPLOYMENT": "",
+    # OpenAI API Key
+    "OPENAI_API_KEY": "",
+    "OPENAI_MODEL": "gpt-4o",
+    # Tavily API Key
+    "TAVILY_API_KEY": "",
+    # Providers: empty for the real services, "fake" for the offline stand-ins
+    "LLM_PROVIDER": "",
+    "SEARCH_PROVIDER": "",
+    # Wikipedia backend: "api" for the live API, "local" for the offline index
+    "WIKIPEDIA_BACKEND": "api",
+    "WIKIPEDIA_INDEX_PATH": "",
+    # Directory of internal documents searched by the "local" backend
+    "LOCAL_CORPUS_DIR": "",
+    # Offline stand-in behaviour (see DEFAULT_FAKE_LATENCY_PROFILES)
+    "FAKE_LLM_LATENCY_PROFILE": "fast",
+    "FAKE_SEARCH_LATENCY_PROFILE": "fast",
+    "FAKE_LLM_RATE_LIMIT_RATE": "0",
+    "FAKE_SEED": "0",
+}
 
 
 # System paths
@@ -31,6 +46,56 @@ SYSTEM_PROMPTS_DIR = os.path.join(
     "prompts"
 )
 
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """Load environment variables from the .env file (only once per process)."""
+    global _env_loaded
+    with _env_lock:
+        if _env_loaded:
+            return
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def get_setting(name: str) -> str:
+    """
+    Read an environment-backed setting.
+
+    Args:
+        name: Name of the setting (one of ENV_SETTINGS)
+
+    Returns:
+        The current value from the environment or its default
+    """
+    load_env()
+    return os.getenv(name, ENV_SETTINGS[name])
+
+
+def get_profile_deployment(profile: str) -> str:
+    """
+    Read the Azure deployment configured for a model profile.
+
+    Args:
+        profile: Name of the model profile (e.g. "fast")
+
+    Returns:
+        Value of MODEL_PROFILE_<PROFILE>_DEPLOYMENT, or an empty string
+    """
+    load_env()
+    return os.getenv(f"MODEL_PROFILE_{profile.upper()}_DEPLOYMENT", "")
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from src.config.settings import AZURE_OPENAI_API_KEY` working
+    if name in ENV_SETTINGS:
+        return get_setting(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # # Log configuration settings
 # logger.info(f"Using model: {AZURE_OPENAI_DEPLOYMENT or OPENAI_MODEL}")
 # logger.info(f"Model temperature: {DEFAULT_MODEL_TEMPERATURE}")
@@ -40,15 +105,16 @@ SYSTEM_PROMPTS_DIR = os.path.join(
 def init_config():
     """Initialize configuration settings."""
     # Ensure the required API keys are available or will be prompted for
-    if not AZURE_OPENAI_API_KEY and not OPENAI_API_KEY:
+    if get_setting("LLM_PROVIDER") == "fake":
+        logger.info("Using the offline fake LLM")
+    elif not get_setting("AZURE_OPENAI_API_KEY") and not get_setting("OPENAI_API_KEY"):
         warning_msg = "No OpenAI API key found in environment variables. You will be prompted to enter it when needed."
         logger.warning(warning_msg)
         print_warning(warning_msg)
     
-    if not TAVILY_API_KEY:
+    if get_setting("SEARCH_PROVIDER") == "fake":
+        logger.info("Using the offline fake search backends")
+    elif not get_setting("TAVILY_API_KEY"):
         warning_msg = "No Tavily API key found in environment variables. You will be prompted to enter it when needed."
         logger.warning(warning_msg)
         print_warning(warning_msg)
-
-# Initialize config 
-init_config() 
\ No newline at end of file
@@ -4,33 +4,80 @@ Expert answer generation based on retrieved context.
 
 from langchain_core.messages import SystemMessage
 
-from src.models.llm import llm
+from src.models.llm import get_llm
 from src.interview.interview_schema import InterviewState
 from src.utils.logger import logger, print_info
+from src.utils.progress import emit_progress, interview_turns
 from src.prompts.answer_prompt import ANSWER_INSTRUCTIONS
+from src.utils.token_budget import budget_context
+from src.interview.context_window import select_answer_context
+from src.search.passage_ranker import rank_passages
+from src.config.default_settings import DEFAULT_ANSWER_CONTEXT_TOKEN_BUDGET, DEFAULT_PASSAGE_RANKING_ENABLED
 
 
 
+def _answer_messages(state: InterviewState) -> list:
+    """Build the prompt for the expert's answer."""
+    analyst = state["analyst"]
+    messages = state["messages"]
+
+    question = messages[-1].content if messages else None
+    # The current turn's sources plus a bounded part of the earlier ones
+    documents = select_answer_context(state, question)
+    if DEFAULT_PASSAGE_RANKING_ENABLED:
+        # Only the passages relevant to the latest question, with their source tags
+        documents = rank_passages(documents, question)
+
+    # Keep the documents most relevant to the latest question within the token budget
+    context = budget_context(
+        documents,
+        DEFAULT_ANSWER_CONTEXT_TOKEN_BUDGET,
+        query=question,
+        node="generate_answer"
+    )
+
+    system_message = ANSWER_INSTRUCTIONS.format(goals=analyst.persona, context=context)
+    return [SystemMessage(content=system_message)] + messages
+
+
+def _report_turn(state: InterviewState) -> None:
+    """Report the answered turn to the caller of the graph."""
+    emit_progress({"type": "interview", "status": "turn", "analyst": state["analyst"].name,
+                   "turn": interview_turns(state) + 1, "max_turns": state.get("max_num_turns", 1)})
+
+
 def generate_answer(state: InterviewState):
 
     """ Node to answer a question """
 
     logger.info("Generating answer...")
 
-    # Get state
-    analyst = state["analyst"]
-    messages = state["messages"]
-    context = state["context"]
-
     # Answer question
-    system_message = ANSWER_INSTRUCTIONS.format(goals=analyst.persona, context=context)
-    answer = llm.invoke([SystemMessage(content=system_message)]+messages)
+    answer = get_llm("generate_answer").invoke(_answer_messages(state))
 
     print_info(f"Answer: \n{answer.content}")
     logger.info("Answer is generated successfully")
 
     # Name the message as coming from the expert
     answer.name = "expert"
+    _report_turn(state)
 
     # Append it to state
-    return {"messages": [answer]} 
\ No newline at end of file
+    return {"messages": [answer]}
+
+
+async def agenerate_answer(state: InterviewState):
+
+    """ Async node to answer a question """
+
+    logger.info("Generating answer...")
+
+    answer = await get_llm("generate_answer").ainvoke(_answer_messages(state))
+
+    print_info(f"Answer: \n{answer.content}")
+    logger.info("Answer is generated successfully")
+
+    answer.name = "expert"
+    _report_turn(state)
+
+    return {"messages": [answer]}
@@ -0,0 +1,104 @@
+"""
+Context window strategies for the expert's answers.
+
+`InterviewState.context` accumulates the sources of every turn, so sending all
+of it with each answer makes the cost of an interview quadratic in its number
+of turns. The expert only needs the current turn's sources plus, depending on
+DEFAULT_INTERVIEW_CONTEXT_STRATEGY, a bounded part of the earlier ones (the
+earlier answers are already in the transcript):
+
+- "full": every source of the interview (the previous behaviour)
+- "sliding": the sources of the last DEFAULT_CONTEXT_WINDOW_TURNS turns
+- "summaries": the current turn's sources, plus extractive summaries of the
+  earlier sources sharing a budget of DEFAULT_CONTEXT_SUMMARY_CHARS characters
+- "cited": the current turn's sources, plus earlier sources the expert cited
+
+write_section always sees the full context.
+"""
+
+import re
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage
+
+from src.config.default_settings import (
+    DEFAULT_INTERVIEW_CONTEXT_STRATEGY,
+    DEFAULT_CONTEXT_WINDOW_TURNS,
+    DEFAULT_CONTEXT_SUMMARY_CHARS,
+)
+from src.interview.interview_schema import InterviewState
+from src.search.document_store import resolve_context
+from src.utils.logger import logger
+from src.utils.token_budget import split_documents
+
+CONTEXT_STRATEGIES = ("full", "sliding", "summaries", "cited")
+
+_DOCUMENT_SOURCE = re.compile(r'(?:href|source)="([^"]+)"')
+
+
+def _turns(state: InterviewState) -> List[List[str]]:
+    """Return the context entries of each turn, oldest first."""
+    turns = state.get("context_turns")
+    if not turns:
+        # Context written without turn boundaries counts as a single turn
+        return [list(state.get("context", []))]
+    return [list(turn) for turn in turns]
+
+
+def document_source(document: str) -> Optional[str]:
+    """Return the href or source of a formatted document, None when it has neither."""
+    match = _DOCUMENT_SOURCE.search(document.partition("\n")[0])
+    return match.group(1) if match else None
+
+
+def _cited(documents: List[str], state: InterviewState) -> List[str]:
+    """Keep the documents whose source appears in one of the expert's answers."""
+    answers = "\n".join(
+        str(message.content) for message in state["messages"]
+        if isinstance(message, AIMessage) and message.name == "expert"
+    )
+    return [document for document in documents if (document_source(document) or "\x00") in answers]
+
+
+def _summaries(documents: List[str], question: Optional[str], budget: int) -> List[str]:
+    """Compress documents to their sentences most relevant to the question, within a shared budget."""
+    if not documents:
+        return []
+    from src.search.compression import compress_document
+    per_document = max(budget // len(documents), 1)
+    return [compress_document(document, question or "", per_document) for document in documents]
+
+
+def select_answer_context(state: InterviewState, question: Optional[str] = None,
+                          strategy: str = DEFAULT_INTERVIEW_CONTEXT_STRATEGY) -> List[str]:
+    """
+    Select the documents the expert sees for the current answer.
+
+    Args:
+        state: The current interview state
+        question: The latest question (used by the "summaries" strategy)
+        strategy: One of CONTEXT_STRATEGIES
+
+    Returns:
+        Formatted documents, earlier turns first
+    """
+    if strategy not in CONTEXT_STRATEGIES:
+        raise ValueError(f"Unknown interview context strategy {strategy!r}, expected one of {CONTEXT_STRATEGIES}")
+
+    turns = _turns(state)
+    if strategy == "full" or len(turns) <= 1:
+        return split_documents(resolve_context(state.get("context", [])))
+
+    if strategy == "sliding":
+        window = [entry for turn in turns[-max(DEFAULT_CONTEXT_WINDOW_TURNS, 1):] for entry in turn]
+        return split_documents(resolve_context(window))
+
+    current = split_documents(resolve_context(turns[-1]))
+    earlier = [document for document in split_documents(resolve_context([entry for turn in turns[:-1] for entry in turn]))
+               if document not in current]
+    if strategy == "cited":
+        kept = _cited(earlier, state)
+    else:
+        kept = _summaries(earlier, question, DEFAULT_CONTEXT_SUMMARY_CHARS)
+    logger.debug(f"Context window [{strategy}]: {len(current)} current and {len(kept)}/{len(earlier)} earlier documents")
+    return kept + current
@@ -0,0 +1,129 @@
+"""
+Information-gain based early stopping for interviews.
+
+After each answer, the novelty of the turn is measured on three signals:
+- sources: share of the turn's sources that no earlier turn retrieved
+- passages: share of the terms of the turn's documents absent from earlier documents
+- answer: 1 - the highest term overlap of the answer with an earlier answer
+
+Their weighted mean is the turn's information gain. Once an interview has had
+DEFAULT_EARLY_STOP_MIN_TURNS turns, it ends as soon as a turn's gain falls
+below DEFAULT_EARLY_STOP_GAIN_THRESHOLD, so a high turn ceiling only costs
+turns that still surface something new.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Set
+
+from langchain_core.messages import AIMessage
+
+from src.config.default_settings import (
+    DEFAULT_EARLY_STOP_MIN_TURNS,
+    DEFAULT_EARLY_STOP_GAIN_THRESHOLD,
+    DEFAULT_EARLY_STOP_WEIGHTS,
+)
+from src.interview.context_window import document_source
+from src.interview.interview_schema import InterviewState
+from src.search.document_store import resolve_context
+from src.search.passage_ranker import tokenize
+from src.utils.logger import logger
+from src.utils.token_budget import split_documents
+
+
+def _overlap(first: Set[str], second: Set[str]) -> float:
+    """Share of the first set's terms that also occur in the second."""
+    return len(first & second) / len(first) if first else 1.0
+
+
+def turn_novelty(state: InterviewState, name: str = "expert") -> Optional[Dict[str, float]]:
+    """
+    Measure how much the latest turn added to the interview.
+
+    Args:
+        state: The current interview state
+        name: Name of the answering messages
+
+    Returns:
+        Dict with the "sources", "passages" and "answer" novelty (0 to 1) and
+        their weighted "gain", or None for the first turn
+    """
+    turns = state.get("context_turns") or []
+    answers = [str(message.content) for message in state["messages"]
+               if isinstance(message, AIMessage) and message.name == name]
+    if len(answers) < 2:
+        return None
+
+    current = split_documents(resolve_context(turns[-1])) if turns else []
+    earlier = split_documents(resolve_context([entry for turn in turns[:-1] for entry in turn]))
+
+    earlier_sources = {document_source(document) for document in earlier}
+    current_sources = [document_source(document) for document in current]
+    sources = (sum(source not in earlier_sources for source in current_sources) / len(current_sources)
+               if current_sources else 0.0)
+
+    earlier_terms = {term for document in earlier for term in tokenize(document)}
+    passages = 1.0 - _overlap({term for document in current for term in tokenize(document)}, earlier_terms)
+
+    answer_terms = set(tokenize(answers[-1]))
+    answer = 1.0 - max(_overlap(answer_terms, set(tokenize(previous))) for previous in answers[:-1])
+
+    novelty = {"sources": sources, "passages": passages, "answer": answer}
+    total_weight = sum(DEFAULT_EARLY_STOP_WEIGHTS.values()) or 1.0
+    novelty["gain"] = sum(DEFAULT_EARLY_STOP_WEIGHTS.get(signal, 0.0) * value
+                          for signal, value in novelty.items()) / total_weight
+    return novelty
+
+
+_stats = {"interviews": 0, "stopped_early": 0, "turns_saved": 0}
+_stats_lock = threading.Lock()
+
+
+def should_stop_early(state: InterviewState, num_responses: int, max_num_turns: int,
+                      min_turns: int = DEFAULT_EARLY_STOP_MIN_TURNS,
+                      threshold: float = DEFAULT_EARLY_STOP_GAIN_THRESHOLD) -> bool:
+    """
+    Decide whether an interview should end before its turn ceiling.
+
+    Args:
+        state: The current interview state
+        num_responses: Answers given so far
+        max_num_turns: Turn ceiling of the interview
+        min_turns: Turns every interview gets
+        threshold: Information gain below which the interview ends
+
+    Returns:
+        True when the latest turn's gain is below the threshold
+    """
+    if num_responses < max(min_turns, 2):
+        return False
+    novelty = turn_novelty(state)
+    if novelty is None:
+        return False
+    logger.debug(f"Turn {num_responses} novelty: {novelty}")
+    if novelty["gain"] >= threshold:
+        return False
+
+    saved = max_num_turns - num_responses
+    with _stats_lock:
+        _stats["stopped_early"] += 1
+        _stats["turns_saved"] += saved
+    logger.info(f"Ending interview after {num_responses}/{max_num_turns} turns, information gain "
+                f"{novelty['gain']:.2f} < {threshold:.2f} (saved {saved} turns)")
+    return True
+
+
+def record_interview_end() -> None:
+    """Count an interview that reached its end, early or not."""
+    with _stats_lock:
+        _stats["interviews"] += 1
+
+
+def early_stopping_stats() -> Dict[str, Any]:
+    """
+    Return early stopping counters.
+
+    Returns:
+        Dict with the number of interviews, interviews stopped early and turns saved
+    """
+    with _stats_lock:
+        return dict(_stats)
@@ -7,9 +7,18 @@ from langchain_core.messages import get_buffer_string, AIMessage, HumanMessage,
 
 
 from src.interview.interview_schema import InterviewState
-from src.models.llm import llm
+from src.models.llm import get_llm
 from src.utils.logger import logger, print_info
 from src.prompts.section_prompt import SECTION_WRITER_INSTRUCTIONS
+from src.utils.token_budget import budget_context
+from src.search.document_store import resolve_context
+from src.interview.early_stopping import should_stop_early, record_interview_end
+from src.utils.progress import emit_progress
+from src.config.default_settings import (
+    DEFAULT_SECTION_CONTEXT_TOKEN_BUDGET,
+    DEFAULT_EARLY_STOPPING_ENABLED,
+    DEFAULT_INCREMENTAL_REDUCE,
+)
 
 def save_transcript(state: InterviewState) -> Dict[str, Any]:
     """
@@ -49,6 +58,7 @@ def route_messages(state: InterviewState,
 
     # End if expert has answered more than the max turns
     if num_responses >= max_num_turns:
+        record_interview_end()
         return 'save_transcript'
 
     # This router is run after each question - answer pair
@@ -56,28 +66,65 @@ def route_messages(state: InterviewState,
     last_question = messages[-2]
 
     if "Thank you so much for your help" in last_question.content:
+        record_interview_end()
+        return 'save_transcript'
+
+    # End once the turns stop surfacing new information
+    if DEFAULT_EARLY_STOPPING_ENABLED and should_stop_early(state, num_responses, max_num_turns):
+        record_interview_end()
+        emit_progress({"type": "interview", "status": "stopped_early", "analyst": state["analyst"].name,
+                       "turn": num_responses, "max_turns": max_num_turns})
         return 'save_transcript'
     return "ask_question"
 
 
 
+def _section_messages(state: InterviewState) -> list:
+    """Build the prompt for writing a report section from an interview."""
+    analyst = state["analyst"]
+    context = budget_context(
+        resolve_context(state["context"]),
+        DEFAULT_SECTION_CONTEXT_TOKEN_BUDGET,
+        query=analyst.description,
+        node="write_section"
+    )
+
+    # Write section using either the gathered source docs from interview (context) or the interview itself (interview)
+    system_message = SECTION_WRITER_INSTRUCTIONS.format(focus=analyst.description)
+    return [SystemMessage(content=system_message)]+[HumanMessage(content=f"Use this source to write your section: {context}")]
+
+
+def _fold_section(section: str) -> None:
+    """Fold the section into the run's report draft while other interviews are still running."""
+    if DEFAULT_INCREMENTAL_REDUCE:
+        from src.report_generation.report_draft import get_report_draft
+        get_report_draft().fold(section)
+
+
 def write_section(state: InterviewState):
 
     """ Node to answer a question """
 
     logger.info("Writing a section...")
 
-    # Get state
-    interview = state["interview"]
-    context = state["context"]
-    analyst = state["analyst"]
-
-    # Write section using either the gathered source docs from interview (context) or the interview itself (interview)
-    system_message = SECTION_WRITER_INSTRUCTIONS.format(focus=analyst.description)
-    section = llm.invoke([SystemMessage(content=system_message)]+[HumanMessage(content=f"Use this source to write your section: {context}")])
+    section = get_llm("write_section").invoke(_section_messages(state))
 
     logger.info("Section is generated successfully")
+    _fold_section(section.content)
 
     # Append it to state
     return {"sections": [section.content]}
 
+
+async def awrite_section(state: InterviewState):
+
+    """ Async node to write a section """
+
+    logger.info("Writing a section...")
+
+    section = await get_llm("write_section").ainvoke(_section_messages(state))
+
+    logger.info("Section is generated successfully")
+    _fold_section(section.content)
+
+    return {"sections": [section.content]}
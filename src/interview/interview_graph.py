@@ -1,12 +1,13 @@
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import START, END, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
 
-from src.interview.question_generator import generate_question
-from src.search.web_search import search_web, search_wikipedia
-from src.interview.answer_generator import generate_answer
+from src.interview.question_generator import generate_question, agenerate_question
+from src.search.web_search import plan_queries, aplan_queries
+from src.search.search_fanout import search_sources, asearch_sources
+from src.interview.answer_generator import generate_answer, agenerate_answer
 from src.interview.interview_schema import InterviewState
-from src.interview.interview_components import save_transcript, write_section, route_messages
+from src.interview.interview_components import save_transcript, write_section, awrite_section, route_messages
 
 def build_interview_graph():
     """
@@ -18,20 +19,21 @@ def build_interview_graph():
     # Initialize graph builder
     builder = StateGraph(InterviewState)
     
-    # Add nodes
-    builder.add_node("ask_question", generate_question)
-    builder.add_node("search_web", search_web)
-    builder.add_node("search_wikipedia", search_wikipedia)
-    builder.add_node("answer_question", generate_answer)
+    # Add nodes (sync implementations for stream(), async ones for astream())
+    builder.add_node("ask_question", RunnableLambda(generate_question, afunc=agenerate_question))
+    builder.add_node("plan_queries", RunnableLambda(plan_queries, afunc=aplan_queries))
+    builder.add_node("search", RunnableLambda(search_sources, afunc=asearch_sources))
+    builder.add_node("answer_question", RunnableLambda(generate_answer, afunc=agenerate_answer))
     builder.add_node("save_transcript", save_transcript)
-    builder.add_node("write_section", write_section)
+    builder.add_node("write_section", RunnableLambda(write_section, afunc=awrite_section))
     
     # Add edges
     builder.add_edge(START, "ask_question")
-    builder.add_edge("ask_question", "search_web")
-    builder.add_edge("ask_question", "search_wikipedia")
-    builder.add_edge("search_web", "answer_question")
-    builder.add_edge("search_wikipedia", "answer_question")
+    # The queries are planned once per turn and shared by all search backends
+    builder.add_edge("ask_question", "plan_queries")
+    # All enabled search backends are queried concurrently within their deadlines
+    builder.add_edge("plan_queries", "search")
+    builder.add_edge("search", "answer_question")
 
     # Conditional branching
     builder.add_conditional_edges("answer_question", route_messages, ['ask_question','save_transcript'])
@@ -40,6 +42,6 @@ def build_interview_graph():
     builder.add_edge("save_transcript", "write_section")
     builder.add_edge("write_section", END)
     
-    # Compile graph
-    memory = MemorySaver()
-    return builder.compile(checkpointer=memory) 
\ No newline at end of file
+    # Compile graph; as conduct_interview it checkpoints into the report graph's
+    # checkpointer, so a resumed run continues interviews from their last turn
+    return builder.compile()
\ No newline at end of file
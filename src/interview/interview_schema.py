@@ -14,11 +14,22 @@ class InterviewState(MessagesState):
     
     max_num_turns: int  # Number turns of conversation
     context: Annotated[list, operator.add]  # Source docs
+    context_turns: Annotated[list, operator.add]  # Source docs of each turn (one list per turn)
     analyst: Analyst  # Analyst asking questions
     interview: str  # Interview transcript
     sections: list  # Final key we duplicate in outer state for Send() API
+    search_queries: dict  # Search query per backend ("web", "wikipedia") for the current turn
 
 class SearchQuery(BaseModel):
     """Search query for retrieval."""
     
-    search_query: str = Field(None, description="Search query for retrieval.") 
\ No newline at end of file
+    search_query: str = Field(None, description="Search query for retrieval.") 
+class SearchPlan(BaseModel):
+    """Backend-specific search queries for one interview turn."""
+
+    web_query: str = Field(
+        description="Well-structured web search query for the analyst's final question."
+    )
+    wikipedia_query: str = Field(
+        description="Short Wikipedia search query (a few words naming the most relevant encyclopedia topic)."
+    )
@@ -5,12 +5,22 @@ Generate analyst questions for interviews.
 from typing import Dict, Any
 from langchain_core.messages import SystemMessage
 
-from src.models.llm import llm
+from src.models.llm import get_llm
 from src.interview.interview_schema import InterviewState
 from src.utils.logger import logger, print_info
 from src.prompts.question_prompt import QUESTION_INSTRUCTIONS
 
 
+def _question_messages(state: InterviewState) -> list:
+    """Build the prompt for the analyst's next question."""
+    analyst = state["analyst"]
+    messages = state["messages"]
+
+    # Generate question based on the analyst's persona
+    system_message = QUESTION_INSTRUCTIONS.format(goals=analyst.persona)
+    return [SystemMessage(content=system_message)] + messages
+
+
 def generate_question(state: InterviewState) -> Dict[str, Any]:
     """
     Generate the next question from an analyst.
@@ -22,17 +32,31 @@ def generate_question(state: InterviewState) -> Dict[str, Any]:
         Dict with the updated messages
     """
     logger.info("Generating question...")
-    # Get state
-    analyst = state["analyst"]
-    messages = state["messages"]
-
-    # Generate question based on the analyst's persona
-    system_message = QUESTION_INSTRUCTIONS.format(goals=analyst.persona)
-    question = llm.invoke([SystemMessage(content=system_message)] + messages)
+    question = get_llm("generate_question").invoke(_question_messages(state))
 
     print_info(f"Question: \n{question.content}")
 
     logger.info("Question Generated Successfully")
 
     # Write messages to state
-    return {"messages": [question]} 
\ No newline at end of file
+    return {"messages": [question]}
+
+
+async def agenerate_question(state: InterviewState) -> Dict[str, Any]:
+    """
+    Async version of generate_question.
+    
+    Args:
+        state: The current interview state
+        
+    Returns:
+        Dict with the updated messages
+    """
+    logger.info("Generating question...")
+    question = await get_llm("generate_question").ainvoke(_question_messages(state))
+
+    print_info(f"Question: \n{question.content}")
+
+    logger.info("Question Generated Successfully")
+
+    return {"messages": [question]}
@@ -7,8 +7,10 @@ This script demonstrates how to use the Research Assistant.
 import asyncio
 import argparse
 import traceback
-from src.agents.research_assistant import ResearchAssistant
-from src.config.settings import AZURE_OPENAI_API_KEY, TAVILY_API_KEY
+from collections import OrderedDict
+from typing import Optional
+from src.agents.research_assistant import ResearchAssistant, ProgressEvent, REPORT_PART_LABELS
+from src.config.settings import get_setting, init_config
 from src.utils.helpers import (
     set_env_var, 
     is_empty
@@ -30,6 +32,102 @@ from src.config.default_settings import (
     DEFAULT_OUTPUT_FILE
 )
 
+class ReportStreamPrinter:
+    """
+    Print report parts to the terminal as their tokens arrive.
+
+    The report parts are written in parallel, so only one part is printed live
+    at a time; tokens of the other parts are buffered and printed once the live
+    part is complete.
+    """
+
+    def __init__(self):
+        self.live_part = None
+        self.pending = OrderedDict()  # part -> [buffered text, is complete]
+
+    def _start(self, part: str) -> None:
+        self.live_part = part
+        print(f"\n{Colors.MAGENTA}Report {REPORT_PART_LABELS[part]}:{Colors.RESET}")
+
+    def _finish(self) -> None:
+        print("\n", flush=True)
+        self.live_part = None
+
+    def _drain(self) -> None:
+        while self.pending and self.live_part is None:
+            part, (text, complete) = self.pending.popitem(last=False)
+            self._start(part)
+            print(text, end="", flush=True)
+            if complete:
+                self._finish()
+
+    def token(self, part: str, text: str) -> None:
+        """Handle new tokens for a report part."""
+        if self.live_part is None and part not in self.pending:
+            self._start(part)
+        if part == self.live_part:
+            print(text, end="", flush=True)
+        else:
+            self.pending.setdefault(part, ["", False])[0] += text
+
+    def part_complete(self, part: str, text: str) -> None:
+        """Handle a completed report part (also used when nothing was streamed)."""
+        if part == self.live_part:
+            self._finish()
+        elif part in self.pending:
+            self.pending[part] = [self.pending[part][0] or text, True]
+        else:
+            self.pending[part] = [text, True]
+        self._drain()
+
+
+def print_progress(event: ProgressEvent) -> None:
+    """Print the progress of each interview."""
+    if event["type"] != "interview":
+        return
+    analyst, status = event["analyst"], event["status"]
+    if status == "started":
+        print_info(f"Interview of {analyst} started")
+    elif status == "turn":
+        print_info(f"{analyst}: turn {event['turn']}/{event['max_turns']} answered")
+    elif status == "stopped_early":
+        print_info(f"{analyst}: ending after {event['turn']}/{event['max_turns']} turns, no new information")
+    elif status == "completed":
+        print_success(f"Interview of {analyst} completed ({event['turn']} turns)")
+
+
+async def stream_report(assistant: ResearchAssistant, output_file: str) -> Optional[str]:
+    """
+    Conduct the interviews and print the report incrementally.
+
+    Args:
+        assistant: Research assistant with generated analysts
+        output_file: File to save the report to
+
+    Returns:
+        The generated report or None if there was an error
+    """
+    printer = ReportStreamPrinter()
+    # Closed explicitly (contextlib.aclosing needs Python 3.10), so the run is released right away
+    stream = assistant.astream_report(output_file)
+    try:
+        async for event in stream:
+            if event["type"] == "section":
+                print_success("Interview section completed")
+            elif event["type"] == "token":
+                printer.token(event["part"], event["text"])
+            elif event["type"] == "part":
+                printer.part_complete(event["part"], event["text"])
+            elif event["type"] == "final_report":
+                return event["text"]
+    except Exception as e:
+        logger.error(f"Error in interview and report generation: {str(e)}")
+        print_error(f"Error in interview and report generation: {str(e)}")
+        traceback.print_exc()
+    finally:
+        await stream.aclose()
+    return None
+
 async def main():
     """Main entry point for the Research Assistant."""
     
@@ -47,6 +145,8 @@ async def main():
                         help='Maximum number of conversation turns per interview')
     parser.add_argument('--output', type=str, default=DEFAULT_OUTPUT_FILE,
                         help='Output file for the research report')
+    parser.add_argument('--resume', type=str, default=None, metavar='RUN_ID',
+                        help='Resume an interrupted run from its last checkpoint')
     args = parser.parse_args()
     
     # Log the configuration
@@ -55,29 +155,37 @@ async def main():
     logger.info(f"Max interview turns: {args.turns}")
     logger.info(f"Output file: {args.output}")
     
-    # Set environment variables if not set
-    set_env_var("AZURE_OPENAI_API_KEY", AZURE_OPENAI_API_KEY)
-    set_env_var("TAVILY_API_KEY", TAVILY_API_KEY)
+    # Warn about missing keys, then set environment variables if not set
+    init_config()
+    set_env_var("AZURE_OPENAI_API_KEY", get_setting("AZURE_OPENAI_API_KEY"))
+    set_env_var("TAVILY_API_KEY", get_setting("TAVILY_API_KEY"))
     
     # Initialize the research assistant
     assistant = ResearchAssistant()
-    assistant.set_topic(args.topic, args.analysts, args.turns)
-    
-    # Run the entire research process
-    report = await assistant.run_research_process(args.output)
+    assistant.subscribe(print_progress)
+    report = None
+    if args.resume:
+        if not assistant.resume(args.resume):
+            return
+        if assistant.final_report:
+            # The run had already completed
+            report = assistant.final_report
+        elif assistant.analysts:
+            report = await stream_report(assistant, args.output)
+        elif await assistant.prepare_analysts():
+            report = await stream_report(assistant, args.output)
+    else:
+        assistant.set_topic(args.topic, args.analysts, args.turns)
+        print_info(f"Run id: {assistant.thread_id} (continue it after an interruption with --resume {assistant.thread_id})")
+
+        # Generate and review analysts, then stream the report as it is written
+        if await assistant.prepare_analysts():
+            report = await stream_report(assistant, args.output)
     
     # Check if report is empty
     if is_empty(report):
         print_warning("No report content was generated.")
         logger.warning("Empty report generated")
-    else:
-        # Print report (truncated if very long)
-        if len(report) > 500:
-            print(f"\n{Colors.MAGENTA}Report Preview:{Colors.RESET}")
-            print(f"{report[:500]}...\n{Colors.BRIGHT_BLACK}(Truncated - see full report in {args.output}){Colors.RESET}")
-        else:
-            print(f"\n{Colors.MAGENTA}Generated Report:{Colors.RESET}")
-            print(report)
     if report:
         print_section_header("RESEARCH COMPLETE")
         print_success(f"Research process completed! Report saved to {args.output}")
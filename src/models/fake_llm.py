@@ -0,0 +1,427 @@
+"""
+Deterministic offline stand-in for the chat model.
+
+FakeChatModel answers every prompt used by the research pipeline without
+network access: structured calls (Perspectives, SearchQuery, SearchPlan,
+IntroConclusion) return schema-valid tool calls, and text calls return
+questions, answers, sections and report parts of realistic length that cite the
+documents in their prompt. Outputs depend only on the prompt and the seed. Latency follows a
+configurable profile and 429 responses can be injected at a fixed rate, so the
+full graph can be benchmarked on a laptop under controlled conditions.
+
+Enable it with LLM_PROVIDER=fake (see initialize_client).
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.config.default_settings import DEFAULT_FAKE_LATENCY_PROFILES
+
+# Words per streamed chunk
+STREAM_CHUNK_WORDS = 3
+
+STOPWORDS = {
+    "a", "about", "an", "and", "are", "as", "at", "be", "by", "can", "could", "do",
+    "does", "for", "from", "how", "i", "in", "is", "it", "me", "more", "of", "on",
+    "or", "so", "tell", "that", "the", "this", "to", "was", "what", "when", "where",
+    "which", "who", "why", "with", "you", "your", "said", "were", "writing", "article",
+}
+
+SENTENCE_TEMPLATES = [
+    "Practitioners point to {term} as one of the main drivers of adoption.",
+    "Evidence on {term} is still mixed, but early deployments report measurable gains.",
+    "The cost of {term} has fallen quickly, which changes the trade-offs for smaller teams.",
+    "A recurring concern with {term} is how failures are detected and corrected in time.",
+    "Case studies of {term} show that narrow, well-documented workflows benefit first.",
+    "Teams that measure {term} end to end often find bottlenecks outside the model itself.",
+    "Regulators increasingly ask how {term} is audited and who is accountable for its decisions.",
+    "The most surprising finding about {term} is how much depends on tooling rather than model size.",
+    "Organisations that paired {term} with human review reported fewer costly mistakes.",
+    "Benchmarks for {term} rarely capture the messy conditions of production environments.",
+]
+
+PERSONAS = [
+    ("Dr. Maya Chen", "Principal Research Scientist", "Institute for Human-Centered AI"),
+    ("Daniel Okafor", "Head of Intelligent Automation", "Northwind Bank"),
+    ("Sofia Ramirez", "Clinical Informatics Lead", "Mercy Health System"),
+    ("Lars Eriksson", "Staff Software Engineer", "Fjord Labs"),
+    ("Priya Nair", "AI Policy Fellow", "Centre for Technology Policy"),
+    ("Tom Becker", "Director of Operations", "Atlas Logistics"),
+]
+
+THEMES = [
+    "real-world adoption",
+    "reliability and evaluation",
+    "safety and human oversight",
+    "cost and economics",
+    "collaboration between people and agents",
+    "tooling and infrastructure",
+]
+
+
+class FakeRateLimitError(Exception):
+    """429 response injected by FakeChatModel, shaped like openai.RateLimitError."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__("Rate limit reached (injected by the offline fake model)")
+        self.response = SimpleNamespace(headers={"retry-after": str(retry_after)})
+
+
+def sample_latency(profile: str, rng: random.Random, output_tokens: int = 0) -> float:
+    """
+    Draw a simulated latency from a latency profile.
+
+    The time to first token is log-normal around the profile median; generation
+    adds a fixed time per output token.
+
+    Args:
+        profile: Name of a profile in DEFAULT_FAKE_LATENCY_PROFILES
+        rng: Random generator to draw from
+        output_tokens: Number of generated tokens
+
+    Returns:
+        Latency in seconds
+    """
+    settings = DEFAULT_FAKE_LATENCY_PROFILES[profile]
+    if settings["median"] <= 0:
+        first_token = 0.0
+    else:
+        first_token = math.exp(rng.gauss(math.log(settings["median"]), settings["sigma"]))
+    return first_token + output_tokens * settings["per_token"]
+
+
+def keywords(text: str, limit: int = 6) -> List[str]:
+    """Return the first distinct content words of a text."""
+    terms = []
+    for term in re.findall(r"[A-Za-z][A-Za-z\-]+", text.lower()):
+        if term not in STOPWORDS and len(term) > 2 and term not in terms:
+            terms.append(term)
+        if len(terms) == limit:
+            break
+    return terms
+
+
+def _question_terms(question: str, limit: int) -> List[str]:
+    # Skip the analyst introducing themselves
+    return keywords(re.sub(r"^Thanks, I'm [^!]+!", "", question), limit)
+
+
+def _sources_in_documents(text: str) -> List[str]:
+    # Only tags at the start of a line, prompts also contain example tags inline
+    return list(dict.fromkeys(re.findall(r'^<Document (?:href|source)="([^"]+)"', text, re.M)))
+
+
+def _sources_in_memos(text: str) -> List[str]:
+    return list(dict.fromkeys(source.strip() for source in re.findall(r"^\[\d+\] (.+?)\s*$", text, re.M)))
+
+
+def _source_list(sources: List[str]) -> str:
+    return "\n".join(f"[{number}] {source}  " for number, source in enumerate(sources, 1))
+
+
+_stats = {"calls": 0, "rate_limited": 0, "simulated_seconds": 0.0, "output_tokens": 0}
+_attempts: Dict[str, int] = {}
+_stats_lock = threading.Lock()
+
+
+def fake_llm_stats() -> Dict[str, Any]:
+    """Return counters of all FakeChatModel calls in this process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_fake_llm_stats() -> None:
+    """Reset the FakeChatModel counters and per-prompt attempt numbers."""
+    with _stats_lock:
+        _stats.update(calls=0, rate_limited=0, simulated_seconds=0.0, output_tokens=0)
+        _attempts.clear()
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline chat model producing deterministic, schema-valid responses."""
+
+    model_name: str = "fake-chat"
+    temperature: float = 0.0
+    max_tokens: Optional[int] = None
+    latency_profile: str = "none"
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "temperature": self.temperature,
+                "max_tokens": self.max_tokens, "seed": self.seed}
+
+    def bind_tools(self, tools: list, tool_choice: Optional[Any] = None, **kwargs: Any):
+        """Bind tools in the OpenAI format, as ChatOpenAI does."""
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        if tool_choice:
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(tools=formatted, **kwargs)
+
+    # Call planning
+
+    def _prompt_key(self, messages: List[BaseMessage], tools: Optional[list]) -> str:
+        payload = json.dumps([[message.type, str(message.content)] for message in messages], sort_keys=True)
+        payload += json.dumps(tools or [], sort_keys=True, default=str)
+        return hashlib.sha256(f"{self.seed}\x00{self.model_name}\x00{payload}".encode()).hexdigest()
+
+    def _plan_call(self, messages: List[BaseMessage], tools: Optional[list]) -> Tuple[AIMessage, float, float]:
+        """
+        Build the response of a call and decide its latency and whether it fails.
+
+        The content depends only on the prompt; the latency and the injected 429s
+        also depend on how often the same prompt has been sent, so that retries
+        eventually succeed.
+
+        Returns:
+            Tuple of (response message, time to first token, generation time) in seconds
+
+        Raises:
+            FakeRateLimitError: When a 429 is injected for this attempt
+        """
+        key = self._prompt_key(messages, tools)
+        with _stats_lock:
+            attempt = _attempts.get(key, 0)
+            _attempts[key] = attempt + 1
+
+        attempt_rng = random.Random(f"{key}:{attempt}")
+        if attempt_rng.random() < self.rate_limit_rate:
+            with _stats_lock:
+                _stats["rate_limited"] += 1
+            raise FakeRateLimitError(self.retry_after)
+
+        message = self._respond(messages, tools, random.Random(key), key)
+        output_tokens = len(str(message.content)) // 4 + sum(
+            len(json.dumps(call["args"])) // 4 for call in message.tool_calls
+        )
+        input_tokens = sum(len(str(message.content)) for message in messages) // 4
+        message.usage_metadata = {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                                  "total_tokens": input_tokens + output_tokens}
+        first_token = sample_latency(self.latency_profile, attempt_rng)
+        generation = output_tokens * DEFAULT_FAKE_LATENCY_PROFILES[self.latency_profile]["per_token"]
+
+        with _stats_lock:
+            _stats["calls"] += 1
+            _stats["simulated_seconds"] += first_token + generation
+            _stats["output_tokens"] += output_tokens
+        return message, first_token, generation
+
+    # Response content
+
+    def _respond(self, messages: List[BaseMessage], tools: Optional[list],
+                 rng: random.Random, key: str) -> AIMessage:
+        prompt = "\n\n".join(str(message.content) for message in messages)
+        last = str(messages[-1].content) if messages else ""
+
+        if tools:
+            function = tools[0].get("function", tools[0])
+            name = function["name"]
+            if name == "Perspectives":
+                args = self._perspectives(prompt, rng)
+            elif name == "SearchQuery":
+                args = {"search_query": " ".join(_question_terms(last, 8)) or "research overview"}
+            elif name == "SearchPlan":
+                args = {"web_query": " ".join(_question_terms(last, 8)) or "research overview",
+                        "wikipedia_query": " ".join(_question_terms(last, 3)) or "research"}
+            elif name == "IntroConclusion":
+                args = {"introduction": self._introduction(prompt, rng),
+                        "conclusion": self._conclusion(prompt, rng)}
+            else:
+                args = self._fill_schema(function.get("parameters", {}), rng, keywords(prompt))
+            return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{key[:16]}"}])
+
+        if "interviewing an expert" in prompt:
+            content = self._question(prompt, last, rng)
+        elif "expert being interviewed" in prompt:
+            content = self._answer(prompt, last, rng)
+        elif "expert technical writer" in prompt:
+            content = self._section(prompt, rng)
+        elif "creating a report on this overall topic" in prompt:
+            content = self._report(prompt, rng)
+        elif "finishing a report on" in prompt and "conclusion" in last.lower():
+            content = self._conclusion(prompt, rng)
+        elif "finishing a report on" in prompt:
+            content = self._introduction(prompt, rng)
+        else:
+            content = self._paragraph(rng, keywords(last) or ["the topic"], 4)
+
+        if self.max_tokens:
+            content = content[:self.max_tokens * 4]
+        return AIMessage(content=content)
+
+    def _paragraph(self, rng: random.Random, terms: List[str], sentences: int,
+                   citations: int = 0) -> str:
+        result = []
+        for index in range(sentences):
+            sentence = rng.choice(SENTENCE_TEMPLATES).format(term=" ".join(rng.sample(terms, min(2, len(terms)))))
+            if citations:
+                sentence = sentence[:-1] + f" [{index % citations + 1}]."
+            result.append(sentence)
+        return " ".join(result)
+
+    def _topic(self, prompt: str, pattern: str) -> str:
+        match = re.search(pattern, prompt)
+        return match.group(1).strip() if match else "the research topic"
+
+    def _perspectives(self, prompt: str, rng: random.Random) -> Dict[str, Any]:
+        topic = self._topic(prompt, r"review the research topic:\s*\n(.+)")
+        match = re.search(r"Pick the top (\d+) themes", prompt)
+        count = int(match.group(1)) if match else 3
+        offset = rng.randrange(len(PERSONAS))
+        analysts = []
+        for index in range(count):
+            name, role, affiliation = PERSONAS[(offset + index) % len(PERSONAS)]
+            theme = THEMES[(offset + index) % len(THEMES)]
+            terms = keywords(f"{theme} {topic}")
+            analysts.append({
+                "name": name if index < len(PERSONAS) else f"{name} {index // len(PERSONAS) + 1}",
+                "role": role,
+                "affiliation": affiliation,
+                "description": f"Focuses on {theme} of {topic.lower()}. " + self._paragraph(rng, terms, 2),
+            })
+        return {"analysts": analysts}
+
+    def _question(self, prompt: str, last: str, rng: random.Random) -> str:
+        match = re.search(r"Name: (.+)", prompt)
+        name = match.group(1).strip() if match else "an analyst"
+        terms = keywords(last) + keywords(prompt.split("goals:")[-1])
+        terms = list(dict.fromkeys(terms))[:8] or ["this topic"]
+        first, second = rng.sample(terms, 2) if len(terms) > 1 else (terms[0], terms[0])
+        return (f"Thanks, I'm {name}! {self._paragraph(rng, terms, 1)} "
+                f"Could you give me a specific example of how {first} affects {second}, "
+                f"and what surprised you most about it?")
+
+    def _answer(self, prompt: str, last: str, rng: random.Random) -> str:
+        sources = _sources_in_documents(prompt)
+        terms = _question_terms(last, 8) or ["the topic"]
+        body = (self._paragraph(rng, terms, 3, len(sources)) + "\n\n"
+                + self._paragraph(rng, terms, 3, len(sources)))
+        return f"{body}\n\n{_source_list(sources)}" if sources else body
+
+    def _section(self, prompt: str, rng: random.Random) -> str:
+        focus = self._topic(prompt, r"focus area of the analyst:\s*\n(.+)")
+        sources = _sources_in_documents(prompt)
+        terms = keywords(focus, 8) or ["the topic"]
+        title = " ".join(term.capitalize() for term in terms[:4])
+        return (f"## {title}\n\n### Summary\n\n"
+                f"{self._paragraph(rng, terms, 4, len(sources))}\n\n"
+                f"{self._paragraph(rng, terms, 4, len(sources))}\n\n"
+                f"### Sources\n{_source_list(sources)}")
+
+    def _report(self, prompt: str, rng: random.Random) -> str:
+        topic = self._topic(prompt, r"overall topic:\s*\n\s*(.+)")
+        memos = prompt.split("build your report from:")[-1]
+        sources = _sources_in_memos(memos)
+        terms = keywords(f"{topic} {memos}", 10) or ["the topic"]
+        paragraphs = "\n\n".join(self._paragraph(rng, terms, 4, len(sources)) for _ in range(3))
+        return f"## Insights\n\n{paragraphs}\n\n## Sources\n{_source_list(sources)}"
+
+    def _introduction(self, prompt: str, rng: random.Random) -> str:
+        topic = self._topic(prompt, r"finishing a report on (.+)")
+        terms = keywords(prompt.split("reflect on for writing:")[-1], 10) or keywords(topic)
+        return f"# {topic[:1].upper() + topic[1:]}\n\n## Introduction\n\n{self._paragraph(rng, terms, 5)}"
+
+    def _conclusion(self, prompt: str, rng: random.Random) -> str:
+        topic = self._topic(prompt, r"finishing a report on (.+)")
+        terms = keywords(prompt.split("reflect on for writing:")[-1], 10) or keywords(topic)
+        return f"## Conclusion\n\n{self._paragraph(rng, terms, 5)}"
+
+    def _fill_schema(self, schema: Dict[str, Any], rng: random.Random, terms: List[str]) -> Any:
+        """Generate a value that validates against a (simple) JSON schema."""
+        kind = schema.get("type")
+        if "enum" in schema:
+            return rng.choice(schema["enum"])
+        if kind == "object" or "properties" in schema:
+            return {name: self._fill_schema(prop, rng, terms)
+                    for name, prop in schema.get("properties", {}).items()}
+        if kind == "array":
+            return [self._fill_schema(schema.get("items", {}), rng, terms)
+                    for _ in range(max(1, schema.get("minItems", 1)))]
+        if kind == "integer":
+            return schema.get("minimum", 1)
+        if kind == "number":
+            return float(schema.get("minimum", 1.0))
+        if kind == "boolean":
+            return False
+        return self._paragraph(rng, terms or ["the topic"], 1)
+
+    # BaseChatModel interface
+
+    def _generate(self,
+                  messages: List[BaseMessage],
+                  stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None,
+                  **kwargs: Any) -> ChatResult:
+        message, first_token, generation = self._plan_call(messages, kwargs.get("tools"))
+        time.sleep(first_token + generation)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self,
+                         messages: List[BaseMessage],
+                         stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs: Any) -> ChatResult:
+        message, first_token, generation = self._plan_call(messages, kwargs.get("tools"))
+        await asyncio.sleep(first_token + generation)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, message: AIMessage) -> List[AIMessageChunk]:
+        """Split a response into streamed chunks; usage is reported on the last one."""
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            chunks = [AIMessageChunk(content="", tool_call_chunks=[{
+                "name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0,
+            }])]
+        else:
+            words = re.findall(r"\S+\s*", str(message.content))
+            chunks = [AIMessageChunk(content="".join(words[start:start + STREAM_CHUNK_WORDS]))
+                      for start in range(0, len(words), STREAM_CHUNK_WORDS)] or [AIMessageChunk(content="")]
+        chunks[-1].usage_metadata = message.usage_metadata
+        return chunks
+
+    def _stream(self,
+                messages: List[BaseMessage],
+                stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        message, first_token, generation = self._plan_call(messages, kwargs.get("tools"))
+        chunks = self._chunks(message)
+        time.sleep(first_token)
+        # The generation time is spread evenly over the chunks
+        for chunk in chunks:
+            time.sleep(generation / len(chunks))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self,
+                       messages: List[BaseMessage],
+                       stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        message, first_token, generation = self._plan_call(messages, kwargs.get("tools"))
+        chunks = self._chunks(message)
+        await asyncio.sleep(first_token)
+        for chunk in chunks:
+            await asyncio.sleep(generation / len(chunks))
+            yield ChatGenerationChunk(message=chunk)
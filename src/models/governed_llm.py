@@ -0,0 +1,389 @@
+"""
+Chat model wrapper that routes every completion through the shared rate limiter.
+
+The wrapper delegates to the provider client (AzureChatOpenAI / ChatOpenAI) but
+owns the retry loop, so 429 responses are seen by the limiter instead of being
+retried blindly inside the OpenAI SDK. Async calls from the nodes listed in the
+hedge policy are hedged: when a call is slower than the latency threshold, a
+duplicate is sent and the first response wins.
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables.config import var_child_runnable_config
+
+from src.config.default_settings import DEFAULT_LLM_MAX_RETRIES, DEFAULT_LLM_EXPECTED_OUTPUT_TOKENS
+from src.models.hedging import HedgePolicy
+from src.models.rate_limiter import AdaptiveRateLimiter
+from src.utils.logger import logger
+
+
+def estimate_tokens(messages: List[BaseMessage], tools: Optional[list] = None,
+                    expected_output_tokens: int = DEFAULT_LLM_EXPECTED_OUTPUT_TOKENS) -> int:
+    """Roughly estimate the tokens a call will consume (about 4 characters per token)."""
+    characters = sum(len(str(message.content)) for message in messages)
+    if tools:
+        characters += len(json.dumps(tools, default=str))
+    return characters // 4 + expected_output_tokens
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an exception is a 429 response."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return type(error).__name__ == "RateLimitError"
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Check whether an exception is a timeout, connection or server-side error."""
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and status_code >= 500:
+        return True
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "InternalServerError")
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read the Retry-After delay in seconds from an API error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def get_used_tokens(result: ChatResult) -> Optional[int]:
+    """Read the total tokens consumed by a call from its result."""
+    token_usage = (result.llm_output or {}).get("token_usage") or {}
+    if token_usage.get("total_tokens"):
+        return token_usage["total_tokens"]
+    usage = [
+        generation.message.usage_metadata
+        for generation in result.generations
+        if getattr(generation.message, "usage_metadata", None)
+    ]
+    if usage:
+        return sum(metadata.get("total_tokens", 0) for metadata in usage)
+    return None
+
+
+def _run_metadata(run_manager: Any) -> Dict[str, Any]:
+    """Return the LangGraph metadata of the run a call belongs to."""
+    metadata = getattr(run_manager, "metadata", None)
+    if not metadata:
+        # Streaming calls get no run manager, fall back to the calling node's config
+        config = var_child_runnable_config.get() or {}
+        metadata = config.get("metadata") or {}
+    return metadata
+
+
+def get_node_name(run_manager: Any) -> Optional[str]:
+    """Return the name of the graph node that made a call, if any."""
+    return _run_metadata(run_manager).get("langgraph_node")
+
+
+def get_fairness_key(run_manager: Any) -> str:
+    """
+    Derive the queue a call belongs to from the LangGraph run metadata.
+
+    Calls made inside an interview sub-graph share the first segment of their
+    checkpoint namespace (``conduct_interview:<task id>``), so each interview
+    gets its own queue.
+    """
+    metadata = _run_metadata(run_manager)
+    namespace = metadata.get("langgraph_checkpoint_ns") or metadata.get("checkpoint_ns") or ""
+    return namespace.split("|")[0] or "default"
+
+
+# Latency key of streamed calls; time to first chunk is comparable across nodes
+FIRST_CHUNK = "first_chunk"
+
+
+class GovernedChatModel(BaseChatModel):
+    """Delegating chat model that applies the process-wide rate limiter."""
+
+    inner: BaseChatModel
+    limiter: AdaptiveRateLimiter
+    max_retries: int = DEFAULT_LLM_MAX_RETRIES
+    expected_output_tokens: int = DEFAULT_LLM_EXPECTED_OUTPUT_TOKENS
+    hedge: Optional[HedgePolicy] = None
+    profile: str = "default"
+
+    @property
+    def _llm_type(self) -> str:
+        return f"governed-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        # Keeps cache keys tied to the underlying deployment and temperature
+        return self.inner._identifying_params
+
+    def bind_tools(self, tools: list, **kwargs: Any):
+        """Format tools with the provider client, but bind them to this wrapper."""
+        bound = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**bound.kwargs)
+
+    def _backoff(self, attempt: int) -> float:
+        return min(30.0, 2 ** attempt) * (0.5 + random.random() / 2)
+
+    def _on_failure(self, error: Exception, estimated: int, attempt: int) -> Optional[float]:
+        """
+        Release the slot of a failed call and decide whether to retry it.
+
+        Returns:
+            None to re-raise the error, otherwise the delay before the next attempt
+        """
+        rate_limited = is_rate_limit_error(error)
+        self.limiter.release(estimated, rate_limited=rate_limited, retry_after=get_retry_after(error))
+        if attempt >= self.max_retries or not (rate_limited or is_transient_error(error)):
+            return None
+        logger.warning(f"LLM call failed ({type(error).__name__}), retrying (attempt {attempt + 1}/{self.max_retries})")
+        # After a 429 the limiter itself holds the next attempt back
+        return 0.0 if rate_limited else self._backoff(attempt)
+
+    def _generate(self,
+                  messages: List[BaseMessage],
+                  stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None,
+                  **kwargs: Any) -> ChatResult:
+        key = get_fairness_key(run_manager)
+        estimated = estimate_tokens(messages, kwargs.get("tools"), self.expected_output_tokens)
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(key, estimated)
+            try:
+                result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                delay = self._on_failure(e, estimated, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+
+            self.limiter.release(estimated, used_tokens=get_used_tokens(result))
+            return result
+
+    async def _hedged(self, start: Callable[[Optional[asyncio.Event]], Awaitable[Any]], latency_key: str) -> Any:
+        """
+        Run a call and send a hedged duplicate if it is slower than the threshold.
+
+        Args:
+            start: Starts one attempt; the event (if given) is set once the limiter admits it
+            latency_key: Latency key the threshold is computed for
+
+        Returns:
+            The result of whichever attempt succeeds first
+        """
+        admitted = asyncio.Event()
+        primary = asyncio.ensure_future(start(admitted))
+        tasks = {primary}
+        try:
+            # The hedge timer starts once the call is admitted, queueing is not a straggler
+            waiter = asyncio.ensure_future(admitted.wait())
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+
+            threshold = self.hedge.threshold(latency_key)
+            if not primary.done() and threshold is not None:
+                done, _ = await asyncio.wait({primary}, timeout=threshold)
+                if not done and self.hedge.try_spend():
+                    logger.info(f"LLM call slower than {threshold:.1f}s, sending a hedged request")
+                    tasks.add(asyncio.ensure_future(start(None)))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                # A cancelled attempt counts as failed, task.exception() would raise for it
+                for task in sorted(done, key=lambda task: task.cancelled() or task.exception() is not None):
+                    if task.cancelled():
+                        error = error or asyncio.CancelledError()
+                        continue
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge.record_win()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Cancel the loser and let it release its limiter slot
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _agenerate_once(self,
+                              messages: List[BaseMessage],
+                              stop: Optional[List[str]],
+                              run_manager: Optional[AsyncCallbackManagerForLLMRun],
+                              key: str,
+                              estimated: int,
+                              latency_key: Optional[str] = None,
+                              admitted: Optional[asyncio.Event] = None,
+                              **kwargs: Any) -> ChatResult:
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.aacquire(key, estimated)
+            if admitted is not None:
+                admitted.set()
+            started = time.monotonic()
+            try:
+                result = await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except asyncio.CancelledError:
+                self.limiter.release(estimated)
+                raise
+            except Exception as e:
+                delay = self._on_failure(e, estimated, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            self.limiter.release(estimated, used_tokens=get_used_tokens(result))
+            if self.hedge is not None and latency_key:
+                self.hedge.record(latency_key, time.monotonic() - started)
+            return result
+
+    async def _agenerate(self,
+                         messages: List[BaseMessage],
+                         stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs: Any) -> ChatResult:
+        key = get_fairness_key(run_manager)
+        estimated = estimate_tokens(messages, kwargs.get("tools"), self.expected_output_tokens)
+        node = get_node_name(run_manager)
+
+        if self.hedge is None or not self.hedge.enabled_for(node):
+            if self.hedge is not None:
+                self.hedge.record_call()
+            return await self._agenerate_once(messages, stop, run_manager, key, estimated, **kwargs)
+
+        self.hedge.record_call()
+        # Total latency depends on the output length, so thresholds are per node
+        latency_key = f"{self.profile}:{node}"
+        return await self._hedged(
+            lambda admitted: self._agenerate_once(messages, stop, run_manager, key, estimated,
+                                                  latency_key=latency_key, admitted=admitted, **kwargs),
+            latency_key,
+        )
+
+    def _stream(self,
+                messages: List[BaseMessage],
+                stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        key = get_fairness_key(run_manager)
+        estimated = estimate_tokens(messages, kwargs.get("tools"), self.expected_output_tokens)
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(key, estimated)
+            used_tokens = None
+            streamed = False
+            try:
+                for chunk in self.inner._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    streamed = True
+                    usage = getattr(chunk.message, "usage_metadata", None)
+                    if usage:
+                        used_tokens = (used_tokens or 0) + usage.get("total_tokens", 0)
+                    yield chunk
+            except GeneratorExit:
+                self.limiter.release(estimated)
+                raise
+            except Exception as e:
+                # Once tokens have been emitted the call cannot be replayed
+                delay = self._on_failure(e, estimated, attempt if not streamed else self.max_retries)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+
+            self.limiter.release(estimated, used_tokens=used_tokens)
+            return
+
+    async def _astream_once(self,
+                            messages: List[BaseMessage],
+                            stop: Optional[List[str]],
+                            run_manager: Optional[AsyncCallbackManagerForLLMRun],
+                            key: str,
+                            estimated: int,
+                            admitted: Optional[asyncio.Event] = None,
+                            **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.aacquire(key, estimated)
+            if admitted is not None:
+                admitted.set()
+            started = time.monotonic()
+            used_tokens = None
+            streamed = False
+            try:
+                async for chunk in self.inner._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    if not streamed and self.hedge is not None:
+                        self.hedge.record(f"{self.profile}:{FIRST_CHUNK}", time.monotonic() - started)
+                    streamed = True
+                    usage = getattr(chunk.message, "usage_metadata", None)
+                    if usage:
+                        used_tokens = (used_tokens or 0) + usage.get("total_tokens", 0)
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                self.limiter.release(estimated)
+                raise
+            except Exception as e:
+                # Once tokens have been emitted the call cannot be replayed
+                delay = self._on_failure(e, estimated, attempt if not streamed else self.max_retries)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            self.limiter.release(estimated, used_tokens=used_tokens)
+            return
+
+    async def _astream(self,
+                       messages: List[BaseMessage],
+                       stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        key = get_fairness_key(run_manager)
+        estimated = estimate_tokens(messages, kwargs.get("tools"), self.expected_output_tokens)
+        if self.hedge is not None:
+            self.hedge.record_call()
+
+        if self.hedge is None or not self.hedge.enabled_for(get_node_name(run_manager)):
+            async for chunk in self._astream_once(messages, stop, run_manager, key, estimated, **kwargs):
+                yield chunk
+            return
+
+        # Streams are hedged on the first chunk; the winning stream is then consumed alone
+        streams = []
+
+        async def start(admitted: Optional[asyncio.Event]):
+            stream = self._astream_once(messages, stop, run_manager, key, estimated, admitted=admitted, **kwargs)
+            streams.append(stream)
+            try:
+                return stream, await stream.__anext__()
+            except StopAsyncIteration:
+                return stream, None
+
+        winner, first_chunk = await self._hedged(start, f"{self.profile}:{FIRST_CHUNK}")
+        try:
+            for stream in streams:
+                if stream is not winner:
+                    await stream.aclose()
+            if first_chunk is None:
+                return
+            yield first_chunk
+            async for chunk in winner:
+                yield chunk
+        finally:
+            await winner.aclose()
@@ -0,0 +1,131 @@
+"""
+Request hedging policy for LLM calls.
+
+A call that takes longer than a high percentile of the latencies observed for
+comparable calls is duplicated, and the first response wins. Latencies are kept
+in rolling windows per model profile: time to first chunk for streamed calls
+(comparable across nodes) and total latency per node for non-streamed calls.
+One budget, relative to the number of calls of all profiles, caps the hedges,
+so stragglers are cut without multiplying quota usage.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+from src.config.default_settings import (
+    DEFAULT_LLM_HEDGE_NODES,
+    DEFAULT_LLM_HEDGE_PERCENTILE,
+    DEFAULT_LLM_HEDGE_MIN_SAMPLES,
+    DEFAULT_LLM_HEDGE_WINDOW,
+    DEFAULT_LLM_HEDGE_BUDGET,
+)
+
+
+class HedgePolicy:
+    """
+    Decides when a call should be hedged and keeps the hedge budget.
+    """
+
+    def __init__(self,
+                 nodes: Iterable[str] = DEFAULT_LLM_HEDGE_NODES,
+                 percentile: float = DEFAULT_LLM_HEDGE_PERCENTILE,
+                 min_samples: int = DEFAULT_LLM_HEDGE_MIN_SAMPLES,
+                 window: int = DEFAULT_LLM_HEDGE_WINDOW,
+                 budget: float = DEFAULT_LLM_HEDGE_BUDGET):
+        """
+        Initialize the policy.
+
+        Args:
+            nodes: Graph nodes whose calls may be hedged
+            percentile: Latency percentile after which a hedge is sent
+            min_samples: Observed latencies needed before hedging starts
+            window: Number of recent latencies kept per latency key
+            budget: Maximum hedges as a fraction of all calls
+        """
+        self.nodes = set(nodes)
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.budget = budget
+
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self._stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "over_budget": 0}
+
+    def enabled_for(self, node: Optional[str]) -> bool:
+        """Check whether calls from a graph node may be hedged."""
+        return node in self.nodes and self.budget > 0
+
+    def record(self, key: str, seconds: float) -> None:
+        """
+        Record the latency of a successful call.
+
+        Args:
+            key: Latency key, "<profile>:first_chunk" for streams or "<profile>:<node>"
+            seconds: Observed latency
+        """
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def record_call(self) -> None:
+        """Count a call towards the hedge budget."""
+        with self._lock:
+            self._stats["calls"] += 1
+
+    def threshold(self, key: str) -> Optional[float]:
+        """
+        Return the latency after which a call should be hedged.
+
+        Returns:
+            The configured percentile of recent latencies, or None while there are
+            too few samples
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100.0))
+        return samples[index]
+
+    def try_spend(self) -> bool:
+        """Take one hedge from the budget; False when the budget is used up."""
+        with self._lock:
+            if self._stats["hedged"] + 1 > self.budget * self._stats["calls"]:
+                self._stats["over_budget"] += 1
+                return False
+            self._stats["hedged"] += 1
+            return True
+
+    def record_win(self) -> None:
+        """Count a hedge that returned before the original call."""
+        with self._lock:
+            self._stats["hedge_wins"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hedging counters.
+
+        Returns:
+            Dict with call, hedge, hedge win and over-budget counts
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+_hedge_policy: Optional[HedgePolicy] = None
+_hedge_policy_lock = threading.Lock()
+
+
+def get_hedge_policy() -> HedgePolicy:
+    """Return the process-wide hedge policy, creating it on first use."""
+    global _hedge_policy
+    with _hedge_policy_lock:
+        if _hedge_policy is None:
+            _hedge_policy = HedgePolicy()
+        return _hedge_policy
+
+
+def hedge_stats() -> Dict[str, Any]:
+    """Return the counters of the process-wide hedge policy."""
+    return get_hedge_policy().stats()
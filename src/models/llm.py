@@ -1,45 +1,153 @@
 """
 Language model initialization and configuration.
+
+The LLM is built lazily on first use by get_llm() and cached for the process,
+so importing this module does not import the provider SDKs or require API keys.
 """
 
-from langchain_openai import AzureChatOpenAI, ChatOpenAI
-from src.config.settings import (
-    AZURE_OPENAI_ENDPOINT, 
-    AZURE_OPENAI_API_KEY, 
-    AZURE_OPENAI_DEPLOYMENT,
-    AZURE_OPENAI_API_VERSION,
-    OPENAI_API_KEY,
-    OPENAI_MODEL
+import threading
+from typing import Any, Dict, Optional
+
+from src.config.settings import get_setting, get_profile_deployment
+from src.config.default_settings import (
+    DEFAULT_LLM_CACHE_ENABLED,
+    DEFAULT_LLM_EXPECTED_OUTPUT_TOKENS,
+    DEFAULT_MODEL_PROFILES,
+    DEFAULT_MODEL_ROUTES,
 )
 
-from src.config.default_settings import DEFAULT_MODEL_TEMPERATURE
+
+def resolve_profile(task: Optional[str] = None) -> str:
+    """
+    Look up the model profile a task is routed to.
+
+    Args:
+        task: Name of the LLM-calling task (e.g. "generate_question"); None for the default
+
+    Returns:
+        Name of a profile in DEFAULT_MODEL_PROFILES
+    """
+    profile = DEFAULT_MODEL_ROUTES.get(task, "default") if task else "default"
+    return profile if profile in DEFAULT_MODEL_PROFILES else "default"
+
+
+def get_deployment(profile: str = "default") -> str:
+    """
+    Get the deployment (Azure) or model (OpenAI) name used by a profile.
+
+    Args:
+        profile: Name of the model profile
+
+    Returns:
+        The deployment or model name
+    """
+    settings = DEFAULT_MODEL_PROFILES[profile]
+    if get_setting("AZURE_OPENAI_API_KEY") and get_setting("AZURE_OPENAI_ENDPOINT"):
+        return (settings.get("azure_deployment")
+                or get_profile_deployment(profile)
+                or get_setting("AZURE_OPENAI_DEPLOYMENT"))
+    return settings.get("openai_model") or get_setting("OPENAI_MODEL")
 
 
 # Initialize the LLM
-def initialize_llm():
-    """Get the appropriate LLM based on available API keys."""
-    if AZURE_OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT:
+def initialize_client(profile: str = "default"):
+    """Get the provider client for a model profile based on available API keys."""
+    settings = DEFAULT_MODEL_PROFILES[profile]
+    if get_setting("LLM_PROVIDER") == "fake":
+        from src.models.fake_llm import FakeChatModel
+        return FakeChatModel(
+            model_name=get_deployment(profile),
+            temperature=settings["temperature"],
+            max_tokens=settings["max_tokens"],
+            latency_profile=get_setting("FAKE_LLM_LATENCY_PROFILE"),
+            rate_limit_rate=float(get_setting("FAKE_LLM_RATE_LIMIT_RATE")),
+            seed=int(get_setting("FAKE_SEED")),
+        )
+    # Retries are handled by GovernedChatModel so that 429s reach the rate limiter
+    if get_setting("AZURE_OPENAI_API_KEY") and get_setting("AZURE_OPENAI_ENDPOINT"):
+        from langchain_openai import AzureChatOpenAI
         return AzureChatOpenAI(
-            azure_endpoint=AZURE_OPENAI_ENDPOINT,
-            openai_api_key=AZURE_OPENAI_API_KEY,
-            openai_api_version=AZURE_OPENAI_API_VERSION,
-            model=AZURE_OPENAI_DEPLOYMENT,
-            temperature=DEFAULT_MODEL_TEMPERATURE,
-            max_retries=5,
-            request_timeout=60,
+            azure_endpoint=get_setting("AZURE_OPENAI_ENDPOINT"),
+            openai_api_key=get_setting("AZURE_OPENAI_API_KEY"),
+            openai_api_version=get_setting("AZURE_OPENAI_API_VERSION"),
+            model=get_deployment(profile),
+            temperature=settings["temperature"],
+            max_tokens=settings["max_tokens"],
+            max_retries=0,
+            request_timeout=settings["timeout"],
         )
-    elif OPENAI_API_KEY:
+    elif get_setting("OPENAI_API_KEY"):
+        from langchain_openai import ChatOpenAI
         return ChatOpenAI(
-            model=OPENAI_MODEL,
-            temperature=DEFAULT_MODEL_TEMPERATURE,
-            api_key=OPENAI_API_KEY,
+            model=get_deployment(profile),
+            temperature=settings["temperature"],
+            max_tokens=settings["max_tokens"],
+            api_key=get_setting("OPENAI_API_KEY"),
+            max_retries=0,
+            timeout=settings["timeout"],
         )
     else:
         raise ValueError("No OpenAI API key provided. Set AZURE_OPENAI_API_KEY or OPENAI_API_KEY.")
 
-# Create a default instance
-llm = initialize_llm() 
+def initialize_llm(profile: str = "default"):
+    """Get the LLM for a model profile, wrapped with the shared rate limiter and response cache."""
+    from src.models.llm_cache import get_response_cache
+    from src.models.governed_llm import GovernedChatModel
+    from src.models.hedging import get_hedge_policy
+    from src.models.rate_limiter import get_rate_limiter
+
+    # Completions are served from the response cache when the same call was made before.
+    # Fake responses are not cached, the cache would hide the simulated latency
+    use_cache = DEFAULT_LLM_CACHE_ENABLED and get_setting("LLM_PROVIDER") != "fake"
+    cache = get_response_cache() if use_cache else None
+
+    # Quotas are per deployment, so profiles on the same deployment share a limiter.
+    # Cache lookups happen before the limiter, so cache hits never wait for quota
+    return GovernedChatModel(
+        inner=initialize_client(profile),
+        limiter=get_rate_limiter(get_deployment(profile)),
+        expected_output_tokens=DEFAULT_MODEL_PROFILES[profile]["max_tokens"] or DEFAULT_LLM_EXPECTED_OUTPUT_TOKENS,
+        hedge=get_hedge_policy(),
+        profile=profile,
+        cache=cache,
+    )
+
+
+_llms: Dict[str, Any] = {}
+_llm_lock = threading.Lock()
+
+
+def get_llm(task: Optional[str] = None):
+    """
+    Return the shared LLM for a task, creating it on first use.
+
+    Args:
+        task: Name of the LLM-calling task, routed through DEFAULT_MODEL_ROUTES;
+            None returns the default model
+
+    Returns:
+        The chat model of the profile the task is routed to
+    """
+    profile = resolve_profile(task)
+    with _llm_lock:
+        if profile not in _llms:
+            _llms[profile] = initialize_llm(profile)
+        return _llms[profile]
+
+
+def reset_llm() -> None:
+    """Drop the cached LLMs so the next get_llm() picks up changed settings."""
+    with _llm_lock:
+        _llms.clear()
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatible `from src.models.llm import llm`
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
-    response = llm.invoke("who are you?")
+    response = get_llm().invoke("who are you?")
     print(response.content)
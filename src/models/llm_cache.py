@@ -0,0 +1,222 @@
+"""
+Persistent response cache for chat model calls.
+
+Completions are content-addressed on the model configuration (deployment,
+temperature, bound tools / structured-output schema) and the normalized message
+list, and are kept in two tiers: a small in-memory LRU and an on-disk SQLite
+store with size and age based eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from src.config.default_settings import (
+    DEFAULT_LLM_CACHE_PATH,
+    DEFAULT_LLM_CACHE_MEMORY_ENTRIES,
+    DEFAULT_LLM_CACHE_MAX_DISK_ENTRIES,
+    DEFAULT_LLM_CACHE_MAX_AGE_SECONDS,
+)
+from src.utils.logger import logger
+
+# Number of writes between two eviction passes over the disk tier
+EVICTION_INTERVAL = 100
+
+
+class ResponseCache(BaseCache):
+    """
+    Two-tier (memory LRU + SQLite) cache implementing LangChain's BaseCache.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = DEFAULT_LLM_CACHE_PATH,
+                 max_memory_entries: int = DEFAULT_LLM_CACHE_MEMORY_ENTRIES,
+                 max_disk_entries: int = DEFAULT_LLM_CACHE_MAX_DISK_ENTRIES,
+                 max_age_seconds: Optional[float] = DEFAULT_LLM_CACHE_MAX_AGE_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file for the disk tier, or None for a memory-only cache
+            max_memory_entries: Maximum number of entries kept in memory
+            max_disk_entries: Maximum number of entries kept on disk
+            max_age_seconds: Entries older than this are treated as misses and evicted
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.max_age_seconds = max_age_seconds
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._conn = None
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+            self._conn.commit()
+            self._evict()
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        """Build the content address for a prompt / model configuration pair."""
+        digest = hashlib.sha256()
+        digest.update(llm_string.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - created_at > self.max_age_seconds
+
+    def _remember(self, key: str, value: RETURN_VAL_TYPE, created_at: float) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up a cached response, checking memory before disk."""
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._is_expired(row[1], now):
+                    try:
+                        value = [loads(generation) for generation in json.loads(row[0])]
+                    except Exception as e:
+                        logger.warning(f"Discarding unreadable cache entry: {str(e)}")
+                        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._conn.commit()
+                    else:
+                        self._conn.execute(
+                            "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._conn.commit()
+                        self._remember(key, value, row[1])
+                        self._stats["disk_hits"] += 1
+                        return value
+
+            self._stats["misses"] += 1
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store a response in both tiers."""
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, return_val, now)
+            self._stats["writes"] += 1
+
+            if self._conn is None:
+                return
+            try:
+                value = json.dumps([dumps(generation) for generation in return_val])
+            except Exception as e:
+                logger.warning(f"Response could not be serialized for the disk cache: {str(e)}")
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._conn.commit()
+
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction >= EVICTION_INTERVAL:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries and trim the disk tier to its size limit."""
+        if self._conn is None:
+            return
+        self._writes_since_eviction = 0
+        evicted = 0
+        if self.max_age_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (time.time() - self.max_age_seconds,),
+            )
+            evicted += cursor.rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_disk_entries:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_disk_entries,),
+            )
+            evicted += cursor.rowcount
+        self._conn.commit()
+        if evicted:
+            self._stats["evictions"] += evicted
+            logger.debug(f"Evicted {evicted} entries from the LLM response cache")
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters for the cache.
+
+        Returns:
+            Dict with per-tier hit counts, misses, writes, evictions and hit rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache, creating it on first use."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
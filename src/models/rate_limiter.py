@@ -0,0 +1,334 @@
+"""
+Process-wide adaptive rate limiter for LLM calls.
+
+Requests and tokens are metered with two token buckets sized to the deployment
+quota. Calls are admitted round-robin across callers (one queue per interview),
+and the admitted rate and concurrency follow an AIMD policy: every success
+additively raises the rate scale, every 429 halves it and pauses admissions
+for the Retry-After period.
+
+Queued callers sleep until they can be admitted: the next caller in line for
+the computed bucket refill or pause, the others until a call is admitted or
+released (blocking callers on a condition variable, async callers on an event
+of their loop).
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Tuple
+
+from src.config.default_settings import (
+    DEFAULT_LLM_REQUESTS_PER_MINUTE,
+    DEFAULT_LLM_TOKENS_PER_MINUTE,
+    DEFAULT_LLM_MAX_CONCURRENCY,
+)
+from src.utils.logger import logger
+
+# Azure enforces quotas over 10 second windows, so buckets hold 10s worth of quota
+BURST_SECONDS = 10.0
+
+# Pause applied after a 429 that carries no Retry-After header
+DEFAULT_RETRY_AFTER = 5.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Token-bucket limiter with fair queuing and AIMD adaptation to 429 responses.
+    """
+
+    def __init__(self,
+                 requests_per_minute: float = DEFAULT_LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = DEFAULT_LLM_TOKENS_PER_MINUTE,
+                 max_concurrency: int = DEFAULT_LLM_MAX_CONCURRENCY,
+                 min_scale: float = 0.1,
+                 increase_step: float = 0.05,
+                 decrease_factor: float = 0.5):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request quota of the deployment
+            tokens_per_minute: Token quota of the deployment
+            max_concurrency: Maximum number of calls in flight
+            min_scale: Lowest fraction of the quota the limiter backs off to
+            increase_step: Additive increase of the rate scale per successful call
+            decrease_factor: Multiplicative decrease of the rate scale per 429
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.min_scale = min_scale
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # Events of the waiting async callers, set from any thread through their loop
+        self._async_waiters: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+        self._scale = 1.0
+        self._request_bucket = self._request_capacity()
+        self._token_bucket = self._token_capacity()
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+
+        # One FIFO of waiting tickets per caller; key order is the round-robin order
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._tickets = itertools.count()
+
+        self._stats = {"granted": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    def _request_capacity(self) -> float:
+        return max(1.0, self.requests_per_minute * self._scale * BURST_SECONDS / 60.0)
+
+    def _token_capacity(self) -> float:
+        return max(1.0, self.tokens_per_minute * self._scale * BURST_SECONDS / 60.0)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._request_bucket = min(
+            self._request_capacity(),
+            self._request_bucket + elapsed * self.requests_per_minute * self._scale / 60.0,
+        )
+        self._token_bucket = min(
+            self._token_capacity(),
+            self._token_bucket + elapsed * self.tokens_per_minute * self._scale / 60.0,
+        )
+
+    def _max_in_flight(self) -> int:
+        return max(1, int(self.max_concurrency * self._scale))
+
+    def _notify(self) -> None:
+        """Wake every waiter to re-check its admission (caller holds the lock)."""
+        self._changed.notify_all()
+        for loop, event in self._async_waiters.values():
+            loop.call_soon_threadsafe(event.set)
+
+    def _enqueue(self, key: str) -> int:
+        with self._lock:
+            ticket = next(self._tickets)
+            self._queues.setdefault(key, deque()).append(ticket)
+            return ticket
+
+    def _dequeue(self, key: str, ticket: int) -> None:
+        """Remove a ticket that gave up waiting (e.g. a cancelled task)."""
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                return
+            try:
+                queue.remove(ticket)
+            except ValueError:
+                return
+            if not queue:
+                del self._queues[key]
+            # The ticket may have been next in line
+            self._notify()
+
+    def _try_acquire(self, key: str, ticket: int, tokens: float) -> Optional[float]:
+        """
+        Admit the ticket if it is next in line and the quota allows it (caller holds the lock).
+
+        Returns:
+            0 when admitted, the seconds until the pause ends or the buckets refill,
+            or None to wait until another call is admitted or released
+        """
+        now = time.monotonic()
+        self._refill(now)
+
+        # Round-robin: the first key in order is served, its head ticket first
+        next_key = next(iter(self._queues), None)
+        if next_key != key or self._queues[key][0] != ticket:
+            return None
+
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        if self._in_flight >= self._max_in_flight():
+            return None
+
+        # Requests larger than the bucket are admitted once the bucket is full
+        needed_tokens = min(tokens, self._token_capacity())
+        wait = 0.0
+        if self._request_bucket < 1:
+            wait = (1 - self._request_bucket) * 60.0 / (self.requests_per_minute * self._scale)
+        if self._token_bucket < needed_tokens:
+            wait = max(wait, (needed_tokens - self._token_bucket) * 60.0 / (self.tokens_per_minute * self._scale))
+        if wait > 0:
+            return wait
+
+        self._request_bucket -= 1
+        self._token_bucket -= tokens
+        self._in_flight += 1
+        self._stats["granted"] += 1
+
+        queue = self._queues.pop(key)
+        queue.popleft()
+        if queue:
+            # Re-append so the key moves to the back of the round-robin order
+            self._queues[key] = queue
+        if self._queues:
+            # Another caller is now next in line
+            self._notify()
+        return 0.0
+
+    def acquire(self, key: str = "default", tokens: float = 1.0) -> None:
+        """
+        Block until a call estimated at `tokens` tokens may be sent.
+
+        Args:
+            key: Fairness key of the caller (e.g. the interview it belongs to)
+            tokens: Estimated prompt + completion tokens of the call
+        """
+        ticket = self._enqueue(key)
+        started = time.monotonic()
+        try:
+            with self._changed:
+                while True:
+                    wait = self._try_acquire(key, ticket, tokens)
+                    if wait == 0:
+                        break
+                    self._changed.wait(wait)
+        except BaseException:
+            self._dequeue(key, ticket)
+            raise
+        self._record_wait(time.monotonic() - started)
+
+    async def aacquire(self, key: str = "default", tokens: float = 1.0) -> None:
+        """
+        Async version of acquire that waits without blocking the event loop.
+
+        Args:
+            key: Fairness key of the caller (e.g. the interview it belongs to)
+            tokens: Estimated prompt + completion tokens of the call
+        """
+        ticket = self._enqueue(key)
+        started = time.monotonic()
+        event = asyncio.Event()
+        with self._lock:
+            self._async_waiters[ticket] = (asyncio.get_running_loop(), event)
+        try:
+            while True:
+                # Cleared before checking, so a change after the check still wakes the wait
+                event.clear()
+                with self._lock:
+                    wait = self._try_acquire(key, ticket, tokens)
+                if wait == 0:
+                    break
+                try:
+                    await asyncio.wait_for(event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._dequeue(key, ticket)
+            raise
+        finally:
+            with self._lock:
+                self._async_waiters.pop(ticket, None)
+        self._record_wait(time.monotonic() - started)
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self._stats["wait_seconds"] += waited
+
+    def release(self,
+                estimated_tokens: float,
+                used_tokens: Optional[float] = None,
+                rate_limited: bool = False,
+                retry_after: Optional[float] = None) -> None:
+        """
+        Release a slot and feed the outcome of the call back into the limiter.
+
+        Args:
+            estimated_tokens: Token estimate that was passed to acquire
+            used_tokens: Actual tokens reported by the API, if known
+            rate_limited: Whether the call was rejected with a 429
+            retry_after: Retry-After delay in seconds reported with the 429
+        """
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+            if used_tokens is not None:
+                # Settle the difference between the estimate and the actual usage
+                self._token_bucket -= used_tokens - estimated_tokens
+
+            if rate_limited:
+                self._stats["rate_limited"] += 1
+                self._scale = max(self.min_scale, self._scale * self.decrease_factor)
+                pause = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                self._request_bucket = min(self._request_bucket, self._request_capacity())
+                self._token_bucket = min(self._token_bucket, self._token_capacity())
+                logger.warning(
+                    f"LLM rate limit hit, backing off to {self._scale:.0%} of quota for {pause:.1f}s"
+                )
+            elif self._scale < 1.0:
+                self._scale = min(1.0, self._scale + self.increase_step)
+            # A slot is free, and the rate or pause may have changed
+            self._notify()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return limiter counters.
+
+        Returns:
+            Dict with granted calls, 429 count, total queueing time and current state
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["scale"] = self._scale
+            stats["in_flight"] = self._in_flight
+            stats["queued"] = sum(len(queue) for queue in self._queues.values())
+        return stats
+
+
+_rate_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_rate_limiter_lock = threading.Lock()
+# Quotas of the limiters created from now on (see set_rate_limits)
+_quotas: Dict[str, float] = {
+    "requests_per_minute": DEFAULT_LLM_REQUESTS_PER_MINUTE,
+    "tokens_per_minute": DEFAULT_LLM_TOKENS_PER_MINUTE,
+}
+
+
+def set_rate_limits(requests_per_minute: Optional[float] = None,
+                    tokens_per_minute: Optional[float] = None) -> None:
+    """
+    Set the quotas of the rate limiters created from now on.
+
+    Args:
+        requests_per_minute: Request quota per deployment (None keeps the current one)
+        tokens_per_minute: Token quota per deployment (None keeps the current one)
+    """
+    with _rate_limiter_lock:
+        if requests_per_minute is not None:
+            _quotas["requests_per_minute"] = requests_per_minute
+        if tokens_per_minute is not None:
+            _quotas["tokens_per_minute"] = tokens_per_minute
+
+
+def get_rate_limiter(deployment: str = "default") -> AdaptiveRateLimiter:
+    """
+    Return the process-wide rate limiter for a deployment, creating it on first use.
+
+    Args:
+        deployment: Deployment (or model) name; quotas are enforced per deployment
+
+    Returns:
+        The shared AdaptiveRateLimiter for that deployment
+    """
+    with _rate_limiter_lock:
+        if deployment not in _rate_limiters:
+            _rate_limiters[deployment] = AdaptiveRateLimiter(**_quotas)
+        return _rate_limiters[deployment]
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the counters of every rate limiter, keyed by deployment."""
+    with _rate_limiter_lock:
+        limiters = dict(_rate_limiters)
+    return {deployment: limiter.stats() for deployment, limiter in limiters.items()}
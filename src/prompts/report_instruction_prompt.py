@@ -32,4 +32,32 @@ To format your report:
 
 Here are the memos from your analysts to build your report from:
 
-{context}"""
\ No newline at end of file
+{context}"""
+
+REPORT_POLISH_INSTRUCTIONS = """You are a technical writer polishing a report on this overall topic:
+
+{topic}
+
+The report draft below was assembled from the memos of your analysts: related
+memos are grouped together, their citations already use the final source
+numbers and the consolidated sources are listed at the end.
+
+Your task:
+
+1. Turn the draft into a crisp, cohesive narrative that ties together the central ideas.
+2. Remove repetition between the memos and add transitions between them.
+3. Do not add facts that are not in the draft.
+
+To format your report:
+
+1. Use markdown formatting.
+2. Include no pre-amble for the report.
+3. Use no sub-heading.
+4. Start your report with a single title header: ## Insights
+5. Do not mention any analyst names in your report.
+6. Keep the citations of the draft exactly as they are, for example [1] or [2].
+7. End your report with the `## Sources` section of the draft, unchanged.
+
+Here is the report draft:
+
+{draft}"""
@@ -8,4 +8,8 @@ First, analyze the full conversation.
 
 Pay particular attention to the final question posed by the analyst.
 
-Convert this final question into a well-structured web search query"""
\ No newline at end of file
+Convert this final question into a well-structured web search query"""
+
+SEARCH_PLAN_INSTRUCTIONS = SEARCH_INSTRUCTIONS + """.
+
+Then write a second, short query for Wikipedia: a few words naming the encyclopedia topic most relevant to the final question."""
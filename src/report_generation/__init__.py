@@ -12,7 +12,13 @@ from src.report_generation.report_generation_graph import build_report_generator
 from src.report_generation.report_content_generator import (
     write_introduction,
     write_conclusion,
-    write_report
+    write_report,
+    write_introduction_and_conclusion,
+    stitch_report,
+    awrite_introduction,
+    awrite_conclusion,
+    awrite_report,
+    awrite_introduction_and_conclusion
 )
 
 from src.report_generation.report_orchestrator import (
@@ -20,5 +26,17 @@ from src.report_generation.report_orchestrator import (
     finalize_report
 )
 
+from src.report_generation.report_draft import (
+    ReportDraft,
+    get_report_draft,
+    release_report_draft
+)
+
+from src.report_generation.interview_scheduler import (
+    InterviewScheduler,
+    get_interview_scheduler,
+    interview_scheduler_stats
+)
+
 # Import state schema
-from src.report_generation.report_schema import ResearchGraphState 
\ No newline at end of file
+from src.report_generation.report_schema import ResearchGraphState, IntroConclusion 
\ No newline at end of file
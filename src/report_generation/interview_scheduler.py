@@ -0,0 +1,267 @@
+"""
+Priority-aware admission of interviews.
+
+initiate_all_interviews sends every analyst to conduct_interview at once, so
+without a cap the LLM calls, searches and open connections of a run grow with
+max_analysts. The conduct_interview node admits at most
+DEFAULT_MAX_CONCURRENT_INTERVIEWS interviews at a time, process-wide; the
+others wait in a priority queue and are admitted as running interviews finish.
+With DEFAULT_INTERVIEW_ORDER = "shortest_first" the interviews expected to
+finish fastest are admitted first, so their sections are ready sooner.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from src.analysts.analyst_schema import Analyst
+from src.config.default_settings import DEFAULT_MAX_CONCURRENT_INTERVIEWS, DEFAULT_INTERVIEW_ORDER
+from src.report_generation.report_schema import ResearchGraphState
+from src.utils.logger import logger
+from src.utils.progress import emit_progress, interview_turns, progress_scope
+
+INTERVIEW_ORDERS = ("shortest_first", "given")
+
+
+def interview_priority(analyst: Analyst, max_num_turns: int, order: str = DEFAULT_INTERVIEW_ORDER) -> float:
+    """
+    Priority of an interview in the admission queue (lower is admitted first).
+
+    The estimate is the prompt volume of the interview: every turn re-sends the
+    persona with a growing transcript. All interviews of a run share
+    max_num_turns, so within a run "shortest_first" orders them by persona
+    length; the turn ceiling matters when interviews of runs with different
+    ceilings wait in the process-wide queue together.
+
+    Args:
+        analyst: The interviewing analyst
+        max_num_turns: Turn ceiling of the interview
+        order: One of INTERVIEW_ORDERS
+
+    Returns:
+        The estimated cost of the interview for "shortest_first", 0 for "given"
+    """
+    if order not in INTERVIEW_ORDERS:
+        raise ValueError(f"Unknown interview order {order!r}, expected one of {INTERVIEW_ORDERS}")
+    if order == "given":
+        return 0.0
+    return float(max_num_turns * len(analyst.persona))
+
+
+class InterviewScheduler:
+    """
+    Concurrency cap with a priority queue, for both blocking and async callers.
+
+    Tickets with equal priority are admitted in arrival order. Waiters sleep
+    until the queue or the running count changes: blocking callers on a
+    condition variable, async callers on an event of their loop.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT_INTERVIEWS):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent: Maximum number of interviews running at once (0 for no cap)
+        """
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # Events of the waiting async callers, set from any thread through their loop
+        self._async_waiters: Dict[Tuple[float, int], Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+        self._queue: List[Tuple[float, int]] = []
+        self._tickets = itertools.count()
+        self._running = 0
+        self._stats = {"admitted": 0, "queued": 0, "wait_seconds": 0.0, "peak_running": 0, "peak_queued": 0}
+
+    def _notify(self) -> None:
+        """Wake every waiter to re-check its admission (caller holds the lock)."""
+        self._changed.notify_all()
+        for loop, event in self._async_waiters.values():
+            loop.call_soon_threadsafe(event.set)
+
+    def _enqueue(self, priority: float) -> Tuple[float, int]:
+        with self._lock:
+            ticket = (priority, next(self._tickets))
+            heapq.heappush(self._queue, ticket)
+            self._stats["peak_queued"] = max(self._stats["peak_queued"], len(self._queue))
+            return ticket
+
+    def _dequeue(self, ticket: Tuple[float, int]) -> None:
+        """Remove a ticket that gave up waiting (e.g. a cancelled task)."""
+        with self._lock:
+            try:
+                self._queue.remove(ticket)
+            except ValueError:
+                return
+            heapq.heapify(self._queue)
+            # The ticket may have been the head of the queue
+            self._notify()
+
+    def _admit(self, ticket: Tuple[float, int]) -> bool:
+        """Admit the ticket if it is next and a slot is free (caller holds the lock)."""
+        if self._queue[0] != ticket:
+            return False
+        if self.max_concurrent > 0 and self._running >= self.max_concurrent:
+            return False
+        heapq.heappop(self._queue)
+        self._running += 1
+        self._stats["admitted"] += 1
+        self._stats["peak_running"] = max(self._stats["peak_running"], self._running)
+        if self._queue:
+            # The new head may fit in a remaining slot
+            self._notify()
+        return True
+
+    def _record_wait(self, waited: float, queued: bool) -> None:
+        with self._lock:
+            self._stats["wait_seconds"] += waited
+            if queued:
+                self._stats["queued"] += 1
+
+    def acquire(self, priority: float = 0.0) -> None:
+        """
+        Block until the interview may start.
+
+        Args:
+            priority: Admission priority (lower is admitted first)
+        """
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        queued = False
+        try:
+            with self._changed:
+                while not self._admit(ticket):
+                    queued = True
+                    self._changed.wait()
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        self._record_wait(time.monotonic() - started, queued)
+
+    async def aacquire(self, priority: float = 0.0) -> None:
+        """Async version of acquire that waits without blocking the event loop."""
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        queued = False
+        event = asyncio.Event()
+        with self._lock:
+            self._async_waiters[ticket] = (asyncio.get_running_loop(), event)
+        try:
+            while True:
+                # Cleared before checking, so a change after the check still wakes the wait
+                event.clear()
+                with self._lock:
+                    if self._admit(ticket):
+                        break
+                queued = True
+                await event.wait()
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        finally:
+            with self._lock:
+                self._async_waiters.pop(ticket, None)
+        self._record_wait(time.monotonic() - started, queued)
+
+    def release(self) -> None:
+        """Free the slot of a finished interview."""
+        with self._lock:
+            self._running = max(0, self._running - 1)
+            self._notify()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return scheduler counters.
+
+        Returns:
+            Dict with admitted and queued interviews, total queueing time, peaks and current state
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["running"] = self._running
+            stats["waiting"] = len(self._queue)
+        return stats
+
+
+_scheduler: Optional[InterviewScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_interview_scheduler() -> InterviewScheduler:
+    """Return the process-wide interview scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = InterviewScheduler()
+        return _scheduler
+
+
+def interview_scheduler_stats() -> Dict[str, Any]:
+    """Return the counters of the process-wide interview scheduler."""
+    return get_interview_scheduler().stats()
+
+
+def _parent_keys(output: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the keys of the interview's output that belong to the report state."""
+    return {key: value for key, value in output.items() if key in ResearchGraphState.__annotations__}
+
+
+def scheduled_interview(interview_graph: Runnable) -> Runnable:
+    """
+    Wrap the interview graph so it only runs once the scheduler admits it.
+
+    The Send payload may carry a "priority" (see interview_priority); the
+    interview graph receives the payload without it.
+
+    Args:
+        interview_graph: The compiled interview graph
+
+    Returns:
+        Runnable to use as the conduct_interview node
+    """
+    def _split(payload: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+        payload = dict(payload)
+        return payload.pop("priority", 0.0), payload
+
+    def _report(status: str, payload: Dict[str, Any], **fields: Any) -> None:
+        emit_progress({"type": "interview", "status": status, "analyst": payload["analyst"].name,
+                       "max_turns": payload.get("max_num_turns", 1), **fields})
+
+    def _completed(payload: Dict[str, Any], output: Dict[str, Any]) -> Dict[str, Any]:
+        _report("completed", payload, turn=interview_turns(output))
+        return _parent_keys(output)
+
+    def conduct_interview(payload: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        priority, payload = _split(payload)
+        scheduler = get_interview_scheduler()
+        _report("queued", payload)
+        scheduler.acquire(priority)
+        logger.debug(f"Interview of {payload['analyst'].name} admitted (priority {priority:.0f})")
+        try:
+            # Forward the interview graph's progress events to the report graph's stream
+            with progress_scope():
+                _report("started", payload)
+                return _completed(payload, interview_graph.invoke(payload, config))
+        finally:
+            scheduler.release()
+
+    async def aconduct_interview(payload: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        priority, payload = _split(payload)
+        scheduler = get_interview_scheduler()
+        _report("queued", payload)
+        await scheduler.aacquire(priority)
+        logger.debug(f"Interview of {payload['analyst'].name} admitted (priority {priority:.0f})")
+        try:
+            with progress_scope():
+                _report("started", payload)
+                return _completed(payload, await interview_graph.ainvoke(payload, config))
+        finally:
+            scheduler.release()
+
+    return RunnableLambda(conduct_interview, afunc=aconduct_interview, name="conduct_interview")
@@ -1,29 +1,88 @@
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from src.report_generation.report_schema import ResearchGraphState
-from src.models.llm import llm
+from src.report_generation.report_schema import ResearchGraphState, IntroConclusion
+from src.models.llm import get_llm
 from src.utils.logger import logger
 from src.prompts.intro_conclusion_prompt import INTRO_CONCLUSTION_INSTRUCTIONS
-from src.prompts.report_instruction_prompt import REPORT_WRITER_INSTRUCTIONS
+from src.prompts.report_instruction_prompt import REPORT_WRITER_INSTRUCTIONS, REPORT_POLISH_INSTRUCTIONS
+from src.report_generation.report_draft import get_report_draft
+from src.config.default_settings import DEFAULT_INCREMENTAL_REDUCE
 
 
 
 
-def write_introduction(state: ResearchGraphState):
+def _format_sections(state: ResearchGraphState) -> str:
+    """Concat all sections together (the draft's outline of them with the incremental reduce)."""
+    sections = state["sections"]
+    if DEFAULT_INCREMENTAL_REDUCE:
+        return get_report_draft().outline(sections)
+    return "\n\n".join([f"{section}" for section in sections])
 
-    logger.info("Writing report introduction...")
 
-    # Full set of sections
-    sections = state["sections"]
+def _intro_conclusion_messages(state: ResearchGraphState, part: str) -> list:
+    """Build the prompt for the report introduction or conclusion."""
+    topic = state["topic"]
+    formatted_str_sections = _format_sections(state)
+
+    instructions = INTRO_CONCLUSTION_INSTRUCTIONS.format(topic=topic, formatted_str_sections=formatted_str_sections)
+    return [instructions]+[HumanMessage(content=f"Write the report {part}")]
+
+
+def _report_messages(state: ResearchGraphState) -> list:
+    """Build the prompt for the report body (a polish of the stitched draft with the incremental reduce)."""
     topic = state["topic"]
+    if DEFAULT_INCREMENTAL_REDUCE:
+        # The draft already has the sections grouped and the sources consolidated
+        draft = get_report_draft().render(state["sections"])
+        system_message = REPORT_POLISH_INSTRUCTIONS.format(topic=topic, draft=draft)
+        return [SystemMessage(content=system_message)]+[HumanMessage(content="Polish this report draft.")]
 
-    # Concat all sections together
-    formatted_str_sections = "\n\n".join([f"{section}" for section in sections])
+    formatted_str_sections = _format_sections(state)
 
     # Summarize the sections into a final report
+    system_message = REPORT_WRITER_INSTRUCTIONS.format(topic=topic, context=formatted_str_sections)
+    return [SystemMessage(content=system_message)]+[HumanMessage(content=f"Write a report based upon these memos.")]
 
-    instructions = INTRO_CONCLUSTION_INSTRUCTIONS.format(topic=topic, formatted_str_sections=formatted_str_sections)
-    intro = llm.invoke([instructions]+[HumanMessage(content=f"Write the report introduction")])
+
+def write_introduction_and_conclusion(state: ResearchGraphState):
+
+    logger.info("Writing report introduction and conclusion...")
+
+    # One structured call instead of sending all sections twice
+    structured_llm = get_llm("write_introduction_and_conclusion").with_structured_output(IntroConclusion)
+    result = structured_llm.invoke(_intro_conclusion_messages(state, "introduction and the report conclusion"))
+
+    logger.info("Report introduction and conclusion are written successfully")
+
+    return {"introduction": result.introduction, "conclusion": result.conclusion}
+
+async def awrite_introduction_and_conclusion(state: ResearchGraphState):
+
+    logger.info("Writing report introduction and conclusion...")
+
+    structured_llm = get_llm("write_introduction_and_conclusion").with_structured_output(IntroConclusion)
+    result = await structured_llm.ainvoke(_intro_conclusion_messages(state, "introduction and the report conclusion"))
+
+    logger.info("Report introduction and conclusion are written successfully")
+
+    return {"introduction": result.introduction, "conclusion": result.conclusion}
+
+def write_introduction(state: ResearchGraphState):
+
+    logger.info("Writing report introduction...")
+
+    # Summarize the sections into a final report
+    intro = get_llm("write_introduction").invoke(_intro_conclusion_messages(state, "introduction"))
+
+    logger.info("Report introduction is written successfully")
+
+    return {"introduction": intro.content}
+
+async def awrite_introduction(state: ResearchGraphState):
+
+    logger.info("Writing report introduction...")
+
+    intro = await get_llm("write_introduction").ainvoke(_intro_conclusion_messages(state, "introduction"))
 
     logger.info("Report introduction is written successfully")
 
@@ -33,17 +92,18 @@ def write_conclusion(state: ResearchGraphState):
 
     logger.info("Writing report conclusion...")
 
-    # Full set of sections
-    sections = state["sections"]
-    topic = state["topic"]
+    # Summarize the sections into a final report
+    conclusion = get_llm("write_conclusion").invoke(_intro_conclusion_messages(state, "conclusion"))
 
-    # Concat all sections together
-    formatted_str_sections = "\n\n".join([f"{section}" for section in sections])
+    logger.info("Report conclusion is written successfully")
 
-    # Summarize the sections into a final report
+    return {"conclusion": conclusion.content}
 
-    instructions = INTRO_CONCLUSTION_INSTRUCTIONS.format(topic=topic, formatted_str_sections=formatted_str_sections)
-    conclusion = llm.invoke([instructions]+[HumanMessage(content=f"Write the report conclusion")])
+async def awrite_conclusion(state: ResearchGraphState):
+
+    logger.info("Writing report conclusion...")
+
+    conclusion = await get_llm("write_conclusion").ainvoke(_intro_conclusion_messages(state, "conclusion"))
 
     logger.info("Report conclusion is written successfully")
 
@@ -52,20 +112,34 @@ def write_conclusion(state: ResearchGraphState):
 
 
 
+def stitch_report(state: ResearchGraphState):
+
+    logger.info("Stitching report body from the draft...")
+
+    # The sections were folded into the draft while the interviews ran
+    content = get_report_draft().render(state["sections"])
+
+    logger.info("Report body is stitched successfully")
+
+    return {"content": content}
+
+
 def write_report(state: ResearchGraphState):
 
     logger.info("Writing report body...")
-    # Full set of sections
-    sections = state["sections"]
-    topic = state["topic"]
 
-    # Concat all sections together
-    formatted_str_sections = "\n\n".join([f"{section}" for section in sections])
+    report = get_llm("write_report").invoke(_report_messages(state))
 
-    # Summarize the sections into a final report
-    system_message = REPORT_WRITER_INSTRUCTIONS.format(topic=topic, context=formatted_str_sections)
-    report = llm.invoke([SystemMessage(content=system_message)]+[HumanMessage(content=f"Write a report based upon these memos.")])
+    logger.info("Report body is written successfully")
+
+    return {"content": report.content}
+
+async def awrite_report(state: ResearchGraphState):
+
+    logger.info("Writing report body...")
+
+    report = await get_llm("write_report").ainvoke(_report_messages(state))
 
     logger.info("Report body is written successfully")
 
-    return {"content": report.content} 
\ No newline at end of file
+    return {"content": report.content}
@@ -0,0 +1,277 @@
+"""
+Incremental reduce of interview sections into a running report draft.
+
+With the barrier reduce, nothing is synthesized until the slowest interview
+is done, and the report body is then written from all sections in one long
+call. With DEFAULT_INCREMENTAL_REDUCE, each section is folded into the run's
+draft as soon as write_section produces it, while other interviews are still
+running:
+- its sources are parsed and keyed by normalized URL, so sources shared by
+  several sections are numbered once
+- its citations are mapped to those source keys
+- its key points (the sentences most relevant to its title) are extracted
+- it is assigned to the cluster of earlier sections it shares most terms with
+
+The final write stitches and polishes: the report body is the drafted
+sections grouped by cluster with consolidated source numbers, polished by
+write_report in one streamed call (DEFAULT_DRAFT_POLISH), and the introduction
+and conclusion are written from the compact outline of key points instead of
+all sections. Sections missing from the draft (e.g. after a resume) are folded
+when the report is stitched.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from src.config.default_settings import DEFAULT_DRAFT_KEY_POINT_CHARS, DEFAULT_DRAFT_CLUSTER_SIMILARITY
+from src.search.compression import is_boilerplate, select_sentences, split_sentences
+from src.search.document_store import current_run_id, normalize_url
+from src.search.passage_ranker import tokenize
+from src.utils.logger import logger
+
+_TITLE = re.compile(r"^##\s+(.+?)\s*$", re.M)
+_SOURCES_HEADER = re.compile(r"^###\s+Sources\s*$", re.M | re.I)
+_SUBHEADER = re.compile(r"^###\s+.*$", re.M)
+_SOURCE_LINE = re.compile(r"^\s*\[(\d+)\]\s*(.+?)\s*$")
+_CITATION = re.compile(r"\[(\d+(?:\s*,\s*\d+)*)\]")
+# Placeholder of a cited source in a drafted section, replaced by its number when stitching
+_PLACEHOLDER = re.compile(r"\[\[source:(\d+)\]\]")
+
+
+def _source_key(source: str) -> str:
+    """Key identifying a source across sections (normalized URL, or the normalized name)."""
+    url = re.search(r"https?://\S+", source)
+    return normalize_url(url.group(0).rstrip(").,")) if url else " ".join(source.lower().split())
+
+
+class DraftSection:
+    """A section folded into the draft."""
+
+    def __init__(self, title: str, body: str, key_points: List[str], terms: Set[str]):
+        """
+        Initialize a drafted section.
+
+        Args:
+            title: Section title
+            body: Section text with citations replaced by source placeholders
+            key_points: Sentences summarizing the section, with source placeholders
+            terms: Content terms of the section, for clustering
+        """
+        self.title = title
+        self.body = body
+        self.key_points = key_points
+        self.terms = terms
+
+
+class ReportDraft:
+    """
+    Running draft of one run's report, built from its sections as they land.
+    """
+
+    def __init__(self, run_id: str,
+                 key_point_chars: int = DEFAULT_DRAFT_KEY_POINT_CHARS,
+                 cluster_similarity: float = DEFAULT_DRAFT_CLUSTER_SIMILARITY):
+        """
+        Initialize an empty draft.
+
+        Args:
+            run_id: Id of the run the report belongs to
+            key_point_chars: Characters of key points extracted per section
+            cluster_similarity: Term overlap above which a section joins an existing cluster
+        """
+        self.run_id = run_id
+        self.key_point_chars = key_point_chars
+        self.cluster_similarity = cluster_similarity
+        self._sections: Dict[str, DraftSection] = {}
+        # Source keys and their display names, in order of first citation
+        self._source_keys: Dict[str, int] = {}
+        self._source_names: List[str] = []
+        # Section digests per cluster, and the terms of each cluster
+        self._clusters: List[List[str]] = []
+        self._cluster_terms: List[Set[str]] = []
+        self._lock = threading.Lock()
+        self._stats = {"sections": 0, "clusters": 0, "sources": 0, "shared_sources": 0, "fold_seconds": 0.0}
+
+    @staticmethod
+    def _digest(section: str) -> str:
+        return hashlib.sha1(section.encode("utf-8")).hexdigest()
+
+    def _source_index(self, source: str) -> int:
+        """Return the index of a source, registering it on first use (caller holds the lock)."""
+        key = _source_key(source)
+        if key in self._source_keys:
+            self._stats["shared_sources"] += 1
+        else:
+            self._source_keys[key] = len(self._source_names)
+            self._source_names.append(source)
+            self._stats["sources"] += 1
+        return self._source_keys[key]
+
+    def fold(self, section: str) -> None:
+        """
+        Fold a section into the draft (sections already folded are skipped).
+
+        Args:
+            section: Markdown section written by write_section
+        """
+        digest = self._digest(section)
+        if digest in self._sections:
+            return
+        started = time.monotonic()
+
+        title_match = _TITLE.search(section)
+        title = title_match.group(1).strip() if title_match else "Findings"
+        text = section[title_match.end():] if title_match else section
+        sources_match = _SOURCES_HEADER.search(text)
+        body, sources = (text[:sources_match.start()], text[sources_match.end():]) if sources_match else (text, "")
+        body = _SUBHEADER.sub("", body).strip()
+        local_sources = {}
+        for line in sources.splitlines():
+            match = _SOURCE_LINE.match(line)
+            if match:
+                local_sources[match.group(1)] = match.group(2)
+
+        sentences = [sentence for sentence in split_sentences(body) if not is_boilerplate(sentence)]
+        key_sentences = [sentences[index] for index in select_sentences(sentences, title, self.key_point_chars)] \
+            if sentences else []
+        terms = set(tokenize(body))
+
+        with self._lock:
+            if digest in self._sections:
+                return
+            indices = {number: self._source_index(source) for number, source in local_sources.items()}
+
+            def cite(match: re.Match) -> str:
+                # Citations of sources the section does not list are dropped
+                numbers = [number.strip() for number in match.group(1).split(",")]
+                return "".join(f"[[source:{indices[number]}]]" for number in numbers if number in indices)
+
+            body = _CITATION.sub(cite, body)
+            key_points = [_CITATION.sub(cite, sentence) for sentence in key_sentences]
+            self._sections[digest] = DraftSection(title, body, key_points, terms)
+            self._assign_cluster(digest, terms)
+            self._stats["sections"] += 1
+            self._stats["fold_seconds"] += time.monotonic() - started
+        logger.info(f"Folded section '{title}' into the report draft ({len(self._clusters)} clusters, "
+                    f"{len(self._source_names)} sources)")
+
+    def _assign_cluster(self, digest: str, terms: Set[str]) -> None:
+        """Add a section to the cluster it overlaps most, or to a new cluster (caller holds the lock)."""
+        best, best_similarity = None, 0.0
+        for index, cluster_terms in enumerate(self._cluster_terms):
+            similarity = len(terms & cluster_terms) / len(terms | cluster_terms) if terms | cluster_terms else 0.0
+            if similarity > best_similarity:
+                best, best_similarity = index, similarity
+        if best is not None and best_similarity >= self.cluster_similarity:
+            self._clusters[best].append(digest)
+            self._cluster_terms[best] |= terms
+        else:
+            self._clusters.append([digest])
+            self._cluster_terms.append(set(terms))
+            self._stats["clusters"] += 1
+
+    def _ordered(self, sections: List[str]) -> List[DraftSection]:
+        """Fold missing sections and return the given ones in cluster order."""
+        for section in sections:
+            self.fold(section)
+        wanted = {self._digest(section) for section in sections}
+        with self._lock:
+            return [self._sections[digest] for cluster in self._clusters for digest in cluster if digest in wanted]
+
+    @staticmethod
+    def _source_numbers(drafted: List[DraftSection]) -> Dict[int, int]:
+        """Number the sources in order of first citation in the section bodies, in the given order."""
+        numbers: Dict[int, int] = {}
+        for section in drafted:
+            for match in _PLACEHOLDER.finditer(section.body):
+                numbers.setdefault(int(match.group(1)), len(numbers) + 1)
+        return numbers
+
+    @staticmethod
+    def _numbered(text: str, numbers: Dict[int, int]) -> str:
+        """Replace the source placeholders of a text by their numbers."""
+        def number(match: re.Match) -> str:
+            index = int(match.group(1))
+            if index not in numbers:
+                # Key points are sentences of the bodies, so every placeholder has a number
+                logger.warning(f"Source {index} of the report draft is not cited in the report body")
+                return ""
+            return f"[{numbers[index]}]"
+
+        return _PLACEHOLDER.sub(number, text)
+
+    def render(self, sections: List[str]) -> str:
+        """
+        Stitch the report body from drafted sections.
+
+        Args:
+            sections: The sections of the report state (unfolded ones are folded first)
+
+        Returns:
+            Markdown body starting with "## Insights" and ending with the consolidated "## Sources"
+        """
+        drafted = self._ordered(sections)
+        numbers = self._source_numbers(drafted)
+        bodies = [self._numbered(f"### {section.title}\n\n{section.body}", numbers) for section in drafted]
+        content = "## Insights\n\n" + "\n\n".join(bodies)
+        if numbers:
+            with self._lock:
+                sources = [f"[{position}] {self._source_names[index]}  " for index, position in numbers.items()]
+            content += "\n\n## Sources\n" + "\n".join(sources)
+        return content
+
+    def outline(self, sections: List[str]) -> str:
+        """
+        Compact outline of the report: section titles and key points, by cluster.
+
+        Args:
+            sections: The sections of the report state (unfolded ones are folded first)
+
+        Returns:
+            Markdown outline, citations numbered like the stitched body
+        """
+        drafted = self._ordered(sections)
+        # Numbered from the bodies, so a source keeps its number when its sentence is not a key point
+        numbers = self._source_numbers(drafted)
+        texts = [f"## {section.title}\n" + "\n".join(f"- {self._numbered(point, numbers)}"
+                                                    for point in section.key_points)
+                 for section in drafted]
+        return "\n\n".join(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return draft counters.
+
+        Returns:
+            Dict with folded sections, clusters, distinct and shared sources and time spent folding
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+_drafts: Dict[str, ReportDraft] = {}
+_drafts_lock = threading.Lock()
+
+
+def get_report_draft(run_id: Optional[str] = None) -> ReportDraft:
+    """Return the draft of a run (by default the calling node's run), creating it on first use."""
+    run_id = run_id or current_run_id()
+    with _drafts_lock:
+        if run_id not in _drafts:
+            _drafts[run_id] = ReportDraft(run_id)
+        return _drafts[run_id]
+
+
+def release_report_draft(run_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Drop the draft of a finished run.
+
+    Returns:
+        The final stats of the draft, or None when the run has no draft
+    """
+    with _drafts_lock:
+        draft = _drafts.pop(run_id, None)
+    return draft.stats() if draft is not None else None
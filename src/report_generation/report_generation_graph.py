@@ -1,34 +1,70 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import START, END, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
 
 from src.report_generation.report_schema import ResearchGraphState
-from src.analysts.analyst_generator import create_analysts, human_feedback
-from src.report_generation.report_content_generator import write_introduction, write_conclusion, write_report
+from src.utils.checkpointer import get_checkpointer
+from src.analysts.analyst_generator import create_analysts, acreate_analysts, human_feedback
+from src.report_generation.report_content_generator import (
+    write_introduction,
+    write_conclusion,
+    write_report,
+    write_introduction_and_conclusion,
+    stitch_report,
+    awrite_introduction,
+    awrite_conclusion,
+    awrite_report,
+    awrite_introduction_and_conclusion
+)
+from src.config.default_settings import (
+    DEFAULT_COMBINED_INTRO_CONCLUSION,
+    DEFAULT_INCREMENTAL_REDUCE,
+    DEFAULT_DRAFT_POLISH,
+)
 from src.report_generation.report_orchestrator import finalize_report, initiate_all_interviews
+from src.report_generation.interview_scheduler import scheduled_interview
 from src.interview.interview_graph import build_interview_graph
 
 
-def build_report_generator():
+def build_report_generator(combined_intro_conclusion: bool = DEFAULT_COMBINED_INTRO_CONCLUSION):
+    """
+    Build and compile the report generation graph.
+
+    Args:
+        combined_intro_conclusion: Write the introduction and conclusion in a single
+            structured call instead of two separate calls over the same sections
+
+    Returns:
+        The compiled report generation graph
+    """
     # Add nodes and edges
     builder = StateGraph(ResearchGraphState)
-    builder.add_node("create_analysts", create_analysts)
+    builder.add_node("create_analysts", RunnableLambda(create_analysts, afunc=acreate_analysts))
     builder.add_node("human_feedback", human_feedback)
-    builder.add_node("conduct_interview", build_interview_graph())
-    builder.add_node("write_report", write_report)
-    builder.add_node("write_introduction", write_introduction)
-    builder.add_node("write_conclusion", write_conclusion)
+    # Interviews are admitted by the scheduler, at most DEFAULT_MAX_CONCURRENT_INTERVIEWS at a time
+    builder.add_node("conduct_interview", scheduled_interview(build_interview_graph()))
+    if DEFAULT_INCREMENTAL_REDUCE and not DEFAULT_DRAFT_POLISH:
+        # The body is stitched from the draft the sections were folded into as they landed
+        builder.add_node("write_report", stitch_report)
+    else:
+        builder.add_node("write_report", RunnableLambda(write_report, afunc=awrite_report))
+    if combined_intro_conclusion:
+        builder.add_node("write_introduction_and_conclusion",
+                         RunnableLambda(write_introduction_and_conclusion, afunc=awrite_introduction_and_conclusion))
+        reduce_nodes = ["write_report", "write_introduction_and_conclusion"]
+    else:
+        builder.add_node("write_introduction", RunnableLambda(write_introduction, afunc=awrite_introduction))
+        builder.add_node("write_conclusion", RunnableLambda(write_conclusion, afunc=awrite_conclusion))
+        reduce_nodes = ["write_conclusion", "write_report", "write_introduction"]
     builder.add_node("finalize_report", finalize_report)
 
     # Logic
     builder.add_edge(START, "create_analysts")
     builder.add_edge("create_analysts", "human_feedback")
     builder.add_conditional_edges("human_feedback", initiate_all_interviews, ["create_analysts", "conduct_interview"])
-    builder.add_edge("conduct_interview", "write_report")
-    builder.add_edge("conduct_interview", "write_introduction")
-    builder.add_edge("conduct_interview", "write_conclusion")
-    builder.add_edge(["write_conclusion", "write_report", "write_introduction"], "finalize_report")
+    for node in reduce_nodes:
+        builder.add_edge("conduct_interview", node)
+    builder.add_edge(reduce_nodes, "finalize_report")
     builder.add_edge("finalize_report", END)
 
-    # Compile
-    memory = MemorySaver()
-    return builder.compile(interrupt_before=['human_feedback'], checkpointer=memory) 
\ No newline at end of file
+    # Compile (checkpoints survive the process with the durable checkpointer)
+    return builder.compile(interrupt_before=['human_feedback'], checkpointer=get_checkpointer())
\ No newline at end of file
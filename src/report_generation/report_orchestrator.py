@@ -2,6 +2,7 @@ from langgraph.constants import Send
 from langchain_core.messages import HumanMessage
 
 from src.report_generation.report_schema import ResearchGraphState
+from src.report_generation.interview_scheduler import interview_priority
 from src.utils.logger import logger
 
 def initiate_all_interviews(state: ResearchGraphState):
@@ -18,11 +19,16 @@ def initiate_all_interviews(state: ResearchGraphState):
     # Otherwise kick off interviews in parallel via Send() API
     else:
         topic = state["topic"]
+        max_num_turns = state.get("max_num_turns", 1)
+        # The scheduler admits the interviews by priority, lowest first
+        analysts = sorted(state["analysts"], key=lambda analyst: interview_priority(analyst, max_num_turns))
         interview_results = [Send("conduct_interview", {"analyst": analyst,
+                                        "max_num_turns": max_num_turns,
+                                        "priority": interview_priority(analyst, max_num_turns),
                                         "messages": [HumanMessage(
                                         content=f"So you said you were writing an article on {topic}?"
                                         )
-                                        ]}) for analyst in state["analysts"]]
+                                        ]}) for analyst in analysts]
         
         logger.info("Interviews conducted successfully")
 
@@ -1,15 +1,31 @@
 import operator
 from typing import List, Annotated
+from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 from src.analysts.analyst_schema import Analyst
 
+def keep_latest(current, update):
+    """Reducer for keys that parallel interviews echo back with the same value."""
+    return update
+
 class ResearchGraphState(TypedDict):
     topic: str # Research topic
     max_analysts: int # Number of analysts
+    max_num_turns: Annotated[int, keep_latest] # Maximum number of turns per interview
     human_analyst_feedback: str # Human feedback
     analysts: List[Analyst] # Analyst asking questions
     sections: Annotated[list, operator.add] # Send() API key
     introduction: str # Introduction for the final report
     content: str # Content for the final report
     conclusion: str # Conclusion for the final report
-    final_report: str # Final report 
\ No newline at end of file
+    final_report: str # Final report 
+
+class IntroConclusion(BaseModel):
+    """Introduction and conclusion of the report, written in one call."""
+
+    introduction: str = Field(
+        description="Report title (# header) followed by the ## Introduction section, in markdown.",
+    )
+    conclusion: str = Field(
+        description="The ## Conclusion section of the report, in markdown.",
+    )
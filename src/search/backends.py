@@ -0,0 +1,188 @@
+"""
+Search backend interface and registry.
+
+A search backend turns a query into formatted `<Document ...>` blocks. The
+backends enabled in DEFAULT_SEARCH_BACKENDS are queried concurrently by the
+`search` node of the interview graph (see search_fanout.py), each with its own
+deadline and circuit breaker. New backends are added with register_backend:
+
+    register_backend("arxiv", ArxivBackend)
+
+and enabled by adding an "arxiv" entry to DEFAULT_SEARCH_BACKENDS. The backend
+name is also the key of its query in the turn's search plan; backends without
+a planned query search for the analyst's latest question.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.default_settings import DEFAULT_SEARCH_BACKENDS
+from src.search.circuit_breaker import CircuitBreaker
+from src.utils.logger import logger
+
+# Deadline of backends configured without one
+FALLBACK_DEADLINE_SECONDS = 10.0
+
+
+class SearchBackend:
+    """
+    Base class of search backends.
+
+    Subclasses implement search, and asearch when they have a non-blocking
+    client (the default runs search in a worker thread).
+    """
+
+    name = "backend"
+    # Key of the backend's query in the turn's search plan (default: its name)
+    query_key: Optional[str] = None
+
+    def __init__(self, deadline_seconds: float = FALLBACK_DEADLINE_SECONDS):
+        """
+        Initialize the backend.
+
+        Args:
+            deadline_seconds: Time after which a search is abandoned for the turn
+        """
+        self.deadline_seconds = deadline_seconds
+        self.breaker = CircuitBreaker()
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0,
+                       "cancelled": 0, "skipped": 0, "total_seconds": 0.0}
+
+    def search(self, query: str) -> str:
+        """
+        Search for a query.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Formatted `<Document ...>` blocks separated by DOCUMENT_SEPARATOR
+        """
+        raise NotImplementedError
+
+    async def asearch(self, query: str) -> str:
+        """Async version of search."""
+        # Like asyncio.to_thread (Python 3.9+), the worker thread sees the caller's context
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(context.run, self.search, query))
+
+    def record(self, outcome: str, seconds: float = 0.0) -> None:
+        """
+        Count the outcome of a search.
+
+        Args:
+            outcome: "successes", "failures", "timeouts", "cancelled" or "skipped"
+            seconds: Time spent on the search
+        """
+        with self._lock:
+            if outcome != "skipped":
+                self._stats["calls"] += 1
+            self._stats[outcome] += 1
+            self._stats["total_seconds"] += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the backend's counters.
+
+        Returns:
+            Dict with calls per outcome, total search time and circuit breaker stats
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["breaker"] = self.breaker.stats()
+        return stats
+
+
+class WebSearchBackend(SearchBackend):
+    """Tavily web search (cached, see web_search.py)."""
+
+    name = "web"
+
+    def search(self, query: str) -> str:
+        from src.search.web_search import search_web_docs
+        return search_web_docs(query)
+
+    async def asearch(self, query: str) -> str:
+        from src.search.web_search import asearch_web_docs
+        return await asearch_web_docs(query)
+
+
+class WikipediaBackend(SearchBackend):
+    """Wikipedia, from the API or the local index (cached, see web_search.py)."""
+
+    name = "wikipedia"
+
+    def search(self, query: str) -> str:
+        from src.search.web_search import search_wikipedia_docs
+        return search_wikipedia_docs(query)
+
+    async def asearch(self, query: str) -> str:
+        from src.search.web_search import asearch_wikipedia_docs
+        return await asearch_wikipedia_docs(query)
+
+
+def _local_corpus_backend(**options: Any) -> SearchBackend:
+    # Imported on first use, the corpus index pulls in NumPy and SQLite
+    from src.search.local_corpus import LocalCorpusBackend
+    return LocalCorpusBackend(**options)
+
+
+_backend_factories: Dict[str, Callable[..., SearchBackend]] = {
+    "web": WebSearchBackend,
+    "wikipedia": WikipediaBackend,
+    "local": _local_corpus_backend,
+}
+_backends: Dict[str, SearchBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable[..., SearchBackend]) -> None:
+    """
+    Register a search backend.
+
+    Args:
+        name: Backend name, as used in DEFAULT_SEARCH_BACKENDS
+        factory: Class (or callable) building the backend from its config options
+    """
+    with _backends_lock:
+        _backend_factories[name] = factory
+        _backends.pop(name, None)
+
+
+def get_backend(name: str) -> Optional[SearchBackend]:
+    """Return the shared instance of a registered backend, creating it on first use."""
+    with _backends_lock:
+        if name not in _backends:
+            factory = _backend_factories.get(name)
+            if factory is None:
+                return None
+            options = DEFAULT_SEARCH_BACKENDS.get(name, {})
+            backend = factory(deadline_seconds=options.get("deadline_seconds", FALLBACK_DEADLINE_SECONDS))
+            backend.name = name
+            _backends[name] = backend
+        return _backends[name]
+
+
+def get_enabled_backends() -> List[SearchBackend]:
+    """Return the backends enabled in DEFAULT_SEARCH_BACKENDS, in configuration order."""
+    backends = []
+    for name, options in DEFAULT_SEARCH_BACKENDS.items():
+        if not options.get("enabled", True):
+            continue
+        backend = get_backend(name)
+        if backend is None:
+            logger.warning(f"Search backend {name} is enabled but not registered")
+            continue
+        backends.append(backend)
+    return backends
+
+
+def search_backend_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the counters of every backend used so far."""
+    with _backends_lock:
+        backends = dict(_backends)
+    return {name: backend.stats() for name, backend in backends.items()}
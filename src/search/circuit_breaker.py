@@ -0,0 +1,99 @@
+"""
+Circuit breaker for search backends.
+
+After a number of consecutive failures (errors or missed deadlines) a backend
+is skipped for a cool-down period instead of costing every interview turn its
+full deadline. When the cool-down is over, one trial call is let through: a
+success closes the breaker again, a failure re-opens it.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from src.config.default_settings import (
+    DEFAULT_SEARCH_BREAKER_FAILURES,
+    DEFAULT_SEARCH_BREAKER_RESET_SECONDS,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_SEARCH_BREAKER_FAILURES,
+                 reset_seconds: float = DEFAULT_SEARCH_BREAKER_RESET_SECONDS):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_seconds: How long the breaker stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Check whether a call may go through (claims the trial call when half-open)."""
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        """Count a failed call; opens the breaker at the threshold or after a failed trial."""
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._stats["opened"] += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release(self) -> None:
+        """Give back a trial call that ended without a result (e.g. cancelled)."""
+        with self._lock:
+            self._trial_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return breaker counters.
+
+        Returns:
+            Dict with the state, consecutive failures, times opened and rejected calls
+        """
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures, **self._stats}
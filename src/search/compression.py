@@ -0,0 +1,175 @@
+"""
+Extractive compression of search documents.
+
+Search backends return whole pages (a Wikipedia document is up to 4000
+characters), most of which is unrelated to the query and would otherwise be
+re-sent every turn. Before the results enter the interview context, each
+document longer than its character budget is split into sentences,
+boilerplate is dropped, and sentences are selected by maximal marginal
+relevance (relevance to the query minus redundancy with the sentences already
+kept) until the budget is used. Kept sentences stay in page order under the
+document's original `<Document ...>` tag.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.config.default_settings import (
+    DEFAULT_DOCUMENT_CHAR_BUDGET,
+    DEFAULT_COMPRESSION_MMR_LAMBDA,
+)
+from src.utils.logger import logger
+from src.utils.token_budget import DOCUMENT_SEPARATOR, STOPWORDS, split_documents
+
+# Sentences shorter than this carry no content of their own (headings, captions, menus)
+MIN_SENTENCE_CHARS = 25
+
+# Weight of the page position in the relevance score: earlier sentences win ties
+POSITION_WEIGHT = 0.1
+
+BOILERPLATE = re.compile(
+    r"cookies|subscribe|sign up|sign in|log in|newsletter|all rights reserved|©|"
+    r"privacy policy|terms of (use|service)|click here|share this|advertisement|skip to (main )?content|"
+    r"enable javascript|read more|follow us",
+    re.I,
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences at sentence punctuation and line breaks."""
+    return [" ".join(sentence.split()) for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+def is_boilerplate(sentence: str) -> bool:
+    """Check whether a sentence is navigation, legal or promotional boilerplate."""
+    if len(sentence) < MIN_SENTENCE_CHARS:
+        return True
+    letters = sum(character.isalpha() for character in sentence)
+    return letters < len(sentence) / 2 or bool(BOILERPLATE.search(sentence))
+
+
+def _term_vectors(texts: List[str]) -> np.ndarray:
+    """Unit-length TF-IDF vectors of texts over their joint vocabulary."""
+    tokens = [[term for term in re.findall(r"\w+", text.lower()) if term not in STOPWORDS] for text in texts]
+    vocabulary = {term: index for index, term in enumerate(dict.fromkeys(term for terms in tokens for term in terms))}
+    matrix = np.zeros((len(texts), max(len(vocabulary), 1)))
+    for row, terms in enumerate(tokens):
+        for term in terms:
+            matrix[row, vocabulary[term]] += 1.0
+    document_frequency = (matrix > 0).sum(axis=0)
+    matrix = np.log1p(matrix) * np.log((1.0 + len(texts)) / (1.0 + document_frequency) + 1.0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def select_sentences(sentences: List[str], query: str, budget: int,
+                     mmr_lambda: float = DEFAULT_COMPRESSION_MMR_LAMBDA) -> List[int]:
+    """
+    Select sentences within a character budget by maximal marginal relevance.
+
+    Args:
+        sentences: Candidate sentences
+        query: Text the sentences should be relevant to
+        budget: Maximum characters of the selected sentences
+        mmr_lambda: Trade-off between relevance (1.0) and novelty (0.0)
+
+    Returns:
+        Indices of the selected sentences, in page order
+    """
+    vectors = _term_vectors(sentences + [query])
+    relevance = vectors[:-1] @ vectors[-1]
+    relevance = relevance + POSITION_WEIGHT * (1.0 - np.arange(len(sentences)) / max(len(sentences), 1))
+    similarity = vectors[:-1] @ vectors[:-1].T
+
+    selected: List[int] = []
+    redundancy = np.zeros(len(sentences))
+    available = np.ones(len(sentences), dtype=bool)
+    used = 0
+    while available.any():
+        scores = np.where(available, mmr_lambda * relevance - (1.0 - mmr_lambda) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        available[best] = False
+        # +1 for the space joining sentences
+        if used + len(sentences[best]) + 1 > budget:
+            continue
+        selected.append(best)
+        used += len(sentences[best]) + 1
+        redundancy = np.maximum(redundancy, similarity[best])
+    return sorted(selected)
+
+
+_stats = {"documents": 0, "compressed": 0, "input_characters": 0, "output_characters": 0}
+_stats_lock = threading.Lock()
+
+
+def compress_document(document: str, query: str, budget: int = DEFAULT_DOCUMENT_CHAR_BUDGET) -> str:
+    """
+    Compress one formatted document to at most about budget characters of content.
+
+    Args:
+        document: One `<Document ...>` block
+        query: Search query the document was retrieved for
+        budget: Maximum characters of document content
+
+    Returns:
+        The document with its most relevant sentences, or unchanged when it fits
+    """
+    header, _, body = document.partition("\n")
+    body = body.replace("</Document>", "").strip()
+    if len(body) <= budget:
+        return document
+
+    sentences = [sentence for sentence in split_sentences(body) if not is_boilerplate(sentence)]
+    if not sentences:
+        return f"{header}\n{body[:budget]}\n</Document>"
+    kept = " ".join(sentences[index] for index in select_sentences(sentences, query, budget))
+    # A single sentence longer than the whole budget
+    return f"{header}\n{kept or sentences[0][:budget]}\n</Document>"
+
+
+def compress_results(formatted: str, query: str, budget: int = DEFAULT_DOCUMENT_CHAR_BUDGET) -> str:
+    """
+    Compress every document of a formatted search result.
+
+    Args:
+        formatted: `<Document ...>` blocks separated by DOCUMENT_SEPARATOR
+        query: Search query the documents were retrieved for
+        budget: Maximum characters of content per document
+
+    Returns:
+        The compressed documents, in the same format
+    """
+    documents = split_documents([formatted])
+    compressed = [compress_document(document, query, budget) for document in documents]
+
+    input_characters = sum(len(document) for document in documents)
+    output_characters = sum(len(document) for document in compressed)
+    with _stats_lock:
+        _stats["documents"] += len(documents)
+        _stats["compressed"] += sum(a != b for a, b in zip(documents, compressed))
+        _stats["input_characters"] += input_characters
+        _stats["output_characters"] += output_characters
+    if output_characters < input_characters:
+        logger.info(f"Compressed search results for '{query}': {output_characters}/{input_characters} characters "
+                    f"(ratio {output_characters / input_characters:.2f})")
+    return DOCUMENT_SEPARATOR.join(compressed)
+
+
+def compression_stats() -> Dict[str, Any]:
+    """
+    Return document compression counters.
+
+    Returns:
+        Dict with documents seen and compressed, characters before and after
+        compression and the overall compression ratio
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["ratio"] = (stats["output_characters"] / stats["input_characters"]
+                      if stats["input_characters"] else 1.0)
+    return stats
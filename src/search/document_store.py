@@ -0,0 +1,377 @@
+"""
+Run-scoped store of retrieved documents.
+
+Parallel interviews on one topic retrieve many of the same pages. Instead of
+copying every formatted `<Document ...>` block into each interview's `context`,
+the search nodes add the documents to the store of the current run and put
+short references into the graph state. Documents are deduplicated by
+normalized URL (plus Wikipedia section) and by content hash, identical queries
+within a run are searched once, and the prompt builders resolve references
+back to documents right before formatting a prompt.
+
+Documents are stored whole. Query-dependent versions of a document (the
+sentences compressed for one query) are stored as variants of it, so an
+interview retrieving a page already stored for another query gets the page
+compressed for its own query.
+
+A run is identified by the LangGraph thread id of the calling node. With the
+durable checkpointer, stored documents are persisted next to the run's
+checkpoints and restored when a resumed run first needs them.
+"""
+
+import asyncio
+import hashlib
+import re
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langchain_core.runnables.config import var_child_runnable_config
+
+from src.search.search_cache import normalize_query
+from src.utils.logger import logger
+from src.utils.token_budget import split_documents
+
+# Context entries starting with this prefix reference documents in a store
+DOCUMENT_REF_PREFIX = "docref://"
+
+# Separates a document id from the key of one of its variants
+VARIANT_SEPARATOR = "@"
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMETERS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"}
+
+_HEADER_ATTRIBUTE = re.compile(r'(\w+)="([^"]*)"')
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL: scheme and host case, default ports, fragments, tracking parameters and trailing slashes."""
+    parts = urlsplit(url.strip())
+    netloc = parts.netloc.lower()
+    if (parts.scheme == "http" and netloc.endswith(":80")) or (parts.scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMETERS
+    ))
+    # http and https serve the same document for deduplication purposes
+    return urlunsplit(("https", netloc, parts.path.rstrip("/") or "/", query, ""))
+
+
+def normalize_document(document: str) -> str:
+    """Normalize the whitespace of a formatted document block."""
+    lines = [line.rstrip() for line in document.strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+def _document_keys(document: str) -> Dict[str, Optional[str]]:
+    """Return the URL key and the content hash of a formatted document."""
+    header, _, body = document.partition("\n")
+    attributes = dict(_HEADER_ATTRIBUTE.findall(header))
+    url = attributes.get("href") or attributes.get("source")
+    url_key = None
+    if url:
+        # Sections of one Wikipedia article share the article URL
+        url_key = normalize_url(url) + (f"#{attributes['page']}" if attributes.get("page") else "")
+    content = " ".join(body.replace("</Document>", "").lower().split())
+    return {"url": url_key, "content": hashlib.sha256(content.encode("utf-8")).hexdigest()}
+
+
+def current_run_id() -> str:
+    """Return the id of the run the calling graph node belongs to (its thread id)."""
+    config = var_child_runnable_config.get() or {}
+    return str((config.get("configurable") or {}).get("thread_id") or "default")
+
+
+class DocumentStore:
+    """
+    Deduplicating store of the documents retrieved during one run.
+    """
+
+    def __init__(self, run_id: str, checkpointer: Optional[Any] = None):
+        """
+        Initialize an empty store.
+
+        Args:
+            run_id: Id of the run the documents belong to
+            checkpointer: DurableCheckpointSaver persisting the stored documents, if any
+        """
+        self.run_id = run_id
+        self.checkpointer = checkpointer
+        self._documents: Dict[str, str] = {}
+        self._url_index: Dict[str, str] = {}
+        self._content_index: Dict[str, str] = {}
+        self._queries: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._query_locks: Dict[str, threading.Lock] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._stats = {"documents_seen": 0, "documents_stored": 0, "url_duplicates": 0,
+                       "content_duplicates": 0, "characters_stored": 0, "characters_deduplicated": 0,
+                       "searches": 0, "searches_saved": 0}
+
+    def restore(self) -> int:
+        """
+        Reload the documents persisted for the run (after a resume).
+
+        Returns:
+            Number of documents restored
+        """
+        if self.checkpointer is None:
+            return 0
+        documents = self.checkpointer.load_documents(self.run_id)
+        with self._lock:
+            for document_id, document in documents:
+                self._documents[document_id] = document
+                if VARIANT_SEPARATOR in document_id:
+                    continue
+                keys = _document_keys(document)
+                self._content_index[keys["content"]] = document_id
+                if keys["url"]:
+                    self._url_index[keys["url"]] = document_id
+        if documents:
+            logger.info(f"Restored {len(documents)} documents of run {self.run_id}")
+        return len(documents)
+
+    def ref(self, document_id: str) -> str:
+        """Build the context reference of a stored document."""
+        return f"{DOCUMENT_REF_PREFIX}{self.run_id}/{document_id}"
+
+    def add(self, document: str) -> str:
+        """
+        Add a formatted document, unless it is already stored.
+
+        Args:
+            document: One `<Document ...>` block
+
+        Returns:
+            Reference of the stored (or previously stored) document
+        """
+        document = normalize_document(document)
+        keys = _document_keys(document)
+        with self._lock:
+            self._stats["documents_seen"] += 1
+            if keys["url"] and keys["url"] in self._url_index:
+                self._stats["url_duplicates"] += 1
+                self._stats["characters_deduplicated"] += len(document)
+                return self.ref(self._url_index[keys["url"]])
+            if keys["content"] in self._content_index:
+                self._stats["content_duplicates"] += 1
+                self._stats["characters_deduplicated"] += len(document)
+                document_id = self._content_index[keys["content"]]
+            else:
+                document_id = hashlib.sha1((keys["url"] or keys["content"]).encode("utf-8")).hexdigest()[:16]
+                self._documents[document_id] = document
+                self._content_index[keys["content"]] = document_id
+                self._stats["documents_stored"] += 1
+                self._stats["characters_stored"] += len(document)
+                if self.checkpointer is not None:
+                    self.checkpointer.put_document(self.run_id, document_id, document)
+            if keys["url"]:
+                self._url_index[keys["url"]] = document_id
+            return self.ref(document_id)
+
+    def add_variant(self, ref: str, variant: str, transform: Callable[[str], str]) -> str:
+        """
+        Add a variant of a stored document, unless it is already stored.
+
+        Args:
+            ref: Reference of the stored document
+            variant: Key of the variant (e.g. the query it is compressed for)
+            transform: Builds the variant from the document
+
+        Returns:
+            Reference of the variant
+        """
+        document_id = ref.rsplit("/", 1)[-1]
+        variant_id = f"{document_id}{VARIANT_SEPARATOR}{hashlib.sha1(variant.encode('utf-8')).hexdigest()[:12]}"
+        with self._lock:
+            if variant_id in self._documents:
+                return self.ref(variant_id)
+            document = self._documents[document_id]
+        transformed = transform(document)
+        with self._lock:
+            if variant_id not in self._documents:
+                self._documents[variant_id] = transformed
+                if self.checkpointer is not None:
+                    self.checkpointer.put_document(self.run_id, variant_id, transformed)
+        return self.ref(variant_id)
+
+    def add_results(self, formatted: str, transform: Optional[Callable[[str], str]] = None,
+                    variant: str = "") -> List[str]:
+        """
+        Add every document of a formatted search result and return their references.
+
+        Args:
+            formatted: `<Document ...>` blocks of a search result
+            transform: When given, the references point to the variant it builds of each document
+            variant: Key of that variant
+
+        Returns:
+            References of the documents (or of their variants)
+        """
+        refs = [self.add(document) for document in split_documents([formatted])]
+        if transform is not None:
+            refs = [self.add_variant(ref, variant, transform) for ref in refs]
+        return list(dict.fromkeys(refs))
+
+    def get(self, ref: str) -> Optional[str]:
+        """Return the document a reference points to, or None when it is not in this store."""
+        with self._lock:
+            return self._documents.get(ref.rsplit("/", 1)[-1])
+
+    def _remember_query(self, key: str, refs: List[str]) -> None:
+        # Empty results are not remembered, they are usually transient backend failures
+        if refs:
+            with self._lock:
+                self._queries[key] = refs
+
+    def _known_query(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            refs = self._queries.get(key)
+            self._stats["searches" if refs is None else "searches_saved"] += 1
+            return refs
+
+    def get_or_search(self, backend: str, query: str, search: Callable[[], str],
+                      compress: Optional[Callable[[str], str]] = None) -> List[str]:
+        """
+        Return the references of a query's results, searching only once per run.
+
+        Concurrent calls for the same query wait for the first one.
+
+        Args:
+            backend: Search backend name
+            query: Search query
+            search: Runs the search and returns formatted results
+            compress: Compresses a document for the query; the references then
+                point to the documents' variants for the query
+
+        Returns:
+            References of the result documents
+        """
+        key = f"{backend}\x00{normalize_query(query)}"
+        with self._lock:
+            query_lock = self._query_locks.setdefault(key, threading.Lock())
+        with query_lock:
+            refs = self._known_query(key)
+            if refs is None:
+                refs = self.add_results(search(), compress, normalize_query(query))
+                self._remember_query(key, refs)
+            return refs
+
+    async def aget_or_search(self, backend: str, query: str, search: Callable[[], Awaitable[str]],
+                             compress: Optional[Callable[[str], str]] = None) -> List[str]:
+        """Async version of get_or_search; concurrent calls share one search task."""
+        key = f"{backend}\x00{normalize_query(query)}"
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Waiting does not cancel the shared search when this caller is
+            # cancelled, and does not raise when the search was cancelled
+            await asyncio.wait({pending})
+            if not pending.cancelled():
+                refs = pending.result()
+                with self._lock:
+                    self._stats["searches_saved"] += 1
+                return refs
+            # The search was cancelled by the caller that started it, run it again below
+
+        refs = self._known_query(key)
+        if refs is not None:
+            return refs
+
+        async def run() -> List[str]:
+            try:
+                refs = self.add_results(await search(), compress, normalize_query(query))
+                self._remember_query(key, refs)
+                return refs
+            finally:
+                self._pending.pop(key, None)
+
+        # Cancelling the caller that starts the search (e.g. at its deadline) cancels the search
+        task = asyncio.ensure_future(run())
+        self._pending[key] = task
+        return await task
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return deduplication counters of the run.
+
+        Returns:
+            Dict with documents seen and stored, duplicates by URL and by content,
+            stored and deduplicated characters, and searches run and saved
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["dedup_rate"] = (
+            (stats["url_duplicates"] + stats["content_duplicates"]) / stats["documents_seen"]
+            if stats["documents_seen"] else 0.0
+        )
+        return stats
+
+
+_stores: Dict[str, DocumentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_document_store(run_id: Optional[str] = None) -> DocumentStore:
+    """Return the store of a run (by default the calling node's run), creating it on first use."""
+    run_id = run_id or current_run_id()
+    with _stores_lock:
+        if run_id not in _stores:
+            from src.utils.checkpointer import get_durable_checkpointer
+            store = DocumentStore(run_id, get_durable_checkpointer())
+            store.restore()
+            _stores[run_id] = store
+        return _stores[run_id]
+
+
+def release_document_store(run_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Drop the store of a finished run.
+
+    Returns:
+        The final stats of the store, or None when the run has no store
+    """
+    with _stores_lock:
+        store = _stores.pop(run_id, None)
+    return store.stats() if store is not None else None
+
+
+def document_store_stats(run_id: str) -> Optional[Dict[str, Any]]:
+    """Return the stats of a run's store, or None when the run has no store."""
+    with _stores_lock:
+        store = _stores.get(run_id)
+    return store.stats() if store is not None else None
+
+
+def resolve_context(context: List[Any]) -> List[str]:
+    """
+    Replace document references in interview context by the documents.
+
+    Entries that are not references (formatted search results) are kept as
+    they are; repeated references are resolved once.
+
+    Args:
+        context: Interview context
+
+    Returns:
+        Context entries holding formatted documents
+    """
+    resolved = []
+    for entry in dict.fromkeys(str(entry) for entry in context):
+        if not entry.startswith(DOCUMENT_REF_PREFIX):
+            resolved.append(entry)
+            continue
+        run_id = entry[len(DOCUMENT_REF_PREFIX):].rsplit("/", 1)[0]
+        with _stores_lock:
+            store = _stores.get(run_id)
+        if store is None:
+            # The run was resumed or its store released, its documents are reloaded from disk
+            store = get_document_store(run_id)
+        document = store.get(entry)
+        if document is None:
+            logger.warning(f"Document {entry} is no longer available")
+            continue
+        resolved.append(document)
+    return resolved
@@ -0,0 +1,111 @@
+"""
+Offline stand-ins for the Tavily and Wikipedia search backends.
+
+Both serve the fixture documents in fixtures/documents.json, ranked by term
+overlap with the query, after a simulated latency drawn from a latency profile.
+Results only depend on the query and the seed. Enable them with
+SEARCH_PROVIDER=fake (see web_search.py).
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Union
+
+from langchain_core.documents import Document
+
+from src.models.fake_llm import keywords, sample_latency
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "documents.json")
+
+
+@lru_cache(maxsize=1)
+def load_fixture_documents() -> List[Dict[str, Any]]:
+    """Load the fixture documents served by the fake backends."""
+    with open(FIXTURES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def rank_fixture_documents(query: str, wikipedia: bool, limit: int) -> List[Dict[str, Any]]:
+    """
+    Return the fixture documents of one backend that best match a query.
+
+    Args:
+        query: Search query
+        wikipedia: Whether to search the Wikipedia fixtures or the web fixtures
+        limit: Maximum number of documents
+
+    Returns:
+        Documents ordered by descending term overlap (fixture order breaks ties)
+    """
+    terms = set(keywords(query, 20))
+    documents = [document for document in load_fixture_documents()
+                 if bool(document.get("wikipedia")) == wikipedia]
+
+    def overlap(document: Dict[str, Any]) -> int:
+        return len(terms & set(keywords(f'{document["title"]} {document["content"]}', 200)))
+
+    return sorted(documents, key=overlap, reverse=True)[:limit]
+
+
+def _query_text(query: Union[str, Dict[str, Any]]) -> str:
+    # The Tavily tool accepts either a string or {"query": ...}
+    return query.get("query", "") if isinstance(query, dict) else str(query)
+
+
+class FakeTavilySearch:
+    """Drop-in replacement for TavilySearchResults serving fixture documents."""
+
+    def __init__(self, max_results: int = 5, latency_profile: str = "none", seed: int = 0):
+        self.max_results = max_results
+        self.latency_profile = latency_profile
+        self.seed = seed
+
+    def _latency(self, query: str) -> float:
+        return sample_latency(self.latency_profile, random.Random(f"{self.seed}:tavily:{query}"))
+
+    def _results(self, query: str) -> List[Dict[str, Any]]:
+        return [
+            {"title": document["title"], "url": document["url"], "content": document["content"]}
+            for document in rank_fixture_documents(query, False, self.max_results)
+        ]
+
+    def invoke(self, query: Union[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Search the web fixtures."""
+        query = _query_text(query)
+        time.sleep(self._latency(query))
+        return self._results(query)
+
+    async def ainvoke(self, query: Union[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Async version of invoke."""
+        query = _query_text(query)
+        await asyncio.sleep(self._latency(query))
+        return self._results(query)
+
+
+def fake_wikipedia_load(query: str, load_max_docs: int = 2,
+                        latency_profile: str = "none", seed: int = 0) -> List[Document]:
+    """
+    Drop-in replacement for WikipediaLoader(...).load() serving fixture documents.
+
+    Args:
+        query: Search query
+        load_max_docs: Maximum number of documents
+        latency_profile: Name of a profile in DEFAULT_FAKE_LATENCY_PROFILES
+        seed: Seed of the simulated latency
+
+    Returns:
+        Documents with the metadata keys set by WikipediaLoader
+    """
+    time.sleep(sample_latency(latency_profile, random.Random(f"{seed}:wikipedia:{query}")))
+    return [
+        Document(
+            page_content=document["content"],
+            metadata={"title": document["title"], "summary": document["content"][:200],
+                      "source": document["url"]},
+        )
+        for document in rank_fixture_documents(query, True, load_max_docs)
+    ]
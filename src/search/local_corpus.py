@@ -0,0 +1,389 @@
+"""
+Local document corpus retriever.
+
+Indexes a directory of internal documents (text, markdown, reStructuredText,
+and PDF when pypdf is installed) so analysts can draw on them next to Tavily
+and Wikipedia. Files are split into passages, embedded with a vectorizer (by
+default signed feature hashing of words and word pairs, no model download)
+and stored as rows of a memory-mapped float32 matrix; chunk metadata lives in
+SQLite next to it. Queries are answered with one vectorized cosine product
+over the matrix.
+
+Re-indexing is incremental: unchanged files (same size, modification time or
+content hash) are skipped, rows of changed and deleted files are tombstoned
+and new rows are appended. The matrix is compacted once most rows are dead.
+
+Build or refresh the index with:
+    python -m src.search.local_corpus index --dir path/to/documents
+and enable the "local" backend in DEFAULT_SEARCH_BACKENDS to search it in
+every interview turn.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple
+
+import numpy as np
+
+from src.config.default_settings import (
+    DEFAULT_LOCAL_CORPUS_INDEX_DIR,
+    DEFAULT_LOCAL_CORPUS_FEATURES,
+    DEFAULT_LOCAL_CORPUS_CHUNK_WORDS,
+    DEFAULT_N_DOCUMENT_TO_SEARCH,
+)
+from src.search.backends import SearchBackend
+from src.search.passage_ranker import split_passages
+from src.utils.logger import logger, print_error, print_info, print_success, print_warning
+from src.utils.token_budget import DOCUMENT_SEPARATOR, STOPWORDS
+
+TEXT_EXTENSIONS = {".txt", ".md", ".markdown", ".rst", ".text"}
+PDF_EXTENSIONS = {".pdf"}
+
+# Compact the matrix when more than this fraction of its rows is dead
+COMPACTION_THRESHOLD = 0.5
+
+VECTORS_FILE = "vectors.f32"
+METADATA_FILE = "corpus.sqlite3"
+
+
+class Vectorizer(Protocol):
+    """Turns texts into fixed-size vectors; any implementation can back the index."""
+
+    name: str
+    dimension: int
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        ...
+
+
+class HashingVectorizer:
+    """
+    Signed feature hashing of word unigrams and bigrams, L2-normalized.
+    """
+
+    def __init__(self, dimension: int = DEFAULT_LOCAL_CORPUS_FEATURES):
+        self.dimension = dimension
+        self.name = f"hashing-{dimension}"
+
+    @staticmethod
+    def _features(text: str) -> Iterator[str]:
+        terms = [term for term in re.findall(r"\w+", text.lower()) if term not in STOPWORDS]
+        yield from terms
+        yield from (f"{first} {second}" for first, second in zip(terms, terms[1:]))
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        """Vectorize texts into a (len(texts), dimension) float32 matrix of unit rows."""
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+                # The top bit picks the sign, so colliding features tend to cancel out
+                matrix[row, digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def read_document(path: str) -> Optional[str]:
+    """Read the text of a file, or None when the format is not supported."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in TEXT_EXTENSIONS:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+    if extension in PDF_EXTENSIONS:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            logger.warning(f"Skipping {path}: install pypdf to index PDF files")
+            return None
+        return "\n\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    return None
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LocalCorpusIndex:
+    """
+    Memory-mapped vector index over the files of a directory.
+    """
+
+    def __init__(self, index_dir: str = DEFAULT_LOCAL_CORPUS_INDEX_DIR,
+                 vectorizer: Optional[Vectorizer] = None,
+                 chunk_words: int = DEFAULT_LOCAL_CORPUS_CHUNK_WORDS):
+        """
+        Open (or create) an index.
+
+        Args:
+            index_dir: Directory holding the vector matrix and the chunk metadata
+            vectorizer: Vectorizer of chunks and queries (default: HashingVectorizer)
+            chunk_words: Chunk size in words
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        self.index_dir = index_dir
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.chunk_words = chunk_words
+        self._vectors_path = os.path.join(index_dir, VECTORS_FILE)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(index_dir, METADATA_FILE), check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "mtime REAL NOT NULL, sha256 TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS chunks (row INTEGER PRIMARY KEY, path TEXT NOT NULL, "
+            "chunk INTEGER NOT NULL, text TEXT NOT NULL, active INTEGER NOT NULL DEFAULT 1);"
+            "CREATE INDEX IF NOT EXISTS chunks_path ON chunks (path);"
+        )
+        self._conn.commit()
+
+        stored = self._conn.execute("SELECT value FROM meta WHERE key = 'vectorizer'").fetchone()
+        if stored is not None and stored[0] != self.vectorizer.name:
+            logger.info(f"Vectorizer changed ({stored[0]} -> {self.vectorizer.name}), rebuilding the corpus index")
+            self._clear()
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('vectorizer', ?)",
+                           (self.vectorizer.name,))
+        self._conn.commit()
+        self._load()
+
+    def _clear(self) -> None:
+        self._conn.executescript("DELETE FROM files; DELETE FROM chunks;")
+        self._conn.commit()
+        if os.path.exists(self._vectors_path):
+            os.remove(self._vectors_path)
+
+    def _load(self) -> None:
+        """Map the vector matrix and load the mask of live rows."""
+        rows = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()[0]
+        self._matrix = None
+        if rows and os.path.exists(self._vectors_path):
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                     shape=(rows, self.vectorizer.dimension))
+        self._active = np.zeros(rows, dtype=bool)
+        for (row,) in self._conn.execute("SELECT row FROM chunks WHERE active = 1"):
+            self._active[row] = True
+
+    def _append(self, path: str, text: str) -> int:
+        """Chunk, vectorize and append a file's text; returns the number of chunks."""
+        chunks = split_passages(text, self.chunk_words)
+        if not chunks:
+            return 0
+        start = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()[0]
+        vectors = self.vectorizer.transform(chunks).astype(np.float32)
+        with open(self._vectors_path, "ab") as f:
+            f.seek(start * self.vectorizer.dimension * 4)
+            f.truncate()
+            f.write(vectors.tobytes())
+        self._conn.executemany(
+            "INSERT INTO chunks (row, path, chunk, text) VALUES (?, ?, ?, ?)",
+            [(start + index, path, index, chunk) for index, chunk in enumerate(chunks)],
+        )
+        return len(chunks)
+
+    def reindex(self, directory: str) -> Dict[str, int]:
+        """
+        Bring the index up to date with a directory.
+
+        Args:
+            directory: Root of the documents (searched recursively)
+
+        Returns:
+            Dict with the number of added, updated, unchanged and removed files and added chunks
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "chunks": 0}
+        directory = os.path.abspath(directory)
+        with self._lock:
+            known = {path: (size, mtime, sha256) for path, size, mtime, sha256
+                     in self._conn.execute("SELECT path, size, mtime, sha256 FROM files")}
+            seen = set()
+            for root, _, names in os.walk(directory):
+                for name in sorted(names):
+                    extension = os.path.splitext(name)[1].lower()
+                    if extension not in TEXT_EXTENSIONS | PDF_EXTENSIONS:
+                        continue
+                    full_path = os.path.join(root, name)
+                    path = os.path.relpath(full_path, directory)
+                    seen.add(path)
+                    stat = os.stat(full_path)
+                    previous = known.get(path)
+                    if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime:
+                        counts["unchanged"] += 1
+                        continue
+                    sha256 = _file_hash(full_path)
+                    if previous and previous[2] == sha256:
+                        # Touched but not modified
+                        self._conn.execute("UPDATE files SET mtime = ? WHERE path = ?", (stat.st_mtime, path))
+                        counts["unchanged"] += 1
+                        continue
+                    text = read_document(full_path)
+                    if text is None:
+                        continue
+                    self._conn.execute("UPDATE chunks SET active = 0 WHERE path = ?", (path,))
+                    counts["chunks"] += self._append(path, text)
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO files (path, size, mtime, sha256) VALUES (?, ?, ?, ?)",
+                        (path, stat.st_size, stat.st_mtime, sha256),
+                    )
+                    counts["updated" if previous else "added"] += 1
+
+            for path in set(known) - seen:
+                self._conn.execute("UPDATE chunks SET active = 0 WHERE path = ?", (path,))
+                self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                counts["removed"] += 1
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('directory', ?)", (directory,))
+            self._conn.commit()
+            self._load()
+            if len(self._active) and 1.0 - self._active.mean() > COMPACTION_THRESHOLD:
+                self.compact()
+        return counts
+
+    def compact(self) -> None:
+        """Rewrite the matrix and chunk rows without the dead rows."""
+        with self._lock:
+            live = np.flatnonzero(self._active)
+            vectors = np.array(self._matrix[live]) if self._matrix is not None and len(live) else None
+            chunks = self._conn.execute(
+                "SELECT path, chunk, text FROM chunks WHERE active = 1 ORDER BY row"
+            ).fetchall()
+            self._matrix = None
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.executemany(
+                "INSERT INTO chunks (row, path, chunk, text) VALUES (?, ?, ?, ?)",
+                [(row, path, chunk, text) for row, (path, chunk, text) in enumerate(chunks)],
+            )
+            self._conn.commit()
+            temporary_path = self._vectors_path + ".tmp"
+            with open(temporary_path, "wb") as f:
+                if vectors is not None:
+                    f.write(vectors.astype(np.float32).tobytes())
+            os.replace(temporary_path, self._vectors_path)
+            self._load()
+            logger.info(f"Compacted the local corpus index to {len(chunks)} chunks")
+
+    def search(self, query: str, limit: int = DEFAULT_N_DOCUMENT_TO_SEARCH) -> List[Tuple[str, int, str, float]]:
+        """
+        Return the chunks most similar to a query.
+
+        Args:
+            query: Search query
+            limit: Maximum number of chunks
+
+        Returns:
+            List of (file path, chunk number, chunk text, cosine similarity), best first
+        """
+        with self._lock:
+            if self._matrix is None or not self._active.any():
+                return []
+            scores = np.asarray(self._matrix @ self.vectorizer.transform([query])[0])
+            scores[~self._active] = -np.inf
+            limit = min(limit, int(self._active.sum()))
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            top = top[np.argsort(-scores[top])]
+            results = []
+            for row in top:
+                if scores[row] <= 0:
+                    break
+                path, chunk, text = self._conn.execute(
+                    "SELECT path, chunk, text FROM chunks WHERE row = ?", (int(row),)
+                ).fetchone()
+                results.append((path, chunk, text, float(scores[row])))
+            return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of indexed files, live chunks and dead rows."""
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            return {"files": files, "chunks": int(self._active.sum()),
+                    "dead_rows": int(len(self._active) - self._active.sum())}
+
+
+def format_chunks(results: List[Tuple[str, int, str, float]]) -> str:
+    """Format search results as <Document> blocks (the chunk number is the page)."""
+    return DOCUMENT_SEPARATOR.join(
+        f'<Document source="{path}" page="{chunk + 1}"/>\n{text}\n</Document>'
+        for path, chunk, text, _ in results
+    )
+
+
+class LocalCorpusBackend(SearchBackend):
+    """Search backend over the local corpus index, refreshed incrementally on first use."""
+
+    name = "local"
+    # Local documents are searched with the planned web query
+    query_key = "web"
+
+    def __init__(self, deadline_seconds: float = 2.0, directory: Optional[str] = None,
+                 index_dir: str = DEFAULT_LOCAL_CORPUS_INDEX_DIR):
+        super().__init__(deadline_seconds)
+        self.directory = directory
+        self.index_dir = index_dir
+        self._index: Optional[LocalCorpusIndex] = None
+        self._index_lock = threading.Lock()
+
+    def get_index(self) -> LocalCorpusIndex:
+        """Open the index, bringing it up to date with the corpus directory once per process."""
+        with self._index_lock:
+            if self._index is None:
+                from src.config.settings import get_setting
+                index = LocalCorpusIndex(self.index_dir)
+                directory = self.directory or get_setting("LOCAL_CORPUS_DIR")
+                if directory:
+                    counts = index.reindex(directory)
+                    logger.info(f"Local corpus index refreshed from {directory}: {counts}")
+                self._index = index
+            return self._index
+
+    def search(self, query: str) -> str:
+        return format_chunks(self.get_index().search(query, DEFAULT_N_DOCUMENT_TO_SEARCH))
+
+
+def main() -> int:
+    """Build, refresh or query the index from the command line."""
+    parser = argparse.ArgumentParser(description="Local document corpus index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Index (or re-index) a directory")
+    index_parser.add_argument("--dir", type=str, required=True, help="Directory of documents")
+    index_parser.add_argument("--index", type=str, default=DEFAULT_LOCAL_CORPUS_INDEX_DIR,
+                              help="Index directory")
+
+    search_parser = subparsers.add_parser("search", help="Query the index")
+    search_parser.add_argument("query", type=str, help="Search query")
+    search_parser.add_argument("--index", type=str, default=DEFAULT_LOCAL_CORPUS_INDEX_DIR,
+                               help="Index directory")
+    search_parser.add_argument("--limit", type=int, default=3, help="Number of results")
+
+    args = parser.parse_args()
+    index = LocalCorpusIndex(args.index)
+
+    if args.command == "index":
+        if not os.path.isdir(args.dir):
+            print_error(f"{args.dir} is not a directory")
+            return 1
+        started = time.monotonic()
+        counts = index.reindex(args.dir)
+        print_success(f"Indexed {args.dir} in {time.monotonic() - started:.1f}s: {counts} ({index.stats()})")
+        return 0
+
+    started = time.perf_counter()
+    results = index.search(args.query, args.limit)
+    print_info(f"{len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+    if not results:
+        print_warning("No matching chunks")
+    for path, chunk, text, score in results:
+        print(f"{path} (chunk {chunk + 1}, similarity {score:.3f})")
+        print(f"  {text[:200]}...")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
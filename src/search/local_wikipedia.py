@@ -0,0 +1,356 @@
+"""
+Offline Wikipedia backend over a local dump.
+
+A MediaWiki XML dump (.xml or .xml.bz2) or a JSONL file is split into article
+sections and indexed with SQLite FTS5. Queries are answered from the index in
+milliseconds, without network access, and return `Document`s with the
+`source` / `page` metadata the search formatter expects (`page` is the section).
+
+Select it with WIKIPEDIA_BACKEND=local and build the index with:
+    python -m src.search.local_wikipedia ingest --dump enwiki-latest-pages-articles.xml.bz2
+"""
+
+import argparse
+import bz2
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from langchain_core.documents import Document
+
+from src.config.default_settings import (
+    DEFAULT_LOCAL_WIKIPEDIA_INDEX_PATH,
+    DEFAULT_LOCAL_WIKIPEDIA_BASE_URL,
+    DEFAULT_LOCAL_WIKIPEDIA_MAX_SECTION_CHARS,
+)
+from src.utils.logger import logger, print_error, print_info, print_success
+
+# Sections are inserted in batches of this size during ingest
+INGEST_BATCH_SIZE = 1000
+
+# Sections shorter than this (after cleanup) are not indexed
+MIN_SECTION_CHARS = 80
+
+# Column weights for bm25(): title, section, content
+RANK_WEIGHTS = (5.0, 2.0, 1.0)
+
+# Sections that list references rather than content
+SKIPPED_SECTIONS = {"see also", "references", "external links", "further reading", "notes",
+                    "bibliography", "sources", "citations"}
+
+INTRODUCTION = "Introduction"
+
+
+def _open(path: str):
+    """Open a possibly compressed dump file for binary reading."""
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _strip_nested(text: str, start: str, end: str) -> str:
+    """Remove (possibly nested) blocks such as {{templates}} or {| tables |}."""
+    result, depth, index = [], 0, 0
+    while index < len(text):
+        if text.startswith(start, index):
+            depth += 1
+            index += len(start)
+        elif depth and text.startswith(end, index):
+            depth -= 1
+            index += len(end)
+        else:
+            if not depth:
+                result.append(text[index])
+            index += 1
+    return "".join(result)
+
+
+def clean_wikitext(text: str) -> str:
+    """Convert wikitext to plain text (templates, tables, references and markup removed)."""
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.S)
+    text = re.sub(r"<ref[^>/]*/>", "", text)
+    text = re.sub(r"<ref[^>]*>.*?</ref>", "", text, flags=re.S)
+    text = _strip_nested(text, "{{", "}}")
+    text = _strip_nested(text, "{|", "|}")
+    # File, image and category links
+    text = re.sub(r"\[\[(?:File|Image|Category):[^\[\]]*(?:\[\[[^\]]*\]\][^\[\]]*)*\]\]", "", text, flags=re.I)
+    # [[target|label]] -> label, [[target]] -> target
+    text = re.sub(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]", r"\1", text)
+    # [http://url label] -> label
+    text = re.sub(r"\[https?://\S+\s*([^\]]*)\]", r"\1", text)
+    text = re.sub(r"'{2,}", "", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = re.sub(r"^[*#:;]+\s*", "", text, flags=re.M)
+    text = re.sub(r"[ \t]+", " ", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def split_sections(text: str) -> Iterator[Tuple[str, str]]:
+    """
+    Split an article into (section heading, section text) pairs.
+
+    Text before the first heading is returned as the "Introduction" section;
+    sub-sections are returned separately, under their own heading.
+    """
+    parts = re.split(r"^(={2,6})\s*(.+?)\s*\1\s*$", text, flags=re.M)
+    yield INTRODUCTION, parts[0]
+    for index in range(1, len(parts) - 2, 3):
+        yield clean_wikitext(parts[index + 1]), parts[index + 2]
+
+
+def iter_mediawiki_pages(path: str) -> Iterator[Tuple[str, str]]:
+    """Yield (title, wikitext) of the articles in a MediaWiki XML dump, skipping redirects."""
+    with _open(path) as f:
+        title, namespace, text = None, None, None
+        for event, element in ET.iterparse(f, events=("end",)):
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag == "title":
+                title = element.text
+            elif tag == "ns":
+                namespace = element.text
+            elif tag == "text":
+                text = element.text or ""
+            elif tag == "page":
+                if namespace == "0" and title and text and not text.lstrip().upper().startswith("#REDIRECT"):
+                    yield title, text
+                title, namespace, text = None, None, None
+                # Free the parsed page, dumps do not fit in memory
+                element.clear()
+
+
+def iter_jsonl_pages(path: str) -> Iterator[Tuple[str, str]]:
+    """Yield (title, text) from a JSONL file with "title" and "text" (or "content") fields."""
+    with _open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = record.get("text") or record.get("content") or ""
+            if record.get("title") and text:
+                yield record["title"], text
+
+
+def page_url(title: str, base_url: str = DEFAULT_LOCAL_WIKIPEDIA_BASE_URL) -> str:
+    """Build the URL of an article, as WikipediaLoader reports it in `source`."""
+    return base_url.rstrip("/") + "/" + quote(title.replace(" ", "_"))
+
+
+class LocalWikipediaIndex:
+    """
+    Section-level SQLite FTS5 index over a Wikipedia dump.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOCAL_WIKIPEDIA_INDEX_PATH, create: bool = False):
+        """
+        Open (or create) an index.
+
+        Args:
+            path: SQLite file of the index
+            create: Create the file and tables if the index does not exist yet
+
+        Raises:
+            FileNotFoundError: When the index does not exist and create is False
+        """
+        if not create and not os.path.exists(path):
+            raise FileNotFoundError(
+                f"Local Wikipedia index {path} not found. Build it with: "
+                f"python -m src.search.local_wikipedia ingest --dump <dump file> --index {path}"
+            )
+        if create:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5("
+            "title, section, content, url UNINDEXED, tokenize='porter unicode61')"
+        )
+        self._conn.commit()
+
+    def ingest(self, pages: Iterator[Tuple[str, str]], wikitext: bool = True,
+               base_url: str = DEFAULT_LOCAL_WIKIPEDIA_BASE_URL,
+               limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Split pages into sections and add them to the index.
+
+        Args:
+            pages: (title, text) pairs
+            wikitext: Whether the text is wikitext (otherwise plain text with == headings ==)
+            base_url: Base URL used to build the `source` of each article
+            limit: Maximum number of pages to ingest
+
+        Returns:
+            Dict with the number of pages and sections indexed
+        """
+        counts = {"pages": 0, "sections": 0}
+        batch: List[Tuple[str, str, str, str]] = []
+        started = time.monotonic()
+
+        def flush():
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT INTO sections (title, section, content, url) VALUES (?, ?, ?, ?)", batch
+                )
+                self._conn.commit()
+            counts["sections"] += len(batch)
+            batch.clear()
+
+        with self._lock:
+            # Bulk load: durability is irrelevant, a failed ingest is simply rerun
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("PRAGMA journal_mode=MEMORY")
+
+        for title, text in pages:
+            if limit is not None and counts["pages"] >= limit:
+                break
+            url = page_url(title, base_url)
+            for section, body in split_sections(text):
+                if section.lower() in SKIPPED_SECTIONS:
+                    continue
+                content = clean_wikitext(body) if wikitext else body.strip()
+                if len(content) >= MIN_SECTION_CHARS:
+                    batch.append((title, section, content, url))
+            counts["pages"] += 1
+            if len(batch) >= INGEST_BATCH_SIZE:
+                flush()
+                if counts["pages"] % 10000 < 100:
+                    logger.info(f"Indexed {counts['pages']} pages ({counts['sections']} sections) "
+                                f"in {time.monotonic() - started:.0f}s")
+        if batch:
+            flush()
+
+        with self._lock:
+            self._conn.execute("INSERT INTO sections (sections) VALUES ('optimize')")
+            self._conn.commit()
+        return counts
+
+    def search(self, query: str, limit: int = 2,
+               max_chars: int = DEFAULT_LOCAL_WIKIPEDIA_MAX_SECTION_CHARS) -> List[Document]:
+        """
+        Return the best matching sections, at most one per article.
+
+        Args:
+            query: Search query (free text)
+            limit: Maximum number of documents
+            max_chars: Maximum characters of section text per document
+
+        Returns:
+            Documents with title, source (article URL), page (section) and summary metadata
+        """
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        # Quoted terms joined with OR: free text never breaks the FTS5 query syntax
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, section, content, url FROM sections WHERE sections MATCH ? "
+                f"ORDER BY bm25(sections, {', '.join(str(weight) for weight in RANK_WEIGHTS)}) LIMIT ?",
+                (match, limit * 10),
+            ).fetchall()
+
+        documents, seen = [], set()
+        for title, section, content, url in rows:
+            if title in seen:
+                continue
+            seen.add(title)
+            documents.append(Document(
+                page_content=content[:max_chars],
+                metadata={"title": title, "source": url, "page": section, "summary": content[:200]},
+            ))
+            if len(documents) == limit:
+                break
+        return documents
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of indexed sections and articles."""
+        with self._lock:
+            sections, pages = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT title) FROM sections"
+            ).fetchone()
+        return {"sections": sections, "pages": pages}
+
+
+_index: Optional[LocalWikipediaIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_local_wikipedia_index(path: str = DEFAULT_LOCAL_WIKIPEDIA_INDEX_PATH) -> LocalWikipediaIndex:
+    """Return the shared index, opening it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None or _index.path != path:
+            _index = LocalWikipediaIndex(path)
+        return _index
+
+
+def main() -> int:
+    """Build or query the index from the command line."""
+    parser = argparse.ArgumentParser(description="Offline Wikipedia index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Index a MediaWiki XML or JSONL dump")
+    ingest.add_argument("--dump", type=str, required=True,
+                        help="Dump file (.xml, .xml.bz2, .jsonl, .jsonl.gz)")
+    ingest.add_argument("--index", type=str, default=DEFAULT_LOCAL_WIKIPEDIA_INDEX_PATH,
+                        help="SQLite file of the index")
+    ingest.add_argument("--format", type=str, choices=["auto", "mediawiki", "jsonl"], default="auto",
+                        help="Dump format (default: from the file name)")
+    ingest.add_argument("--plain-text", action="store_true",
+                        help="JSONL text is plain text rather than wikitext")
+    ingest.add_argument("--base-url", type=str, default=DEFAULT_LOCAL_WIKIPEDIA_BASE_URL,
+                        help="Base URL of the article links")
+    ingest.add_argument("--limit", type=int, default=None,
+                        help="Maximum number of pages to ingest")
+    ingest.add_argument("--append", action="store_true",
+                        help="Add to an existing index instead of rebuilding it")
+
+    search = subparsers.add_parser("search", help="Query the index")
+    search.add_argument("query", type=str, help="Search query")
+    search.add_argument("--index", type=str, default=DEFAULT_LOCAL_WIKIPEDIA_INDEX_PATH,
+                        help="SQLite file of the index")
+    search.add_argument("--limit", type=int, default=3, help="Number of results")
+
+    args = parser.parse_args()
+
+    if args.command == "search":
+        try:
+            index = LocalWikipediaIndex(args.index)
+        except FileNotFoundError as e:
+            print_error(str(e))
+            return 1
+        started = time.perf_counter()
+        documents = index.search(args.query, args.limit)
+        print_info(f"{len(documents)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for document in documents:
+            print(f"{document.metadata['title']} / {document.metadata['page']} ({document.metadata['source']})")
+            print(f"  {document.page_content[:200]}...")
+        return 0
+
+    fmt = args.format
+    if fmt == "auto":
+        fmt = "jsonl" if ".jsonl" in args.dump or ".json" in args.dump else "mediawiki"
+    if not args.append and os.path.exists(args.index):
+        os.remove(args.index)
+
+    index = LocalWikipediaIndex(args.index, create=True)
+    pages = iter_jsonl_pages(args.dump) if fmt == "jsonl" else iter_mediawiki_pages(args.dump)
+    started = time.monotonic()
+    counts = index.ingest(pages, wikitext=not args.plain_text, base_url=args.base_url, limit=args.limit)
+    print_success(f"Indexed {counts['pages']} pages into {counts['sections']} sections "
+                  f"in {time.monotonic() - started:.1f}s ({args.index})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+MinHash / LSH index for near-duplicate search queries.
+
+Queries are reduced to sets of token shingles (stopwords dropped, plurals
+folded). Each set is summarized by a MinHash signature whose bands are
+hashed into LSH buckets, so queries sharing most of their terms land in a
+common bucket whatever their word order or filler words. Candidates from the
+buckets are confirmed with the exact Jaccard similarity of their shingles.
+"""
+
+import hashlib
+import re
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+from src.utils.token_budget import STOPWORDS
+
+# Mersenne prime of the universal hash family; values stay far below 2**64
+_PRIME = (1 << 31) - 1
+
+
+def query_terms(query: str) -> list:
+    """Lowercase terms of a query without stopwords, with simple plurals folded."""
+    terms = []
+    for term in re.findall(r"\w+", query.lower()):
+        if term in STOPWORDS:
+            continue
+        if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def shingles(query: str, size: int = 1) -> FrozenSet[str]:
+    """
+    Return the token shingles of a query.
+
+    Args:
+        query: Search query
+        size: Tokens per shingle; 1 makes the set independent of word order
+
+    Returns:
+        Set of shingles (terms joined with spaces)
+    """
+    terms = query_terms(query)
+    if size <= 1 or len(terms) < size:
+        return frozenset(terms)
+    return frozenset(" ".join(terms[index:index + size]) for index in range(len(terms) - size + 1))
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+class MinHashLSH:
+    """
+    Banded MinHash index over short texts.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 1, seed: int = 1):
+        """
+        Initialize an empty index.
+
+        Args:
+            num_perm: Number of hash functions of a signature (a multiple of bands)
+            bands: Number of LSH bands; more bands find less similar candidates
+            shingle_size: Tokens per shingle
+            seed: Seed of the hash functions
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._shingles: Dict[str, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._shingles
+
+    def signature(self, items: Iterable[str]) -> np.ndarray:
+        """Compute the MinHash signature of a set of shingles."""
+        values = np.array(
+            [int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=4).digest(), "big") % _PRIME
+             for item in items],
+            dtype=np.uint64,
+        )
+        hashed = (values[:, None] * self._a + self._b) % _PRIME
+        return hashed.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, text: str) -> None:
+        """Index a text (e.g. a normalized query); texts without terms are ignored."""
+        if text in self._shingles:
+            return
+        items = shingles(text, self.shingle_size)
+        if not items:
+            return
+        self._shingles[text] = items
+        for key in self._band_keys(self.signature(items)):
+            self._buckets.setdefault(key, set()).add(text)
+
+    def remove(self, text: str) -> None:
+        """Drop a text from the index."""
+        items = self._shingles.pop(text, None)
+        if items is None:
+            return
+        for key in self._band_keys(self.signature(items)):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(text)
+                if not bucket:
+                    del self._buckets[key]
+
+    def clear(self) -> None:
+        """Drop every text from the index."""
+        self._buckets.clear()
+        self._shingles.clear()
+
+    def query(self, text: str, threshold: float) -> Optional[Tuple[str, float]]:
+        """
+        Find the most similar indexed text.
+
+        Args:
+            text: Text to look up
+            threshold: Minimum Jaccard similarity of the shingles
+
+        Returns:
+            Tuple of (indexed text, similarity), or None when no text is similar enough
+        """
+        items = shingles(text, self.shingle_size)
+        if not items:
+            return None
+        candidates = set()
+        for key in self._band_keys(self.signature(items)):
+            candidates |= self._buckets.get(key, set())
+
+        best = None
+        for candidate in candidates:
+            similarity = jaccard(items, self._shingles[candidate])
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
@@ -0,0 +1,175 @@
+"""
+Passage-level ranking of retrieved documents.
+
+Only a few paragraphs of each search result are usually relevant to the
+analyst's latest question. Before the expert answers, the documents in the
+interview context are split into passages, scored against the question with
+an in-process BM25 index (NumPy-vectorized), and only the top passages are
+kept. Passages are re-wrapped in their document's `<Document ...>` tag, so the
+source tags the expert cites stay intact.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.default_settings import (
+    DEFAULT_PASSAGE_WORDS,
+    DEFAULT_PASSAGE_TOP_K,
+    DEFAULT_BM25_K1,
+    DEFAULT_BM25_B,
+)
+from src.utils.logger import logger
+from src.utils.token_budget import STOPWORDS, split_documents
+
+# Marks text left out between two kept passages of the same document
+PASSAGE_GAP = "\n...\n"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [term for term in re.findall(r"\w+", text.lower()) if term not in STOPWORDS and len(term) > 1]
+
+
+def split_passages(body: str, max_words: int = DEFAULT_PASSAGE_WORDS) -> List[str]:
+    """
+    Split a document body into passages of about max_words words.
+
+    Paragraphs are merged until a passage is full; paragraphs longer than a
+    passage are split at sentence boundaries.
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", body):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph.split()) <= max_words:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(sentence for sentence in _SENTENCE_END.split(paragraph) if sentence)
+
+    passages, current, words = [], [], 0
+    for piece in pieces:
+        length = len(piece.split())
+        if current and words + length > max_words:
+            passages.append(" ".join(current))
+            current, words = [], 0
+        current.append(piece)
+        words += length
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def bm25_scores(passages: List[List[str]], query: List[str],
+                k1: float = DEFAULT_BM25_K1, b: float = DEFAULT_BM25_B) -> np.ndarray:
+    """
+    Score tokenized passages against a tokenized query with BM25.
+
+    Args:
+        passages: Token lists of the passages
+        query: Query tokens
+        k1: Term frequency saturation
+        b: Length normalization
+
+    Returns:
+        Array with one score per passage
+    """
+    query_terms = list(dict.fromkeys(query))
+    if not passages or not query_terms:
+        return np.zeros(len(passages))
+    column = {term: index for index, term in enumerate(query_terms)}
+
+    # Term frequencies of the query terms only: passages x query terms
+    tf = np.zeros((len(passages), len(query_terms)))
+    rows, cols = [], []
+    for row, tokens in enumerate(passages):
+        for token in tokens:
+            index = column.get(token)
+            if index is not None:
+                rows.append(row)
+                cols.append(index)
+    np.add.at(tf, (np.array(rows, dtype=int), np.array(cols, dtype=int)), 1.0)
+
+    lengths = np.array([len(tokens) for tokens in passages], dtype=float)
+    average_length = lengths.mean() or 1.0
+    document_frequency = (tf > 0).sum(axis=0)
+    idf = np.log(1.0 + (len(passages) - document_frequency + 0.5) / (document_frequency + 0.5))
+    normalization = k1 * (1.0 - b + b * lengths / average_length)
+    return ((tf * (k1 + 1.0)) / (tf + normalization[:, None]) * idf).sum(axis=1)
+
+
+_stats = {"calls": 0, "passages": 0, "kept": 0, "input_characters": 0, "output_characters": 0}
+_stats_lock = threading.Lock()
+
+
+def rank_passages(context: List[str], query: Optional[str],
+                  top_k: int = DEFAULT_PASSAGE_TOP_K,
+                  max_words: int = DEFAULT_PASSAGE_WORDS) -> List[str]:
+    """
+    Keep the passages of the context most relevant to a query.
+
+    Args:
+        context: Context entries holding formatted documents
+        query: Text to rank passages against (the latest question)
+        top_k: Maximum number of passages kept
+        max_words: Passage size in words
+
+    Returns:
+        Formatted documents reduced to their top passages, in context order;
+        the documents unchanged when there is nothing to rank
+    """
+    documents = split_documents(context)
+    query_tokens = tokenize(query or "")
+
+    # (document index, passage text) for every passage of every document
+    passages: List[Tuple[int, str]] = []
+    headers = []
+    for index, document in enumerate(documents):
+        header, _, body = document.partition("\n")
+        headers.append(header)
+        passages.extend((index, passage) for passage in split_passages(body.replace("</Document>", ""), max_words))
+
+    if not query_tokens or len(passages) <= top_k:
+        return documents
+
+    scores = bm25_scores([tokenize(text) for _, text in passages], query_tokens)
+    order = np.argsort(-scores, kind="stable")
+    if scores[order[0]] > 0:
+        # Passages sharing no term with the question are never worth their tokens
+        order = [position for position in order if scores[position] > 0]
+    kept = sorted(order[:top_k])
+
+    selected: Dict[int, List[str]] = {}
+    for position in kept:
+        index, text = passages[position]
+        selected.setdefault(index, []).append(text)
+    ranked = [f"{headers[index]}\n{PASSAGE_GAP.join(texts)}\n</Document>" for index, texts in sorted(selected.items())]
+
+    input_characters = sum(len(document) for document in documents)
+    output_characters = sum(len(document) for document in ranked)
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["passages"] += len(passages)
+        _stats["kept"] += len(kept)
+        _stats["input_characters"] += input_characters
+        _stats["output_characters"] += output_characters
+    logger.info(f"Passage ranking: kept {len(kept)}/{len(passages)} passages from {len(selected)}/{len(documents)} "
+                f"documents ({output_characters}/{input_characters} characters)")
+    return ranked
+
+
+def passage_ranking_stats() -> Dict[str, Any]:
+    """
+    Return passage ranking counters.
+
+    Returns:
+        Dict with ranking calls, passages seen and kept, and context characters
+        before and after ranking
+    """
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,384 @@
+"""
+Persistent cache for search results.
+
+Results are keyed on the backend, the normalized query and the requested number
+of results, and stored as the formatted `<Document ...>` blocks the search nodes
+put into the interview context. Like the LLM response cache, entries live in a
+small in-memory LRU in front of a size-bounded SQLite store. Each backend has
+its own time-to-live; with stale-while-revalidate, an expired entry is still
+served for a grace period while a refresh runs in the background. When a query
+has no exact entry, a MinHash/LSH index over the cached queries finds a
+reworded one (e.g. "AI agent applications healthcare" for "applications of AI
+agents in healthcare") and serves its results as a near hit.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from src.config.default_settings import (
+    DEFAULT_SEARCH_CACHE_PATH,
+    DEFAULT_SEARCH_CACHE_MEMORY_ENTRIES,
+    DEFAULT_SEARCH_CACHE_MAX_DISK_ENTRIES,
+    DEFAULT_SEARCH_CACHE_TTL_SECONDS,
+    DEFAULT_SEARCH_CACHE_STALE_WHILE_REVALIDATE,
+    DEFAULT_SEARCH_CACHE_MAX_STALE_SECONDS,
+    DEFAULT_SEARCH_CACHE_NEAR_DUPLICATES,
+    DEFAULT_SEARCH_CACHE_NEAR_THRESHOLD,
+)
+from src.search.minhash import MinHashLSH
+from src.utils.logger import logger
+
+# Number of writes between two eviction passes over the disk tier
+EVICTION_INTERVAL = 100
+
+# TTL of backends missing from DEFAULT_SEARCH_CACHE_TTL_SECONDS
+FALLBACK_TTL_SECONDS = 24 * 60 * 60
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query: Unicode form, case, punctuation and whitespace."""
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = re.sub(r"[^\w\s]", " ", query)
+    return " ".join(query.split())
+
+
+class SearchCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of formatted search results.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = DEFAULT_SEARCH_CACHE_PATH,
+                 max_memory_entries: int = DEFAULT_SEARCH_CACHE_MEMORY_ENTRIES,
+                 max_disk_entries: int = DEFAULT_SEARCH_CACHE_MAX_DISK_ENTRIES,
+                 ttl_seconds: Optional[Dict[str, float]] = None,
+                 stale_while_revalidate: bool = DEFAULT_SEARCH_CACHE_STALE_WHILE_REVALIDATE,
+                 max_stale_seconds: float = DEFAULT_SEARCH_CACHE_MAX_STALE_SECONDS,
+                 near_duplicates: bool = DEFAULT_SEARCH_CACHE_NEAR_DUPLICATES,
+                 near_threshold: float = DEFAULT_SEARCH_CACHE_NEAR_THRESHOLD):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file for the disk tier, or None for a memory-only cache
+            max_memory_entries: Maximum number of entries kept in memory
+            max_disk_entries: Maximum number of entries kept on disk
+            ttl_seconds: Time-to-live per backend (defaults to DEFAULT_SEARCH_CACHE_TTL_SECONDS)
+            stale_while_revalidate: Serve expired entries while refreshing them in the background
+            max_stale_seconds: How long after expiry an entry may still be served stale
+            near_duplicates: Serve the results of similar cached queries on exact misses
+            near_threshold: Minimum Jaccard similarity of a near-duplicate query
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = dict(DEFAULT_SEARCH_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale_seconds = max_stale_seconds if stale_while_revalidate else 0.0
+        self.near_duplicates = near_duplicates
+        self.near_threshold = near_threshold
+
+        self._memory: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        self._refreshing: Set[str] = set()
+        # Keeps background refresh tasks referenced until they finish
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        # Normalized queries of the cached entries, per backend
+        self._near_index: Dict[str, MinHashLSH] = {}
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "stale_hits": 0, "near_hits": 0, "misses": 0,
+                       "writes": 0, "refreshes": 0, "evictions": 0}
+
+        self._conn = None
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_results ("
+                "key TEXT PRIMARY KEY, backend TEXT NOT NULL, query TEXT NOT NULL, "
+                "value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS search_results_accessed_at ON search_results (accessed_at)"
+            )
+            self._conn.commit()
+            self._evict()
+
+    def _index_query(self, backend: str, query: str) -> None:
+        """Add a normalized query to the near-duplicate index of its backend."""
+        if self.near_duplicates:
+            self._near_index.setdefault(backend, MinHashLSH()).add(query)
+
+    def _rebuild_near_index(self) -> None:
+        """Index the queries of the entries on disk (all of them, the disk tier holds every entry)."""
+        if not self.near_duplicates or self._conn is None:
+            return
+        self._near_index.clear()
+        for backend, query in self._conn.execute("SELECT DISTINCT backend, query FROM search_results"):
+            self._index_query(backend, query)
+
+    @staticmethod
+    def make_key(backend: str, query: str, max_results: int) -> str:
+        """Build the cache key for a backend / query / result count triple."""
+        digest = hashlib.sha256()
+        digest.update(f"{backend}\x00{normalize_query(query)}\x00{max_results}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _ttl(self, backend: str) -> float:
+        return self.ttl_seconds.get(backend, FALLBACK_TTL_SECONDS)
+
+    def _remember(self, key: str, backend: str, value: str, created_at: float) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = (backend, value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup_key(self, key: str, backend: str, now: float) -> Optional[Tuple[str, bool, str]]:
+        """
+        Look up an entry by key, checking memory before disk (call with the lock held).
+
+        Returns:
+            Tuple of (formatted results, whether the entry is stale, tier), or None
+        """
+        ttl = self._ttl(backend)
+        entry = self._memory.get(key)
+        tier = "memory_hits"
+        if entry is None and self._conn is not None:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                entry = (backend, row[0], row[1])
+                tier = "disk_hits"
+
+        if entry is None:
+            return None
+        _, value, created_at = entry
+        age = now - created_at
+        if age > ttl + self.max_stale_seconds:
+            self._memory.pop(key, None)
+            return None
+        if tier == "disk_hits":
+            self._conn.execute(
+                "UPDATE search_results SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self._remember(key, backend, value, created_at)
+        else:
+            self._memory.move_to_end(key)
+        return value, age > ttl, tier
+
+    def lookup(self, backend: str, query: str, max_results: int) -> Tuple[Optional[str], bool]:
+        """
+        Look up cached results, checking memory before disk, then similar queries.
+
+        Args:
+            backend: Search backend name (e.g. "tavily")
+            query: Search query
+            max_results: Number of requested results
+
+        Returns:
+            Tuple of (formatted results or None, whether the entry is stale)
+        """
+        now = time.time()
+
+        with self._lock:
+            found = self._lookup_key(self.make_key(backend, query, max_results), backend, now)
+            if found is None and backend in self._near_index:
+                near = self._near_index[backend].query(normalize_query(query), self.near_threshold)
+                if near is not None:
+                    found = self._lookup_key(self.make_key(backend, near[0], max_results), backend, now)
+                    if found is not None:
+                        logger.debug(f"Near-duplicate {backend} query: '{query}' served from "
+                                     f"'{near[0]}' (similarity {near[1]:.2f})")
+                        found = (found[0], found[1], "near_hits")
+
+            if found is None:
+                self._stats["misses"] += 1
+                return None, False
+            value, stale, tier = found
+            self._stats["stale_hits" if stale else tier] += 1
+            return value, stale
+
+    def update(self, backend: str, query: str, max_results: int, value: str) -> None:
+        """Store formatted results in both tiers."""
+        key = self.make_key(backend, query, max_results)
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, backend, value, now)
+            self._index_query(backend, normalize_query(query))
+            self._stats["writes"] += 1
+
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (key, backend, query, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, backend, normalize_query(query), value, now, now),
+            )
+            self._conn.commit()
+
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction >= EVICTION_INTERVAL:
+                self._evict()
+
+    def _start_refresh(self, backend: str, query: str, max_results: int) -> bool:
+        """Claim the background refresh of an entry; False when one is already running."""
+        key = self.make_key(backend, query, max_results)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._stats["refreshes"] += 1
+            return True
+
+    def _finish_refresh(self, backend: str, query: str, max_results: int) -> None:
+        with self._lock:
+            self._refreshing.discard(self.make_key(backend, query, max_results))
+
+    def _store(self, backend: str, query: str, max_results: int, value: str) -> None:
+        # Empty results are not cached, they are usually transient backend failures
+        if value:
+            self.update(backend, query, max_results, value)
+
+    def get_or_search(self, backend: str, query: str, max_results: int,
+                      search: Callable[[], str]) -> str:
+        """
+        Return cached results for a query, or run the search and cache its results.
+
+        Args:
+            backend: Search backend name
+            query: Search query
+            max_results: Number of requested results
+            search: Runs the search and returns the formatted results
+
+        Returns:
+            Formatted `<Document ...>` blocks
+        """
+        value, stale = self.lookup(backend, query, max_results)
+        if value is not None:
+            if stale and self._start_refresh(backend, query, max_results):
+                def refresh():
+                    try:
+                        self._store(backend, query, max_results, search())
+                    except Exception as e:
+                        logger.warning(f"Background refresh of {backend} results failed: {str(e)}")
+                    finally:
+                        self._finish_refresh(backend, query, max_results)
+                threading.Thread(target=refresh, daemon=True).start()
+            return value
+
+        value = search()
+        self._store(backend, query, max_results, value)
+        return value
+
+    async def aget_or_search(self, backend: str, query: str, max_results: int,
+                             search: Callable[[], Awaitable[str]]) -> str:
+        """
+        Async version of get_or_search; stale entries are refreshed in a background task.
+
+        Args:
+            backend: Search backend name
+            query: Search query
+            max_results: Number of requested results
+            search: Coroutine function that runs the search and returns the formatted results
+
+        Returns:
+            Formatted `<Document ...>` blocks
+        """
+        value, stale = self.lookup(backend, query, max_results)
+        if value is not None:
+            if stale and self._start_refresh(backend, query, max_results):
+                async def refresh():
+                    try:
+                        self._store(backend, query, max_results, await search())
+                    except Exception as e:
+                        logger.warning(f"Background refresh of {backend} results failed: {str(e)}")
+                    finally:
+                        self._finish_refresh(backend, query, max_results)
+                task = asyncio.ensure_future(refresh())
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return value
+
+        value = await search()
+        self._store(backend, query, max_results, value)
+        return value
+
+    def _evict(self) -> None:
+        """Drop entries past their TTL and grace period and trim the disk tier to its size limit."""
+        if self._conn is None:
+            return
+        self._writes_since_eviction = 0
+        evicted = 0
+        now = time.time()
+        backends = [row[0] for row in self._conn.execute("SELECT DISTINCT backend FROM search_results")]
+        for backend in backends:
+            cursor = self._conn.execute(
+                "DELETE FROM search_results WHERE backend = ? AND created_at < ?",
+                (backend, now - self._ttl(backend) - self.max_stale_seconds),
+            )
+            evicted += cursor.rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+        if count > self.max_disk_entries:
+            cursor = self._conn.execute(
+                "DELETE FROM search_results WHERE key IN ("
+                "SELECT key FROM search_results ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_disk_entries,),
+            )
+            evicted += cursor.rowcount
+        self._conn.commit()
+        if evicted or not self._near_index:
+            self._rebuild_near_index()
+        if evicted:
+            self._stats["evictions"] += evicted
+            logger.debug(f"Evicted {evicted} entries from the search cache")
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._near_index.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM search_results")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters for the cache.
+
+        Returns:
+            Dict with per-tier, stale and near-duplicate hit counts, misses,
+            writes, refreshes, evictions and hit rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats["memory_hits"] + stats["disk_hits"] + stats["stale_hits"] + stats["near_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Return the process-wide search cache, creating it on first use."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache()
+        return _search_cache
@@ -0,0 +1,232 @@
+"""
+Concurrent fan-out over the enabled search backends.
+
+The `search` node of the interview graph queries every enabled backend at
+once. Each backend has its own deadline: a backend that misses it, fails, or
+has an open circuit breaker contributes nothing to the turn instead of
+stalling it. With DEFAULT_SEARCH_ENOUGH_RESULTS > 0 the node returns as soon
+as that many documents arrived and cancels the remaining searches, so the
+turn's latency is bounded by the deadlines rather than the slowest provider.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.default_settings import (
+    DEFAULT_SEARCH_ENOUGH_RESULTS,
+    DEFAULT_DOCUMENT_STORE_ENABLED,
+    DEFAULT_DOCUMENT_COMPRESSION_ENABLED,
+)
+from src.interview.interview_schema import InterviewState
+from src.search.backends import SearchBackend, get_enabled_backends
+from src.utils.logger import logger, print_info
+from src.utils.token_budget import split_documents
+
+# Threads for the blocking fan-out; searches past their deadline keep their
+# thread until the client returns, so leave room for a few stragglers
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="search")
+
+
+def _query_for(state: InterviewState, backend: str) -> str:
+    """Return the planned query of a backend, falling back to the last question."""
+    queries = state.get("search_queries") or {}
+    return queries.get(backend) or str(state["messages"][-1].content)
+
+
+def _compressor(query: str) -> Optional[Callable[[str], str]]:
+    """Return the compression of search results to their query-relevant sentences, or None when disabled."""
+    if not DEFAULT_DOCUMENT_COMPRESSION_ENABLED:
+        return None
+    from src.search.compression import compress_results
+    return lambda formatted: compress_results(formatted, query)
+
+
+def _context_entries(backend: str, query: str, search: Callable[[], str]) -> List[str]:
+    """Run a search and return its context entries: document references, or the formatted results."""
+    # Results are compressed after the search cache, so cached results serve any query; the
+    # store keeps them whole and compresses them for each query they are retrieved for
+    compress = _compressor(query)
+    if not DEFAULT_DOCUMENT_STORE_ENABLED:
+        formatted = search()
+        return [compress(formatted) if compress is not None else formatted]
+    from src.search.document_store import get_document_store
+    return get_document_store().get_or_search(backend, query, search, compress)
+
+
+async def _acontext_entries(backend: str, query: str, search: Callable[[], Awaitable[str]]) -> List[str]:
+    """Async version of _context_entries."""
+    compress = _compressor(query)
+    if not DEFAULT_DOCUMENT_STORE_ENABLED:
+        formatted = await search()
+        return [compress(formatted) if compress is not None else formatted]
+    from src.search.document_store import get_document_store
+    return await get_document_store().aget_or_search(backend, query, search, compress)
+
+
+def _count_documents(results: Dict[str, List[str]]) -> int:
+    # Entries are document references, or formatted results when the document store is disabled
+    return sum(len(split_documents(entries)) for entries in results.values())
+
+
+def _enough(results: Dict[str, List[str]], enough_results: int) -> bool:
+    return enough_results > 0 and _count_documents(results) >= enough_results
+
+
+def _collect(backends: List[SearchBackend], results: Dict[str, List[str]]) -> List[str]:
+    """Join the context entries of the backends in configuration order."""
+    context = []
+    for backend in backends:
+        context.extend(results.get(backend.name, []))
+    return context
+
+
+def _admitted(state: InterviewState) -> List[Tuple[SearchBackend, str]]:
+    """Return the enabled backends whose circuit breaker lets a call through, with their query."""
+    admitted = []
+    for backend in get_enabled_backends():
+        if backend.breaker.allow():
+            admitted.append((backend, _query_for(state, backend.query_key or backend.name)))
+        else:
+            backend.record("skipped")
+            logger.info(f"Search backend {backend.name} skipped, its circuit breaker is open")
+    return admitted
+
+
+def _log_turn(backends: List[SearchBackend], results: Dict[str, List[str]], started: float) -> None:
+    answered = [backend.name for backend in backends if backend.name in results]
+    print_info(f"Search results: {_count_documents(results)} documents "
+               f"from {answered or 'no backend'} in {time.monotonic() - started:.2f}s")
+
+
+def search_sources(state: InterviewState,
+                   enough_results: int = DEFAULT_SEARCH_ENOUGH_RESULTS) -> Dict[str, Any]:
+    """
+    Query all enabled search backends concurrently for the planned queries.
+
+    Args:
+        state: The current interview state
+        enough_results: Documents after which the remaining searches are abandoned (0: wait for all)
+
+    Returns:
+        Dict with the updated context and the sources of this turn
+    """
+    logger.info("Searching all backends...")
+    started = time.monotonic()
+    admitted = _admitted(state)
+
+    futures: Dict[concurrent.futures.Future, Tuple[SearchBackend, float]] = {}
+    for backend, query in admitted:
+        # Each search runs in a copy of the node's context, so it sees the run's config
+        future = _executor.submit(contextvars.copy_context().run, _context_entries,
+                                  backend.name, query, lambda backend=backend, query=query: backend.search(query))
+        futures[future] = (backend, time.monotonic() + backend.deadline_seconds)
+
+    results: Dict[str, List[str]] = {}
+    pending = set(futures)
+    while pending and not _enough(results, enough_results):
+        timeout = max(0.0, min(futures[future][1] for future in pending) - time.monotonic())
+        done, pending = concurrent.futures.wait(pending, timeout=timeout,
+                                                return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            backend, _ = futures[future]
+            elapsed = time.monotonic() - started
+            try:
+                results[backend.name] = future.result()
+                backend.breaker.record_success()
+                backend.record("successes", elapsed)
+            except Exception as e:
+                backend.breaker.record_failure()
+                backend.record("failures", elapsed)
+                logger.warning(f"Search backend {backend.name} failed: {str(e)}")
+        now = time.monotonic()
+        for future in [future for future in pending if futures[future][1] <= now]:
+            backend, _ = futures[future]
+            pending.discard(future)
+            future.cancel()
+            backend.breaker.record_failure()
+            backend.record("timeouts", now - started)
+            logger.warning(f"Search backend {backend.name} missed its {backend.deadline_seconds:.1f}s deadline")
+
+    # Enough results: the remaining searches are abandoned (a running thread finishes on its own)
+    for future in pending:
+        backend, _ = futures[future]
+        future.cancel()
+        backend.breaker.release()
+        backend.record("cancelled", time.monotonic() - started)
+
+    backends = [backend for backend, _ in admitted]
+    _log_turn(backends, results, started)
+    logger.info("Searching all backends completed successfully")
+    context = _collect(backends, results)
+    return {"context": context, "context_turns": [context]}
+
+
+async def _asearch_backend(backend: SearchBackend, query: str, started: float) -> Optional[List[str]]:
+    """Run one backend's search within its deadline; None when it failed or timed out."""
+    try:
+        refs = await asyncio.wait_for(
+            _acontext_entries(backend.name, query, lambda: backend.asearch(query)),
+            backend.deadline_seconds,
+        )
+    except asyncio.TimeoutError:
+        backend.breaker.record_failure()
+        backend.record("timeouts", time.monotonic() - started)
+        logger.warning(f"Search backend {backend.name} missed its {backend.deadline_seconds:.1f}s deadline")
+        return None
+    except asyncio.CancelledError:
+        backend.breaker.release()
+        backend.record("cancelled", time.monotonic() - started)
+        raise
+    except Exception as e:
+        backend.breaker.record_failure()
+        backend.record("failures", time.monotonic() - started)
+        logger.warning(f"Search backend {backend.name} failed: {str(e)}")
+        return None
+    backend.breaker.record_success()
+    backend.record("successes", time.monotonic() - started)
+    return refs
+
+
+async def asearch_sources(state: InterviewState,
+                          enough_results: int = DEFAULT_SEARCH_ENOUGH_RESULTS) -> Dict[str, Any]:
+    """
+    Async version of search_sources; abandoned searches are cancelled.
+
+    Args:
+        state: The current interview state
+        enough_results: Documents after which the remaining searches are cancelled (0: wait for all)
+
+    Returns:
+        Dict with the updated context and the sources of this turn
+    """
+    logger.info("Searching all backends...")
+    started = time.monotonic()
+    admitted = _admitted(state)
+
+    tasks = {
+        asyncio.ensure_future(_asearch_backend(backend, query, started)): backend
+        for backend, query in admitted
+    }
+    results: Dict[str, List[str]] = {}
+    pending = set(tasks)
+    try:
+        while pending and not _enough(results, enough_results):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                refs = task.result()
+                if refs is not None:
+                    results[tasks[task].name] = refs
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    backends = [backend for backend, _ in admitted]
+    _log_turn(backends, results, started)
+    logger.info("Searching all backends completed successfully")
+    context = _collect(backends, results)
+    return {"context": context, "context_turns": [context]}
@@ -2,96 +2,208 @@
 Web search functionality for retrieving information.
 """
 
-from typing import Dict, Any
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
 from langchain_core.messages import SystemMessage
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_community.document_loaders import WikipediaLoader
 
-from src.models.llm import llm
-from src.interview.interview_schema import InterviewState, SearchQuery
-from src.config.settings import TAVILY_API_KEY
-from src.utils.logger import logger, print_info
-from src.prompts.search_prompt import SEARCH_INSTRUCTIONS
-from src.config.default_settings import DEFAULT_N_DOCUMENT_TO_SEARCH
+from src.models.llm import get_llm
+from src.interview.interview_schema import InterviewState, SearchQuery, SearchPlan
+from src.config.settings import load_env, get_setting
+from src.utils.logger import logger
+from src.prompts.search_prompt import SEARCH_INSTRUCTIONS, SEARCH_PLAN_INSTRUCTIONS
+from src.config.default_settings import (
+    DEFAULT_N_DOCUMENT_TO_SEARCH,
+    DEFAULT_SEARCH_CACHE_ENABLED,
+    DEFAULT_BACKEND_SPECIFIC_SEARCH_QUERIES,
+    DEFAULT_LOCAL_WIKIPEDIA_INDEX_PATH,
+)
+
+# Search tools are created on first use (see get_tavily_search)
+_tavily_search: Optional[Any] = None
+_tavily_search_lock = threading.Lock()
+
+
+def get_tavily_search():
+    """Return the shared Tavily search tool, creating it on first use."""
+    global _tavily_search
+    with _tavily_search_lock:
+        if _tavily_search is None:
+            if get_setting("SEARCH_PROVIDER") == "fake":
+                from src.search.fake_search import FakeTavilySearch
+                _tavily_search = FakeTavilySearch(
+                    max_results=DEFAULT_N_DOCUMENT_TO_SEARCH,
+                    latency_profile=get_setting("FAKE_SEARCH_LATENCY_PROFILE"),
+                    seed=int(get_setting("FAKE_SEED")),
+                )
+                return _tavily_search
+            # The tool reads TAVILY_API_KEY from the environment
+            load_env()
+            from langchain_community.tools.tavily_search import TavilySearchResults
+            _tavily_search = TavilySearchResults(max_results=DEFAULT_N_DOCUMENT_TO_SEARCH)
+        return _tavily_search
+
+
+def reset_search_tools() -> None:
+    """Drop the cached search tools so the next call picks up changed API keys."""
+    global _tavily_search
+    with _tavily_search_lock:
+        _tavily_search = None
+
+
+def _use_local_wikipedia() -> bool:
+    """Check whether Wikipedia is searched in the offline index instead of the API."""
+    return get_setting("WIKIPEDIA_BACKEND") == "local"
+
+
+def _load_wikipedia(query: str) -> list:
+    """Load Wikipedia documents for a query (blocking)."""
+    if get_setting("SEARCH_PROVIDER") == "fake":
+        from src.search.fake_search import fake_wikipedia_load
+        return fake_wikipedia_load(
+            query,
+            load_max_docs=DEFAULT_N_DOCUMENT_TO_SEARCH,
+            latency_profile=get_setting("FAKE_SEARCH_LATENCY_PROFILE"),
+            seed=int(get_setting("FAKE_SEED")),
+        )
+    if _use_local_wikipedia():
+        from src.search.local_wikipedia import get_local_wikipedia_index
+        index = get_local_wikipedia_index(get_setting("WIKIPEDIA_INDEX_PATH") or DEFAULT_LOCAL_WIKIPEDIA_INDEX_PATH)
+        return index.search(query, limit=DEFAULT_N_DOCUMENT_TO_SEARCH)
+    from langchain_community.document_loaders import WikipediaLoader
+    return WikipediaLoader(
+        query=query,
+        load_max_docs=DEFAULT_N_DOCUMENT_TO_SEARCH
+    ).load()
+
+
+def _search_query_messages(state: InterviewState, instructions: str = SEARCH_INSTRUCTIONS) -> list:
+    """Build the prompt that turns the conversation into a search query."""
+    return [SystemMessage(content=instructions)] + state['messages']
+
+
+def _query_planner():
+    """Return the structured-output LLM and the prompt instructions used to plan queries."""
+    if DEFAULT_BACKEND_SPECIFIC_SEARCH_QUERIES:
+        return get_llm("search_query").with_structured_output(SearchPlan), SEARCH_PLAN_INSTRUCTIONS
+    return get_llm("search_query").with_structured_output(SearchQuery), SEARCH_INSTRUCTIONS
 
-# Initialize search tools
-tavily_search = TavilySearchResults(max_results=DEFAULT_N_DOCUMENT_TO_SEARCH)
 
+def _planned_queries(result: Any) -> Dict[str, str]:
+    """Map the planner output to one query per search backend."""
+    if isinstance(result, SearchPlan):
+        return {"web": result.web_query, "wikipedia": result.wikipedia_query}
+    return {"web": result.search_query, "wikipedia": result.search_query}
 
 
-def search_web(state: InterviewState) -> Dict[str, Any]:
+def plan_queries(state: InterviewState) -> Dict[str, Any]:
     """
-    Retrieve documents from web search based on the conversation.
-    
+    Generate the search queries of the current turn, once for all search backends.
+
     Args:
         state: The current interview state
-        
+
     Returns:
-        Dict with the updated context
+        Dict with the search query per backend
     """
-    logger.info("Searching web...")
-    # Generate search query
-    structured_llm = llm.with_structured_output(SearchQuery)
-    
-    search_query = structured_llm.invoke(
-        [SystemMessage(content=SEARCH_INSTRUCTIONS)] + state['messages']
-    )
-    
-    # Perform search
-    search_results = tavily_search.invoke(search_query.search_query)
-    
-    # Format
-    formatted_search_docs = "\n\n---\n\n".join(
-        [
-            f'<Document href="{doc["url"]}"/>\n{doc["content"]}\n</Document>'
-            for doc in search_results
-        ]
-    )
-
-    print_info(f"Number of Search results from web: {len(formatted_search_docs)}")
-
-    print_info(f"Search results from web: \n{formatted_search_docs[0:10]}")
+    logger.info("Planning search queries...")
+    structured_llm, instructions = _query_planner()
+    search_queries = _planned_queries(structured_llm.invoke(_search_query_messages(state, instructions)))
 
-    logger.info("Searching web completed successfully")
+    logger.info(f"Search queries planned: {search_queries}")
 
+    return {"search_queries": search_queries}
 
-    return {"context": [formatted_search_docs]}
-
-def search_wikipedia(state: InterviewState) -> Dict[str, Any]:
+async def aplan_queries(state: InterviewState) -> Dict[str, Any]:
     """
-    Retrieve documents from Wikipedia based on the conversation.
-    
+    Async version of plan_queries.
+
     Args:
         state: The current interview state
-        
+
     Returns:
-        Dict with the updated context
+        Dict with the search query per backend
     """
-    logger.info("Searching Wikipedia...")
-    # Generate search query
-    structured_llm = llm.with_structured_output(SearchQuery)
-    search_query = structured_llm.invoke(
-        [SystemMessage(content=SEARCH_INSTRUCTIONS)] + state['messages']
+    logger.info("Planning search queries...")
+    structured_llm, instructions = _query_planner()
+    search_queries = _planned_queries(await structured_llm.ainvoke(_search_query_messages(state, instructions)))
+
+    logger.info(f"Search queries planned: {search_queries}")
+
+    return {"search_queries": search_queries}
+
+
+def _format_web_results(search_results: List[Dict[str, Any]]) -> str:
+    """Format Tavily results as <Document> blocks."""
+    return "\n\n---\n\n".join(
+        [
+            f'<Document href="{doc["url"]}"/>\n{doc["content"]}\n</Document>'
+            for doc in search_results
+        ]
     )
-    
-    # Perform Wikipedia search
-    wiki_docs = WikipediaLoader(
-        query=search_query.search_query,
-        load_max_docs=DEFAULT_N_DOCUMENT_TO_SEARCH
-    ).load()
-    
-    # Format
-    formatted_search_docs = "\n\n---\n\n".join(
+
+
+def _format_wikipedia_docs(wiki_docs: list) -> str:
+    """Format Wikipedia documents as <Document> blocks."""
+    return "\n\n---\n\n".join(
         [
             f'<Document source="{doc.metadata["source"]}" page="{doc.metadata.get("page", "")}"/>\n{doc.page_content}\n</Document>'
             for doc in wiki_docs
         ]
     )
 
-    print_info(f"Number of Search results from wikepedia: {len(formatted_search_docs)}")
 
-    print_info(f"Search results from wikepedia: \n{formatted_search_docs[0:10]}")
+def _get_search_cache():
+    """Return the search cache, or None when caching is disabled."""
+    # Fake results are not cached, the cache would hide the simulated latency
+    if not DEFAULT_SEARCH_CACHE_ENABLED or get_setting("SEARCH_PROVIDER") == "fake":
+        return None
+    from src.search.search_cache import get_search_cache
+    return get_search_cache()
+
+
+def search_web_docs(query: str) -> str:
+    """Search the web and return formatted documents, served from the cache when possible."""
+    def search() -> str:
+        return _format_web_results(get_tavily_search().invoke(query))
+
+    cache = _get_search_cache()
+    if cache is None:
+        return search()
+    return cache.get_or_search("tavily", query, DEFAULT_N_DOCUMENT_TO_SEARCH, search)
+
+
+async def asearch_web_docs(query: str) -> str:
+    """Async version of search_web_docs."""
+    async def search() -> str:
+        return _format_web_results(await get_tavily_search().ainvoke(query))
+
+    cache = _get_search_cache()
+    if cache is None:
+        return await search()
+    return await cache.aget_or_search("tavily", query, DEFAULT_N_DOCUMENT_TO_SEARCH, search)
+
+
+def search_wikipedia_docs(query: str) -> str:
+    """Search Wikipedia and return formatted documents, served from the cache when possible."""
+    def search() -> str:
+        return _format_wikipedia_docs(_load_wikipedia(query))
+
+    # The local index answers faster than the cache would help with
+    cache = None if _use_local_wikipedia() else _get_search_cache()
+    if cache is None:
+        return search()
+    return cache.get_or_search("wikipedia", query, DEFAULT_N_DOCUMENT_TO_SEARCH, search)
+
 
-    logger.info("Searching wikipedia completed successfully")
+async def asearch_wikipedia_docs(query: str) -> str:
+    """Async version of search_wikipedia_docs; the blocking fetch runs in a worker thread."""
+    async def search() -> str:
+        # run_in_executor rather than asyncio.to_thread, which needs Python 3.9
+        docs = await asyncio.get_running_loop().run_in_executor(None, _load_wikipedia, query)
+        return _format_wikipedia_docs(docs)
 
-    return {"context": [formatted_search_docs]}
\ No newline at end of file
+    cache = None if _use_local_wikipedia() else _get_search_cache()
+    if cache is None:
+        return await search()
+    return await cache.aget_or_search("wikipedia", query, DEFAULT_N_DOCUMENT_TO_SEARCH, search)
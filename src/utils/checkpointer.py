@@ -0,0 +1,422 @@
+"""
+Durable LangGraph checkpointer backed by SQLite.
+
+The graphs used to compile with an in-process MemorySaver, so a run that died
+mid-way (OOM, deploy, Streamlit rerun) lost every completed interview. The
+DurableCheckpointSaver keeps serving checkpoints from memory like MemorySaver,
+and mirrors every checkpoint, channel value and pending write to SQLite from a
+background thread: records queued within DEFAULT_CHECKPOINT_BATCH_SECONDS
+(one superstep writes several) are committed in one transaction, so the graph
+never waits on the disk. Values are stored in the serializer's compact binary
+form, zlib-compressed above DEFAULT_CHECKPOINT_COMPRESS_BYTES.
+
+A thread's records are loaded back into memory the first time a new process
+touches the thread, which is how ResearchAssistant.resume continues a run from
+its last completed node. The document store of a run is persisted in the same
+database, so the document references in resumed interview context resolve.
+
+Memory only holds the threads in use: a run's records are evicted from memory
+when it ends (completed or not) and threads idle for
+DEFAULT_CHECKPOINT_IDLE_SECONDS are evicted when another thread is loaded.
+On disk, threads not written to for DEFAULT_CHECKPOINT_RETENTION_DAYS are
+pruned with their documents, at startup and whenever a run ends.
+"""
+
+import asyncio
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import WRITES_IDX_MAP, ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.config.default_settings import (
+    DEFAULT_CHECKPOINT_BACKEND,
+    DEFAULT_CHECKPOINT_PATH,
+    DEFAULT_CHECKPOINT_BATCH_SECONDS,
+    DEFAULT_CHECKPOINT_COMPRESS_BYTES,
+    DEFAULT_CHECKPOINT_IDLE_SECONDS,
+    DEFAULT_CHECKPOINT_RETENTION_DAYS,
+)
+from src.utils.logger import logger
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS checkpoints ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+    "checkpoint_type TEXT NOT NULL, checkpoint BLOB NOT NULL, metadata_type TEXT NOT NULL, "
+    "metadata BLOB NOT NULL, parent_id TEXT, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))",
+    "CREATE TABLE IF NOT EXISTS blobs ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, channel TEXT NOT NULL, version TEXT NOT NULL, "
+    "type TEXT NOT NULL, value BLOB NOT NULL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, channel, version))",
+    "CREATE TABLE IF NOT EXISTS writes ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+    "task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, type TEXT NOT NULL, "
+    "value BLOB NOT NULL, task_path TEXT NOT NULL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))",
+    "CREATE TABLE IF NOT EXISTS documents ("
+    "run_id TEXT NOT NULL, document_id TEXT NOT NULL, document BLOB NOT NULL, "
+    "PRIMARY KEY (run_id, document_id))",
+    "CREATE TABLE IF NOT EXISTS threads ("
+    "thread_id TEXT NOT NULL PRIMARY KEY, updated REAL NOT NULL)",
+)
+
+# Tables holding a thread's records, and their thread column
+_THREAD_TABLES = (("checkpoints", "thread_id"), ("blobs", "thread_id"), ("writes", "thread_id"),
+                  ("documents", "run_id"), ("threads", "thread_id"))
+
+_INSERTS = {
+    "checkpoints": "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "blobs": "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+    "writes": "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "documents": "INSERT OR IGNORE INTO documents VALUES (?, ?, ?)",
+    "threads": "INSERT OR REPLACE INTO threads VALUES (?, ?)",
+}
+
+
+def _pack(data: bytes, compress_bytes: int) -> bytes:
+    """Prefix serialized data with its encoding, compressing it when large."""
+    if len(data) > compress_bytes:
+        return b"z" + zlib.compress(data, 1)
+    return b"r" + data
+
+
+def _unpack(data: bytes) -> bytes:
+    return zlib.decompress(data[1:]) if data[:1] == b"z" else data[1:]
+
+
+def _version(version: str) -> Any:
+    """Versions are stored as text; the default ones are strings, integer versions are restored."""
+    return int(version) if version.isdigit() else version
+
+
+class DurableCheckpointSaver(MemorySaver):
+    """
+    MemorySaver that mirrors its records to SQLite from a background writer.
+    """
+
+    def __init__(self,
+                 path: str = DEFAULT_CHECKPOINT_PATH,
+                 batch_seconds: float = DEFAULT_CHECKPOINT_BATCH_SECONDS,
+                 compress_bytes: int = DEFAULT_CHECKPOINT_COMPRESS_BYTES,
+                 idle_seconds: float = DEFAULT_CHECKPOINT_IDLE_SECONDS,
+                 retention_days: float = DEFAULT_CHECKPOINT_RETENTION_DAYS):
+        """
+        Initialize the saver.
+
+        Args:
+            path: SQLite database of the checkpoints
+            batch_seconds: Time the writer waits for more records before committing
+            compress_bytes: Size above which values are zlib-compressed
+            idle_seconds: Time after which an untouched thread is evicted from memory
+            retention_days: Age after which a thread is pruned from disk (0 keeps threads forever)
+        """
+        super().__init__()
+        self.path = path
+        self.batch_seconds = batch_seconds
+        self.compress_bytes = compress_bytes
+        self.idle_seconds = idle_seconds
+        self.retention_days = retention_days
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            # Threads written before their age was tracked start their retention now
+            conn.execute("INSERT OR IGNORE INTO threads SELECT DISTINCT thread_id, ? FROM checkpoints", (time.time(),))
+
+        self._loaded = set()
+        # Last time each thread in memory was touched
+        self._touched: Dict[str, float] = {}
+        self._load_lock = threading.RLock()
+        self._lock = threading.Lock()
+        self._stats = {"records": 0, "batches": 0, "bytes": 0, "write_seconds": 0.0, "errors": 0,
+                       "threads_loaded": 0, "threads_evicted": 0, "threads_pruned": 0}
+
+        self._queue: "queue.Queue[Tuple[str, tuple]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+        self.prune()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # Background writer
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        conn.execute("PRAGMA synchronous=NORMAL")
+        while True:
+            batch = [self._queue.get()]
+            # Let the rest of the superstep's records arrive, then commit them together
+            time.sleep(self.batch_seconds)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            started = time.monotonic()
+            pruned = 0
+            try:
+                with conn:
+                    for table, row in batch:
+                        if table == "delete":
+                            for name, column in _THREAD_TABLES:
+                                conn.execute(f"DELETE FROM {name} WHERE {column} = ?", row)
+                        elif table == "prune":
+                            # The threads table goes last, it selects the stale threads
+                            for name, column in _THREAD_TABLES:
+                                cursor = conn.execute(f"DELETE FROM {name} WHERE {column} IN "
+                                                      "(SELECT thread_id FROM threads WHERE updated < ?)", row)
+                            pruned += cursor.rowcount
+                        else:
+                            conn.execute(_INSERTS[table], row)
+                with self._lock:
+                    self._stats["threads_pruned"] += pruned
+                    self._stats["records"] += len(batch)
+                    self._stats["batches"] += 1
+                    self._stats["write_seconds"] += time.monotonic() - started
+            except sqlite3.Error as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                logger.error(f"Failed to persist {len(batch)} checkpoint records: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _enqueue(self, table: str, row: tuple) -> None:
+        with self._lock:
+            self._stats["bytes"] += sum(len(value) for value in row if isinstance(value, bytes))
+        self._queue.put((table, row))
+
+    def flush(self) -> None:
+        """Block until every queued record is on disk."""
+        self._queue.join()
+
+    # Loading
+
+    def _ensure_loaded(self, thread_id: str) -> None:
+        """Load a thread's records from disk the first time this process touches it."""
+        self._touched[thread_id] = time.monotonic()
+        if thread_id in self._loaded:
+            return
+        with self._load_lock:
+            if thread_id in self._loaded:
+                return
+            self._evict_idle(thread_id)
+            with self._connect() as conn:
+                checkpoints = conn.execute(
+                    "SELECT checkpoint_ns, checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata, "
+                    "parent_id FROM checkpoints WHERE thread_id = ?", (thread_id,)).fetchall()
+                blobs = conn.execute(
+                    "SELECT checkpoint_ns, channel, version, type, value FROM blobs WHERE thread_id = ?",
+                    (thread_id,)).fetchall()
+                writes = conn.execute(
+                    "SELECT checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path "
+                    "FROM writes WHERE thread_id = ?", (thread_id,)).fetchall()
+            for ns, checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata, parent_id in checkpoints:
+                self.storage[thread_id][ns][checkpoint_id] = (
+                    (checkpoint_type, _unpack(checkpoint)), (metadata_type, _unpack(metadata)), parent_id)
+            for ns, channel, version, value_type, value in blobs:
+                self.blobs[(thread_id, ns, channel, _version(version))] = (value_type, _unpack(value))
+            for ns, checkpoint_id, task_id, idx, channel, value_type, value, task_path in writes:
+                self.writes[(thread_id, ns, checkpoint_id)][(task_id, idx)] = (
+                    task_id, channel, (value_type, _unpack(value)), task_path)
+            self._loaded.add(thread_id)
+            if checkpoints:
+                with self._lock:
+                    self._stats["threads_loaded"] += 1
+                logger.info(f"Loaded {len(checkpoints)} checkpoints of thread {thread_id} from {self.path}")
+
+    def evict(self, thread_id: str) -> None:
+        """
+        Drop a thread's records from memory once its run ended.
+
+        The records stay on disk and are loaded again if the thread is touched
+        again (e.g. to resume the run).
+
+        Args:
+            thread_id: Thread to evict
+        """
+        # Loading the thread again must see every record it wrote
+        self.flush()
+        with self._load_lock:
+            super().delete_thread(thread_id)
+            self._touched.pop(thread_id, None)
+            if thread_id in self._loaded:
+                self._loaded.discard(thread_id)
+                with self._lock:
+                    self._stats["threads_evicted"] += 1
+
+    def _evict_idle(self, loading: str) -> None:
+        """Evict the threads untouched for idle_seconds (caller holds the load lock)."""
+        cutoff = time.monotonic() - self.idle_seconds
+        for thread_id in [thread_id for thread_id, touched in list(self._touched.items())
+                          if touched < cutoff and thread_id != loading]:
+            logger.debug(f"Evicting idle checkpoint thread {thread_id} from memory")
+            self.evict(thread_id)
+
+    def prune(self) -> None:
+        """Delete the threads not written to for retention_days from disk, with their documents."""
+        if self.retention_days > 0:
+            self._enqueue("prune", (time.time() - self.retention_days * 86400,))
+
+    def _load_all(self) -> None:
+        with self._connect() as conn:
+            thread_ids = [row[0] for row in conn.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+        for thread_id in thread_ids:
+            self._ensure_loaded(thread_id)
+
+    # BaseCheckpointSaver
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        self._ensure_loaded(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs: Any) -> Iterator[CheckpointTuple]:
+        if config:
+            self._ensure_loaded(config["configurable"]["thread_id"])
+        else:
+            self._load_all()
+        return super().list(config, **kwargs)
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        self._ensure_loaded(thread_id)
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        self._enqueue("threads", (thread_id, time.time()))
+
+        # Persist the records MemorySaver just serialized
+        ns = config["configurable"]["checkpoint_ns"]
+        for channel, version in new_versions.items():
+            value_type, value = self.blobs[(thread_id, ns, channel, version)]
+            self._enqueue("blobs", (thread_id, ns, channel, str(version), value_type,
+                                    _pack(value, self.compress_bytes)))
+        (checkpoint_type, data), (metadata_type, metadata_data), parent_id = \
+            self.storage[thread_id][ns][checkpoint["id"]]
+        self._enqueue("checkpoints", (thread_id, ns, checkpoint["id"], checkpoint_type,
+                                      _pack(data, self.compress_bytes), metadata_type,
+                                      _pack(metadata_data, self.compress_bytes), parent_id))
+        return next_config
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        self._ensure_loaded(thread_id)
+        super().put_writes(config, writes, task_id, task_path)
+
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        stored = self.writes.get((thread_id, ns, checkpoint_id), {})
+        for idx, (channel, _) in enumerate(writes):
+            key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+            if key not in stored:
+                continue
+            _, _, (value_type, value), path = stored[key]
+            self._enqueue("writes", (thread_id, ns, checkpoint_id, task_id, key[1], channel, value_type,
+                                     _pack(value, self.compress_bytes), path))
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self._touched.pop(thread_id, None)
+        self._loaded.add(thread_id)
+        self._enqueue("delete", (thread_id,))
+
+    # Run documents
+
+    def put_document(self, run_id: str, document_id: str, document: str) -> None:
+        """Persist a document of a run's document store."""
+        self._enqueue("documents", (run_id, document_id, _pack(document.encode("utf-8"), self.compress_bytes)))
+
+    def load_documents(self, run_id: str) -> List[Tuple[str, str]]:
+        """
+        Load the persisted documents of a run.
+
+        Returns:
+            (document id, document) pairs in the order they were stored
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT document_id, document FROM documents WHERE run_id = ? ORDER BY rowid",
+                                (run_id,)).fetchall()
+        return [(document_id, _unpack(document).decode("utf-8")) for document_id, document in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return writer counters.
+
+        Returns:
+            Dict with persisted records, batches, bytes, time spent writing,
+            failed batches, threads loaded from disk, evicted from memory and
+            pruned from disk, threads in memory and queued records
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["threads_in_memory"] = len(self.storage)
+        stats["queued"] = self._queue.unfinished_tasks
+        return stats
+
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> MemorySaver:
+    """
+    Return the checkpointer to compile a graph with.
+
+    Returns:
+        The process-wide DurableCheckpointSaver when DEFAULT_CHECKPOINT_BACKEND
+        is "sqlite", otherwise a new MemorySaver, released with its graph
+    """
+    if DEFAULT_CHECKPOINT_BACKEND != "sqlite":
+        return MemorySaver()
+    return get_durable_checkpointer()
+
+
+def get_durable_checkpointer() -> Optional[DurableCheckpointSaver]:
+    """Return the process-wide checkpointer if checkpoints persist to disk, else None."""
+    global _checkpointer
+    if DEFAULT_CHECKPOINT_BACKEND != "sqlite":
+        return None
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = DurableCheckpointSaver()
+        return _checkpointer
+
+
+def release_checkpoint_thread(thread_id: str) -> None:
+    """
+    Drop an ended run's checkpoints from memory and prune expired runs from disk.
+
+    The run's checkpoints stay on disk (until they expire), so it can still be resumed.
+
+    Args:
+        thread_id: Thread id of the run
+    """
+    checkpointer = get_durable_checkpointer()
+    if checkpointer is not None:
+        checkpointer.evict(thread_id)
+        checkpointer.prune()
+
+
+async def arelease_checkpoint_thread(thread_id: str) -> None:
+    """Async version of release_checkpoint_thread; evicting waits for the writer, so it runs in a worker thread."""
+    # run_in_executor rather than asyncio.to_thread, which needs Python 3.9
+    await asyncio.get_running_loop().run_in_executor(None, release_checkpoint_thread, thread_id)
+
+
+def checkpointer_stats() -> Optional[Dict[str, Any]]:
+    """Return the writer counters of the durable checkpointer, or None when checkpoints stay in memory."""
+    checkpointer = get_durable_checkpointer()
+    return checkpointer.stats() if checkpointer is not None else None
@@ -0,0 +1,116 @@
+"""
+Import-time benchmark for the research assistant.
+
+Runs `python -X importtime` on a module in a fresh interpreter, reports the
+slowest imports and fails when the cumulative import time exceeds a budget or
+when modules that should be loaded lazily (provider SDKs, search tooling) are
+imported eagerly.
+
+Usage:
+    python -m src.utils.import_benchmark --budget-ms 250
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from src.utils.logger import print_error, print_info, print_success
+
+# Modules that must only be imported when a client is first used
+DEFAULT_FORBIDDEN_MODULES = [
+    "langchain_openai",
+    "openai",
+    "langchain_community",
+    "tavily",
+    "wikipedia",
+    "dotenv",
+]
+
+
+def measure_import(module: str, runs: int = 3) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """
+    Measure the import time of a module in fresh interpreters.
+
+    Args:
+        module: Dotted module path to import
+        runs: Number of interpreter runs; the fastest one is reported
+
+    Returns:
+        Tuple of (cumulative import time in ms, {module: (self us, cumulative us)})
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    best_total, best_timings = None, {}
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            cwd=project_root,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+        timings: Dict[str, Tuple[int, int]] = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            try:
+                self_us, cumulative_us, name = line[len("import time:"):].split("|")
+                timings[name.strip()] = (int(self_us), int(cumulative_us))
+            except ValueError:
+                # Header line
+                continue
+
+        total = timings.get(module, (0, 0))[1] / 1000.0
+        if best_total is None or total < best_total:
+            best_total, best_timings = total, timings
+
+    return best_total, best_timings
+
+
+def find_forbidden(timings: Dict[str, Tuple[int, int]], forbidden: List[str]) -> List[str]:
+    """Return the forbidden top-level packages that were imported."""
+    imported = {name.split(".")[0] for name in timings}
+    return [name for name in forbidden if name in imported]
+
+
+def main() -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument("--module", type=str, default="src.agents.research_assistant",
+                        help="Module to import")
+    parser.add_argument("--budget-ms", type=float, default=250.0,
+                        help="Maximum cumulative import time in milliseconds")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="Number of runs (the fastest one is reported)")
+    parser.add_argument("--top", type=int, default=15,
+                        help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    total_ms, timings = measure_import(args.module, args.runs)
+
+    print_info(f"Slowest imports for {args.module} (self / cumulative ms):")
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {self_us / 1000.0:8.1f} {cumulative_us / 1000.0:8.1f}  {name}")
+
+    failed = False
+    forbidden = find_forbidden(timings, DEFAULT_FORBIDDEN_MODULES)
+    if forbidden:
+        print_error(f"Eagerly imported modules that should be lazy: {', '.join(forbidden)}")
+        failed = True
+
+    if total_ms > args.budget_ms:
+        print_error(f"Import of {args.module} took {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        failed = True
+    else:
+        print_success(f"Import of {args.module} took {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Offline end-to-end benchmark of the research pipeline.
+
+Runs analyst generation and the full report graph against the offline fake LLM
+and search backends (LLM_PROVIDER=fake, SEARCH_PROVIDER=fake) under a chosen
+latency profile, and reports the wall-clock time next to the simulated LLM
+time and the rate limiter wait, so orchestration overhead and regressions can
+be measured without network access. The fake deployments get unlimited
+quotas by default, so the run does not measure the default quota; pass
+--requests-per-minute / --tokens-per-minute to include the limiter.
+
+Usage:
+    python -m src.utils.pipeline_benchmark --analysts 3 --latency-profile realistic
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from src.config.default_settings import (
+    DEFAULT_FAKE_LATENCY_PROFILES,
+    DEFAULT_MAX_INTERVIEW_TURNS,
+    DEFAULT_RESEARCH_TOPIC,
+)
+from src.utils.logger import print_error, print_info, print_success
+
+# Quota that never makes a call wait
+UNLIMITED_QUOTA = 1e12
+
+
+async def run_pipeline(topic: str, analysts: int, turns: int, output_file: str) -> dict:
+    """
+    Run analyst generation and report generation once.
+
+    Returns:
+        Dict with the wall-clock time of each phase and the report length
+    """
+    from src.agents.research_assistant import ResearchAssistant
+
+    assistant = ResearchAssistant()
+    assistant.set_topic(topic, analysts, turns)
+
+    started = time.perf_counter()
+    await assistant.agenerate_analysts()
+    analysts_done = time.perf_counter()
+
+    report = ""
+    async for event in assistant.astream_report(output_file):
+        if event["type"] == "final_report":
+            report = event["text"]
+    finished = time.perf_counter()
+
+    return {
+        "analysts_seconds": analysts_done - started,
+        "report_seconds": finished - analysts_done,
+        "total_seconds": finished - started,
+        "report_characters": len(report or ""),
+    }
+
+
+def main() -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark")
+    parser.add_argument("--topic", type=str, default=DEFAULT_RESEARCH_TOPIC,
+                        help="Research topic")
+    parser.add_argument("--analysts", type=int, default=3,
+                        help="Number of analysts")
+    parser.add_argument("--turns", type=int, default=DEFAULT_MAX_INTERVIEW_TURNS,
+                        help="Maximum number of conversation turns per interview")
+    parser.add_argument("--latency-profile", type=str, default="fast",
+                        choices=sorted(DEFAULT_FAKE_LATENCY_PROFILES),
+                        help="Latency profile of the fake LLM")
+    parser.add_argument("--search-latency-profile", type=str, default=None,
+                        choices=sorted(DEFAULT_FAKE_LATENCY_PROFILES),
+                        help="Latency profile of the fake search backends (default: same as the LLM)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction of LLM calls answered with an injected 429")
+    parser.add_argument("--requests-per-minute", type=float, default=0.0,
+                        help="Request quota of the fake deployments (0: unlimited)")
+    parser.add_argument("--tokens-per-minute", type=float, default=0.0,
+                        help="Token quota of the fake deployments (0: unlimited)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the fake responses and latencies")
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="Fail when the run takes longer than this")
+    args = parser.parse_args()
+
+    # Settings are read when the clients are first built, so set them before the run
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["SEARCH_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_PROFILE"] = args.latency_profile
+    os.environ["FAKE_SEARCH_LATENCY_PROFILE"] = args.search_latency_profile or args.latency_profile
+    os.environ["FAKE_LLM_RATE_LIMIT_RATE"] = str(args.rate_limit_rate)
+    os.environ["FAKE_SEED"] = str(args.seed)
+
+    from src.models.fake_llm import fake_llm_stats
+    from src.models.hedging import hedge_stats
+    from src.models.rate_limiter import rate_limiter_stats, set_rate_limits
+
+    set_rate_limits(args.requests_per_minute or UNLIMITED_QUOTA, args.tokens_per_minute or UNLIMITED_QUOTA)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        timings = asyncio.run(run_pipeline(args.topic, args.analysts, args.turns,
+                                           os.path.join(output_dir, "report.md")))
+
+    llm_stats = fake_llm_stats()
+    limiter_stats = rate_limiter_stats()
+    limiter_wait = sum(stats["wait_seconds"] for stats in limiter_stats.values())
+    print_info(f"Analysts: {args.analysts}, turns: {args.turns}, latency profile: {args.latency_profile}")
+    print_info(f"Analyst generation: {timings['analysts_seconds']:.2f} s, "
+               f"interviews and report: {timings['report_seconds']:.2f} s")
+    print_info(f"LLM calls: {llm_stats['calls']}, injected 429s: {llm_stats['rate_limited']}, "
+               f"simulated LLM time: {llm_stats['simulated_seconds']:.2f} s "
+               f"(sum over all calls), output tokens: {llm_stats['output_tokens']}")
+    for deployment, stats in limiter_stats.items():
+        print_info(f"Rate limiter [{deployment}]: {stats}")
+    print_info(f"Hedging: {hedge_stats()}")
+
+    if not timings["report_characters"]:
+        print_error("The pipeline produced no report")
+        return 1
+    if args.max_seconds is not None and timings["total_seconds"] > args.max_seconds:
+        print_error(f"Pipeline took {timings['total_seconds']:.2f} s (budget {args.max_seconds:.2f} s)")
+        return 1
+    print_success(f"Pipeline took {timings['total_seconds']:.2f} s "
+                  f"(rate limiter wait: {limiter_wait:.2f} s, sum over all calls), "
+                  f"report has {timings['report_characters']} characters")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
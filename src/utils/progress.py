@@ -0,0 +1,54 @@
+"""
+Progress events emitted by graph nodes.
+
+Nodes report progress with emit_progress; the events reach the caller of the
+report graph through its "custom" stream mode, which ResearchAssistant turns
+into ProgressEvents for its subscribers. Interviews run as nested graphs,
+whose custom events LangGraph does not forward to the parent stream, so the
+conduct_interview node opens a progress_scope: events emitted anywhere inside
+it go to the report graph's stream writer.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from langchain_core.messages import AIMessage
+
+_scope_writer: ContextVar[Optional[Callable[[Any], None]]] = ContextVar("progress_writer", default=None)
+
+
+def _stream_writer() -> Optional[Callable[[Any], None]]:
+    """Return the stream writer of the calling node, or None outside a graph run."""
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except (ImportError, RuntimeError):
+        return None
+
+
+def emit_progress(event: Dict[str, Any]) -> None:
+    """
+    Report a progress event to the caller of the graph.
+
+    Args:
+        event: ProgressEvent dict (see ResearchAssistant)
+    """
+    writer = _scope_writer.get() or _stream_writer()
+    if writer is not None:
+        writer(event)
+
+
+@contextmanager
+def progress_scope() -> Iterator[None]:
+    """Forward the progress events of nested graphs to the calling node's stream writer."""
+    token = _scope_writer.set(_scope_writer.get() or _stream_writer())
+    try:
+        yield
+    finally:
+        _scope_writer.reset(token)
+
+
+def interview_turns(state: Dict[str, Any], name: str = "expert") -> int:
+    """Return the number of answers given so far in an interview."""
+    return sum(1 for message in state.get("messages", []) if isinstance(message, AIMessage) and message.name == name)
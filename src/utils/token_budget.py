@@ -0,0 +1,185 @@
+"""
+Token budgeting for prompts built from retrieved documents.
+
+Interview context is a list of search results, each holding one or more
+`<Document ...>` blocks. Before the context is interpolated into a prompt, the
+documents are counted with the model tokenizer, ranked against the current
+question and dropped or truncated until they fit the per-call budget.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.default_settings import DEFAULT_TOKENIZER_ENCODING
+from src.utils.logger import logger
+
+# Separator used by the search nodes between formatted documents
+DOCUMENT_SEPARATOR = "\n\n---\n\n"
+
+# Documents are only truncated when at least this many tokens of them fit
+MIN_TRUNCATED_TOKENS = 64
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "in", "is", "it", "of", "on", "or", "that", "the", "this",
+    "to", "was", "what", "when", "where", "which", "who", "why", "with", "you",
+}
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """Load the tiktoken encoding once; None when tiktoken is unavailable."""
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding(DEFAULT_TOKENIZER_ENCODING)
+            except Exception as e:
+                # tiktoken downloads encodings on first use, which fails offline
+                logger.warning(f"Tokenizer unavailable, estimating tokens from characters: {str(e)}")
+                _encoding = None
+        return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of a text with the model tokenizer (or ~4 chars per token)."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text down to at most max_tokens tokens."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    return encoding.decode(tokens[:max_tokens])
+
+
+def split_documents(context: List[str]) -> List[str]:
+    """Split context entries into individual `<Document ...>` blocks."""
+    documents = []
+    for entry in context:
+        documents.extend(part for part in str(entry).split(DOCUMENT_SEPARATOR) if part.strip())
+    return documents
+
+
+def _terms(text: str) -> set:
+    return {term for term in re.findall(r"\w+", text.lower()) if term not in STOPWORDS}
+
+
+def _truncate_document(document: str, max_tokens: int) -> str:
+    """Truncate a document body while keeping its <Document> header and closing tag."""
+    header, _, body = document.partition("\n")
+    body = body.replace("</Document>", "").rstrip()
+    budget = max_tokens - count_tokens(header) - count_tokens("\n...\n</Document>")
+    return f"{header}\n{truncate_to_tokens(body, max(budget, 0))}\n...\n</Document>"
+
+
+def fit_documents(documents: List[str],
+                  budget: int,
+                  query: Optional[str] = None) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Select documents that fit into a token budget.
+
+    Documents are ranked by term overlap with the query (newer documents win
+    ties), added greedily, and the first one that does not fit is truncated if
+    enough budget is left. The selected documents keep their original order.
+
+    Args:
+        documents: Formatted documents
+        budget: Maximum number of tokens for all documents together
+        query: Text to rank documents against (e.g. the latest question)
+
+    Returns:
+        Tuple of (selected documents, report with token counts)
+    """
+    token_counts = [count_tokens(document) for document in documents]
+    total_tokens = sum(token_counts)
+    report = {"input_tokens": total_tokens, "output_tokens": total_tokens,
+              "dropped": 0, "truncated": 0}
+    if total_tokens <= budget:
+        return documents, report
+
+    query_terms = _terms(query or "")
+
+    def rank(index: int) -> Tuple[float, int]:
+        if not query_terms:
+            return (0.0, index)
+        overlap = len(query_terms & _terms(documents[index])) / len(query_terms)
+        return (overlap, index)
+
+    order = sorted(range(len(documents)), key=rank, reverse=True)
+
+    selected: Dict[int, str] = {}
+    remaining = budget
+    for index in order:
+        if token_counts[index] <= remaining:
+            selected[index] = documents[index]
+            remaining -= token_counts[index]
+        elif remaining >= MIN_TRUNCATED_TOKENS:
+            truncated = _truncate_document(documents[index], remaining)
+            selected[index] = truncated
+            remaining -= count_tokens(truncated)
+            report["truncated"] += 1
+        else:
+            report["dropped"] += 1
+
+    kept = [selected[index] for index in sorted(selected)]
+    report["output_tokens"] = budget - remaining
+    return kept, report
+
+
+_savings: Dict[str, Dict[str, int]] = {}
+_savings_lock = threading.Lock()
+
+
+def budget_context(context: List[str], budget: int, query: Optional[str] = None,
+                   node: str = "llm") -> str:
+    """
+    Fit interview context into a token budget and format it for a prompt.
+
+    Args:
+        context: Interview context (list of formatted search results)
+        budget: Maximum number of context tokens
+        query: Text to rank documents against
+        node: Name of the calling node, used for reporting
+
+    Returns:
+        The selected documents joined into a single string
+    """
+    documents, report = fit_documents(split_documents(context), budget, query)
+
+    saved = report["input_tokens"] - report["output_tokens"]
+    with _savings_lock:
+        totals = _savings.setdefault(node, {"calls": 0, "input_tokens": 0, "saved_tokens": 0})
+        totals["calls"] += 1
+        totals["input_tokens"] += report["input_tokens"]
+        totals["saved_tokens"] += saved
+
+    if saved > 0:
+        logger.info(
+            f"Token budget [{node}]: {report['output_tokens']}/{report['input_tokens']} context tokens kept "
+            f"(saved {saved}, dropped {report['dropped']}, truncated {report['truncated']})"
+        )
+
+    return DOCUMENT_SEPARATOR.join(documents)
+
+
+def token_savings_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Return the context tokens saved by the budgeter, per node.
+
+    Returns:
+        Dict mapping node names to call count, input tokens and saved tokens
+    """
+    with _savings_lock:
+        return {node: dict(totals) for node, totals in _savings.items()}